@@ -11,6 +11,8 @@ import warnings
 warnings.filterwarnings("ignore")
 import os
 import sys
+import time
+import asyncio
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
@@ -19,7 +21,7 @@ from langchain_core.tools import Tool
 from langchain_ollama import ChatOllama
 from langchain_core.messages import HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from notion_client import Client
+from notion_client import Client, AsyncClient
 from langchain_core.tools import tool
 
 
@@ -32,7 +34,14 @@ if project_root not in sys.path:
 
 # Verify import after path adjustment
 try:
-    from backend.core.rag_chain import rag_chain
+    from backend.core.rag_chain import rag_chain, run_rag_chain, arun_rag_chain, retrieve_context, aretrieve_context, LLM_MODEL
+    from backend.core.metrics import metrics, timed, metrics_callback
+    from backend.core.report_engine import generate_report, agenerate_report, failed_sections, REPORT_ENGINE, REPORT_ENGINE_VERSION
+    from backend.core.report_cache import ReportCache, REPORT_CACHE_ENABLED
+    from backend.core.corpus_version import get_corpus_version
+    from backend.core.agent_budget import AgentBudget, BudgetExceeded
+    from backend.core.notion_blocks import NotionBlockWriter
+    from backend.core.intent_router import classify_intent, react_llm_calls, INTENT_ROUTER, INTENT_TOOLS, AGENT_INTENTS
     logging.info("Successfully imported rag_chain from backend.core.rag_chain")
 except ImportError as e:
     logging.error(f"Failed to import rag_chain: {str(e)}")
@@ -46,6 +55,27 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 NOTION_API_KEY = os.getenv("NOTION_API_KEY")
 NOTION_PAGE_ID = os.getenv("NOTION_PAGE_ID")
+# Point at a local stand-in of the Notion API for testing
+NOTION_BASE_URL = os.getenv("NOTION_BASE_URL", "https://api.notion.com")
+
+# Seconds per ReAct planning call assumed until llm_react_planner has real samples
+REACT_PLANNER_CALL_S = float(os.getenv("REACT_PLANNER_CALL_S", 5.0))
+
+# Bump AGENT_PROMPT_VERSION when a tool prompt or the routing changes so cached reports are regenerated
+AGENT_PROMPT_VERSION = "1"
+REPORT_TOOL_VERSION = f"agent-v{AGENT_PROMPT_VERSION}/" + (f"sections-v{REPORT_ENGINE_VERSION}" if REPORT_ENGINE else "single-prompt")
+
+# Outputs of these tools are full reports worth caching
+REPORT_TOOLS = ("generate_report_tool", "summarize_with_context")
+
+# Generated reports survive restarts; ingest invalidates them through the corpus version
+report_cache = ReportCache() if REPORT_CACHE_ENABLED else None
+
+# Markdown -> Notion blocks, with a content-hash ledger so a report is published once
+notion_writer = NotionBlockWriter(NOTION_PAGE_ID or "")
+
+# generate_report_tool has always sampled at temperature 1
+REPORT_TOOL_TEMPERATURE = 1.0
 
 # Tool: generate_report_tool
 @tool("generate_report_tool")
@@ -54,8 +84,17 @@ def generate_report_tool(query: str) -> str:
     Generate a comprehensive, structured human rights report in markdown format.
     """
     logger.info(f"Generating report for query: {query}")
-    llm = ChatOllama(model="mistral:latest", temperature=1, max_tokens=4000)
-    msg = HumanMessage(
+    if REPORT_ENGINE:
+        # Sections from general knowledge, generated concurrently. This tool stays ungrounded:
+        # the agent uses it when RAG found nothing, and retrieval would then only return
+        # chunks about other countries. Grounded reports go through summarize_with_context,
+        # whose sections each retrieve their own context.
+        return generate_report(query, use_rag=False, temperature=REPORT_TOOL_TEMPERATURE)
+    llm = ChatOllama(model="mistral:latest", temperature=REPORT_TOOL_TEMPERATURE, max_tokens=4000, callbacks=[metrics_callback])
+    return llm.invoke([_report_message(query)]).content
+
+def _report_message(query: str) -> HumanMessage:
+    return HumanMessage(
         content=f"""You are a human rights research assistant. Create a comprehensive, structured report on the following human rights topic in markdown format:
 
         {query}
@@ -70,15 +109,24 @@ def generate_report_tool(query: str) -> str:
 
         Format it as a professional report with clear markdown headings (##) and bullet points. Be objective, factual, and detailed (minimum 800 words). Do NOT include meta-commentary like 'This report provides...', 'I hope this answers...', or any introductory/explanatory text outside the report structure. Return ONLY the markdown report."""
     )
-    return llm.invoke([msg]).content
+
+async def _agenerate_report(query: str) -> str:
+    logger.info(f"Generating report for query: {query}")
+    if REPORT_ENGINE:
+        return await agenerate_report(query, use_rag=False, temperature=REPORT_TOOL_TEMPERATURE)
+    llm = ChatOllama(model="mistral:latest", temperature=REPORT_TOOL_TEMPERATURE, max_tokens=4000, callbacks=[metrics_callback])
+    return (await llm.ainvoke([_report_message(query)])).content
 
 # Tool: summarize_llm_only
 @tool("summarize_llm_only")
 def summarize_llm_only(query: str) -> str:
     """Summarize a query using only the LLM with no external documents."""
     logger.info(f"Summarizing query without RAG: {query}")
-    llm = ChatOllama(model="mistral:latest")
-    msg = HumanMessage(
+    llm = ChatOllama(model="mistral:latest", callbacks=[metrics_callback])
+    return llm.invoke([_summary_message(query)]).content
+
+def _summary_message(query: str) -> HumanMessage:
+    return HumanMessage(
         content=f"""You are a human rights research assistant. Summarize the following human rights topic concisely in markdown format, using only your general knowledge. Do not include external sources or references:
 
         {query}
@@ -87,7 +135,11 @@ def summarize_llm_only(query: str) -> str:
         - Summary
         - Key Points"""
     )
-    return llm.invoke([msg]).content
+
+async def _asummarize_llm_only(query: str) -> str:
+    logger.info(f"Summarizing query without RAG: {query}")
+    llm = ChatOllama(model="mistral:latest", callbacks=[metrics_callback])
+    return (await llm.ainvoke([_summary_message(query)])).content
 
 # Tool: search_rag_data
 @tool("search_rag_data")
@@ -98,13 +150,53 @@ def search_rag_data(query: str) -> str:
         query = "What countries are represented in the RAG data?"
         logger.warning(f"No query provided, using default: {query}")
     try:
-        response = rag_chain.invoke({"question": query})
+        response = run_rag_chain(query)
         logger.debug(f"RAG response: {response}")
         return response if response else "No relevant documents found in the ChromaDB vector store."
     except Exception as e:
         logger.error(f"Error retrieving context from rag_chain: {str(e)}")
         return f"Error retrieving context from rag_chain: {str(e)}"
 
+async def _asearch_rag_data(query: str) -> str:
+    logger.info(f"Searching RAG data for query: {query}")
+    if not query or query.lower() == "none":
+        query = "What countries are represented in the RAG data?"
+        logger.warning(f"No query provided, using default: {query}")
+    try:
+        response = await arun_rag_chain(query)
+        logger.debug(f"RAG response: {response}")
+        return response if response else "No relevant documents found in the ChromaDB vector store."
+    except Exception as e:
+        logger.error(f"Error retrieving context from rag_chain: {str(e)}")
+        return f"Error retrieving context from rag_chain: {str(e)}"
+
+# Tool: retrieve_rag_context
+@tool("retrieve_rag_context")
+def retrieve_rag_context(query: str) -> str:
+    """Retrieves the relevant DOS human rights report chunks with their sources from ChromaDB, without generating an answer. Use before summarize_with_context."""
+    logger.info(f"Retrieving RAG context for query: {query}")
+    if not query or query.lower() == "none":
+        query = "What countries are represented in the RAG data?"
+        logger.warning(f"No query provided, using default: {query}")
+    try:
+        context = retrieve_context(query)
+        return context if context else "No relevant documents found in the ChromaDB vector store."
+    except Exception as e:
+        logger.error(f"Error retrieving context from ChromaDB: {str(e)}")
+        return f"Error retrieving context from ChromaDB: {str(e)}"
+
+async def _aretrieve_rag_context(query: str) -> str:
+    logger.info(f"Retrieving RAG context for query: {query}")
+    if not query or query.lower() == "none":
+        query = "What countries are represented in the RAG data?"
+        logger.warning(f"No query provided, using default: {query}")
+    try:
+        context = await aretrieve_context(query)
+        return context if context else "No relevant documents found in the ChromaDB vector store."
+    except Exception as e:
+        logger.error(f"Error retrieving context from ChromaDB: {str(e)}")
+        return f"Error retrieving context from ChromaDB: {str(e)}"
+
 # Tool: summarize_with_context
 @tool("summarize_with_context")
 def summarize_with_context(query_and_context: dict) -> str:
@@ -114,27 +206,46 @@ def summarize_with_context(query_and_context: dict) -> str:
         logger.error("Invalid input for summarize_with_context: missing 'query' or 'context' keys")
         return "Error: Input must be a dictionary with 'query' and 'context' keys."
     
-    query = query_and_context['query']
-    context = query_and_context['context']
-    
-    llm = ChatOllama(model="mistral:latest")
-    msg = HumanMessage(
+    if REPORT_ENGINE:
+        # The supplied context feeds the Executive Summary; other sections retrieve their own
+        return generate_report(query_and_context['query'], context=query_and_context['context'])
+    llm = ChatOllama(model="mistral:latest", callbacks=[metrics_callback])
+    return llm.invoke([_context_report_message(query_and_context['query'], query_and_context['context'])]).content
+
+def _context_report_message(query: str, context: str) -> HumanMessage:
+    return HumanMessage(
         content=f"""You are a human rights research assistant. Create a detailed report on the following human rights topic in markdown format, using the provided context from Department of State human rights reports. Ensure the report is objective, factual, and detailed (minimum 800 words), with clear headings for:
         - Executive Summary (150-200 words)
         - Key Issues and Violations
         - Affected Groups
         - Current Status
         - Recommendations
-        - References (cite the context as 'U.S. Department of State Human Rights Reports')
+        - References (cite the documents named in the context's Source [...] labels as U.S. Department of State Human Rights Reports)
 
         Topic: {query}
 
         Context: {context}"""
     )
-    return llm.invoke([msg]).content
 
-# LLM and tools
-llm = ChatOllama(model="mistral:latest")
+async def _asummarize_with_context(query_and_context: dict) -> str:
+    logger.info(f"Summarizing with context for query: {query_and_context.get('query', 'unknown')}")
+    if not isinstance(query_and_context, dict) or 'query' not in query_and_context or 'context' not in query_and_context:
+        logger.error("Invalid input for summarize_with_context: missing 'query' or 'context' keys")
+        return "Error: Input must be a dictionary with 'query' and 'context' keys."
+    if REPORT_ENGINE:
+        return await agenerate_report(query_and_context['query'], context=query_and_context['context'])
+    llm = ChatOllama(model="mistral:latest", callbacks=[metrics_callback])
+    return (await llm.ainvoke([_context_report_message(query_and_context['query'], query_and_context['context'])])).content
+
+# Async implementations used when the agent runs through ainvoke
+generate_report_tool.coroutine = _agenerate_report
+summarize_llm_only.coroutine = _asummarize_llm_only
+search_rag_data.coroutine = _asearch_rag_data
+retrieve_rag_context.coroutine = _aretrieve_rag_context
+summarize_with_context.coroutine = _asummarize_with_context
+
+# LLM and tools (the react_planner tag lets metrics time planning calls separately)
+llm = ChatOllama(model="mistral:latest", callbacks=[metrics_callback], tags=["react_planner"])
 tools = [
     #Tool(
      #   name="generate_report",
@@ -144,26 +255,29 @@ tools = [
     generate_report_tool,
     summarize_llm_only,
     search_rag_data,
+    retrieve_rag_context,
     summarize_with_context
 ]
+tools_by_name = {t.name: t for t in tools}
 
 # Custom prompt template with reasoning logic
 prompt = ChatPromptTemplate.from_messages([
     ("system", """You are a human rights research assistant. Your primary purpose is to generate objective, factual, and detailed reports or summaries on human rights topics, including violations in any country, using your Retrieval-Augmented Generation (RAG) system containing Department of State human rights reports. Follow these steps to process user queries:
 
     1. **Determine the query type**:
-       - For queries requesting a 'full report', 'detailed report', or 'report on [topic]' (e.g., 'Write me a detailed report on human rights violations in Iran'), ALWAYS use the `search_rag_data` tool first to retrieve context from the RAG system, then use `summarize_with_context` to generate a detailed report incorporating the RAG data. If RAG returns 'No relevant documents found' or an error, use `generate_report` with general knowledge as a fallback.
-       - If the user asks for sources or RAG data (e.g., 'What does the RAG data say about human rights in Iran'), use the `search_rag_data` tool, then `summarize_with_context`.
+       - For queries requesting a 'full report', 'detailed report', or 'report on [topic]' (e.g., 'Write me a detailed report on human rights violations in Iran'), ALWAYS use the `retrieve_rag_context` tool first to retrieve the source documents from the RAG system, then use `summarize_with_context` to generate a detailed report incorporating them. If RAG returns 'No relevant documents found' or an error, use `generate_report` with general knowledge as a fallback.
+       - If the user asks for sources or RAG data (e.g., 'What does the RAG data say about human rights in Iran'), use the `retrieve_rag_context` tool, then `summarize_with_context`.
+       - If the user asks a short factual question answerable from the RAG data, use `search_rag_data` alone.
        - If the user requests a quick summary without sources (e.g., 'summarize human rights in Iran'), use the `summarize_llm_only` tool.
-       - If unsure, default to `search_rag_data` and `summarize_with_context`.
+       - If unsure, default to `retrieve_rag_context` and `summarize_with_context`.
 
     2. **Tool usage**:
-       - Use exact tool names: `generate_report`, `summarize_llm_only`, `search_rag_data`, `summarize_with_context`.
-       - For `search_rag_data`, provide a specific query string (e.g., 'Human rights violations in Iran').
+       - Use exact tool names: `generate_report`, `summarize_llm_only`, `search_rag_data`, `retrieve_rag_context`, `summarize_with_context`.
+       - For `retrieve_rag_context` and `search_rag_data`, provide a specific query string (e.g., 'Human rights violations in Iran').
        - For `summarize_with_context`, pass a dictionary with 'query' and 'context' keys.
        - Example actions:
-         - Action: search_rag_data\nAction Input: "Human rights violations in Iran"
-         - Action: summarize_with_context\nAction Input: {"query": "Human rights violations in Iran", "context": "[RAG output]"}
+         - Action: retrieve_rag_context\nAction Input: "Human rights violations in Iran"
+         - Action: summarize_with_context\nAction Input: {"query": "Human rights violations in Iran", "context": "[retrieve_rag_context output]"}
          - Action: generate_report\nAction Input: "Human rights violations in Iran"
 
     3. **CRITICAL - Output Rules**:
@@ -189,100 +303,253 @@ agent = initialize_agent(
     verbose=True,
     handle_parsing_errors=handle_parsing_errors,
     max_iterations=5,
+    return_intermediate_steps=True,
     prompt=prompt
 )
 
 # Run agent with user input
-def run_agent(user_query: str):
+def run_agent(user_query: str, budget: AgentBudget = None):
     """
     Run the ReAct agent to generate or summarize a human rights report.
+    Reports already generated for the same query, tool version, model and corpus come from the report cache.
+    The run is bounded by an AgentBudget (wall time, LLM calls, tokens); when it runs out the
+    best tool output so far is returned with partial=True. A budget cancelled by the caller
+    (client disconnect) raises BudgetExceeded instead, since nobody is left to read the result.
     Returns a dictionary with the actual output text.
     """
     logger.info(f"Running agent with query: {user_query}")
+    corpus_version = get_corpus_version()
+    if report_cache is not None:
+        cached = report_cache.lookup(user_query, REPORT_TOOL_VERSION, LLM_MODEL, corpus_version)
+        if cached:
+            return _serve_cached_report(cached)
+
+    start_time = time.time()
+    budget = budget or AgentBudget()
     try:
-        result = agent.invoke({"input": user_query})
-        
-        # Log intermediate steps
-        intermediate_steps = getattr(result, "intermediate_steps", [])
-        logger.debug(f"Intermediate steps: {intermediate_steps}")
-
-        # Look for tool output (generate_report or summarize_with_context)
-        detailed_output = ""
-        for step in intermediate_steps:
-            if len(step) >= 2 and isinstance(step[1], str):
-                tool_name = getattr(step[0], "tool", None)
-                if tool_name in ["generate_report", "summarize_with_context"]:
-                    detailed_output = step[1]
-                    logger.info(f"Found {tool_name} output: {detailed_output[:100]}...")
-                    break
-
-        # Use tool output if available, otherwise fallback to final agent output
-        if detailed_output:
-            output = detailed_output
-        else:
-            output = getattr(result, "output", str(result))
-            if any(phrase in output.lower() for phrase in ["this report provides", "i hope this answers"]):
-                logger.warning(f"Agent returned generic response: {output[:100]}...")
-            else:
-                logger.info("Using fallback agent output")
+        result = _run_agent_uncached(user_query, budget)
+    except BudgetExceeded:
+        if budget.reason == "cancelled":
+            logger.info(f"Agent run cancelled for: {user_query}")
+            raise
+        result = _partial_result(budget)
+    if report_cache is not None and _is_report(result):
+        report_cache.store(user_query, result["output"], REPORT_TOOL_VERSION, LLM_MODEL, corpus_version,
+                           time.time() - start_time)
+    return result
+
+def _run_agent_uncached(user_query: str, budget: AgentBudget) -> dict:
+    route = classify_intent(user_query) if INTENT_ROUTER else None
+    if route and route["intent"]:
+        with timed("routed_total"):
+            output, report_tool = _run_tool_sequence(user_query, INTENT_TOOLS[route["intent"]], budget)
+        return {"output": output, "route": _record_route(route), "report_tool": report_tool}
+    _record_fallback(route)
+    try:
+        # metrics_callback on the run config times every tool call; budget can stop any of them
+        with timed("agent_total"):
+            result = agent.invoke({"input": user_query}, config={"callbacks": [metrics_callback, budget]})
+        return _agent_output(result)
+
+    except BudgetExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"Agent execution failed: {str(e)}")
+        return {"output": f"Error: Agent execution failed - {str(e)}"}
 
-        return {"output": output}
+async def arun_agent(user_query: str):
+    """
+    Async variant of run_agent: the agent, its LLM calls and its tools are awaited
+    (agent.ainvoke), so concurrent requests don't each hold a thread.
+    The wall-time budget also cancels a generation that is still in prefill, and cancelling
+    the caller (client disconnect) closes the in-flight Ollama request.
+    """
+    logger.info(f"Running agent with query: {user_query}")
+    corpus_version = await asyncio.to_thread(get_corpus_version)
+    if report_cache is not None:
+        cached = await asyncio.to_thread(report_cache.lookup, user_query, REPORT_TOOL_VERSION, LLM_MODEL, corpus_version)
+        if cached:
+            return _serve_cached_report(cached)
+
+    start_time = time.time()
+    budget = AgentBudget()
+    try:
+        result = await asyncio.wait_for(_arun_agent_uncached(user_query, budget), timeout=budget.max_wall_s)
+    except (BudgetExceeded, asyncio.TimeoutError):
+        budget.expire("wall_time")
+        result = _partial_result(budget)
+    if report_cache is not None and _is_report(result):
+        await asyncio.to_thread(report_cache.store, user_query, result["output"], REPORT_TOOL_VERSION, LLM_MODEL,
+                                corpus_version, time.time() - start_time)
+    return result
+
+async def _arun_agent_uncached(user_query: str, budget: AgentBudget) -> dict:
+    route = await asyncio.to_thread(classify_intent, user_query) if INTENT_ROUTER else None
+    if route and route["intent"]:
+        with timed("routed_total"):
+            output, report_tool = await _arun_tool_sequence(user_query, INTENT_TOOLS[route["intent"]], budget)
+        return {"output": output, "route": _record_route(route), "report_tool": report_tool}
+    _record_fallback(route)
+    try:
+        with timed("agent_total"):
+            result = await agent.ainvoke({"input": user_query}, config={"callbacks": [metrics_callback, budget]})
+        return _agent_output(result)
 
+    except BudgetExceeded:
+        raise
     except Exception as e:
         logger.error(f"Agent execution failed: {str(e)}")
         return {"output": f"Error: Agent execution failed - {str(e)}"}
 
+RAG_TOOLS = ("search_rag_data", "retrieve_rag_context")
+
+def _no_rag_context(output: str) -> bool:
+    return not output or output.startswith(("No relevant documents found", "Error retrieving context"))
+
+def _tool_input(name: str, query: str, previous: str):
+    if name == "summarize_with_context":
+        return {"query_and_context": {"query": query, "context": previous}}
+    return query
+
+def _is_report(result: dict) -> bool:
+    # A report with failed sections (e.g. Ollama down) is returned but not cached
+    return (result.get("report_tool") in REPORT_TOOLS and not result.get("partial")
+            and not result["output"].startswith("Error") and not failed_sections(result["output"]))
+
+def _partial_result(budget: AgentBudget) -> dict:
+    usage = budget.usage()
+    metrics.increment("agent_budget_exceeded", reason=usage["reason"])
+    tool, output = budget.best_output()
+    logger.warning(f"Agent budget exhausted ({usage['exceeded']}), returning {tool or 'no'} partial output")
+    if output is None:
+        output = f"Error: Agent budget exhausted ({usage['exceeded']}) before any tool produced output."
+    return {"output": output, "partial": True, "report_tool": tool, "budget": usage}
+
+def _serve_cached_report(cached: dict) -> dict:
+    metrics.increment("report_cache_hits")
+    logger.info(f"Report cache hit for '{cached['query']}' (saved ~{cached['generation_latency']:.1f}s, "
+                f"hit ratio {report_cache.get_stats()['hit_ratio']:.2%})")
+    return {"output": cached["report"], "cached": True}
+
+def _run_tool_sequence(query: str, names: list, budget: AgentBudget = None) -> tuple:
+    """
+    Run a routed intent's tools in order without the ReAct planner, feeding each
+    output to the next. Like the prompt, an empty RAG search falls back to generate_report_tool.
+    Returns (output, name of the tool that produced it).
+    """
+    config = {"callbacks": [metrics_callback] + ([budget] if budget else [])}
+    output = None
+    for name in names:
+        output = tools_by_name[name].invoke(_tool_input(name, query, output), config=config)
+        if name in RAG_TOOLS and _no_rag_context(output):
+            logger.info("No RAG context, falling back to generate_report_tool")
+            return generate_report_tool.invoke(query, config=config), generate_report_tool.name
+    return output, name
+
+async def _arun_tool_sequence(query: str, names: list, budget: AgentBudget = None) -> tuple:
+    config = {"callbacks": [metrics_callback] + ([budget] if budget else [])}
+    output = None
+    for name in names:
+        output = await tools_by_name[name].ainvoke(_tool_input(name, query, output), config=config)
+        if name in RAG_TOOLS and _no_rag_context(output):
+            logger.info("No RAG context, falling back to generate_report_tool")
+            return await generate_report_tool.ainvoke(query, config=config), generate_report_tool.name
+    return output, name
+
+def _record_route(route: dict) -> dict:
+    # Planning calls ReAct would have made, priced at the measured mean planner call
+    calls_saved = react_llm_calls(route["intent"])
+    seconds_saved = calls_saved * metrics.mean("llm_react_planner", REACT_PLANNER_CALL_S)
+    metrics.increment("router_requests", route=route["intent"])
+    metrics.increment("router_llm_calls_saved", calls_saved)
+    metrics.increment("router_seconds_saved", round(seconds_saved, 3))
+    logger.info(f"Routed to '{route['intent']}' via {route['source']}: skipped {calls_saved} ReAct LLM calls "
+                f"(~{seconds_saved:.1f}s saved)")
+    return dict(route, llm_calls_saved=calls_saved, seconds_saved_est=round(seconds_saved, 2))
+
+def _record_fallback(route: dict):
+    if route is not None:
+        metrics.increment("router_requests", route="agent")
+        reason = "Question for the RAG search" if route.get("nearest") in AGENT_INTENTS else "Intent ambiguous"
+        logger.info(f"{reason} (similarity {route['similarity']}, margin {route['margin']}), using the ReAct agent")
+
+def _agent_output(result: dict) -> dict:
+    """Pick the detailed tool output from an agent result, falling back to the final answer."""
+    # Log intermediate steps (AgentExecutor returns them in its result dict)
+    intermediate_steps = result.get("intermediate_steps", [])
+    logger.debug(f"Intermediate steps: {intermediate_steps}")
+
+    # Look for tool output (generate_report or summarize_with_context)
+    detailed_output, report_tool = "", None
+    for step in intermediate_steps:
+        if len(step) >= 2 and isinstance(step[1], str):
+            tool_name = getattr(step[0], "tool", None)
+            if tool_name in ["generate_report", *REPORT_TOOLS]:
+                detailed_output, report_tool = step[1], tool_name
+                logger.info(f"Found {tool_name} output: {detailed_output[:100]}...")
+                break
+
+    # Use tool output if available, otherwise fallback to final agent output
+    if detailed_output:
+        output = detailed_output
+    else:
+        output = result.get("output", "")
+        if any(phrase in output.lower() for phrase in ["this report provides", "i hope this answers"]):
+            logger.warning(f"Agent returned generic response: {output[:100]}...")
+        else:
+            logger.info("Using fallback agent output")
+
+    return {"output": output, "report_tool": report_tool}
+
 # Publish to Notion
 def publish_to_notion(title: str, content: str, date: str = None, source: str = "Human Rights LLM Agent"):
     """
-    Publish a report to Notion page, splitting long content into multiple blocks.
+    Publish a report to Notion page as native blocks, appended in batches of at most 100.
+    A report already published with the same title and content is skipped.
     """
     logger.info(f"Publishing to Notion with title: {title}, content length: {len(content)}")
-    if not date:
-        date = datetime.now().strftime("%Y-%m-%d")
+    notion = Client(auth=NOTION_API_KEY, base_url=NOTION_BASE_URL)
     
-    notion = Client(auth=NOTION_API_KEY)
-    block_size = 2000  # Notion's character limit per block
-    
-    # Split content into chunks
-    content_chunks = [content[i:i+block_size] for i in range(0, len(content), block_size)]
-    logger.debug(f"Split content into {len(content_chunks)} chunks")
+    try:
+        with timed("notion_publish"):
+            outcome = notion_writer.write(notion, title, content, date, source)
+        logger.info(f"Notion publish to page {NOTION_PAGE_ID}: {outcome}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to publish to Notion: {str(e)}")
+        metrics.increment("stage_errors", stage="notion_publish")
+        return False
+
+async def apublish_to_notion(title: str, content: str, date: str = None, source: str = "Human Rights LLM Agent"):
+    """
+    Async variant of publish_to_notion using notion_client.AsyncClient.
+    """
+    logger.info(f"Publishing to Notion with title: {title}, content length: {len(content)}")
+    notion = AsyncClient(auth=NOTION_API_KEY, base_url=NOTION_BASE_URL)
     
     try:
-        children = [
-            {
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": [{"type": "text", "text": {"content": title}}]
-                }
-            },
-            {
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [{"type": "text", "text": {"content": f"Date: {date} | Source: {source}"}}]
-                }
-            }
-        ]
-        for chunk in content_chunks:
-            children.append({
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [{"type": "text", "text": {"content": chunk}}]
-                }
-            })
-        
-        response = notion.blocks.children.append(
-            block_id=NOTION_PAGE_ID,
-            children=children
-        )
-        logger.info(f"Successfully published to Notion page {NOTION_PAGE_ID}: {response}")
+        with timed("notion_publish"):
+            outcome = await notion_writer.awrite(notion, title, content, date, source)
+        logger.info(f"Notion publish to page {NOTION_PAGE_ID}: {outcome}")
         return True
     except Exception as e:
         logger.error(f"Failed to publish to Notion: {str(e)}")
+        metrics.increment("stage_errors", stage="notion_publish")
         return False
+    finally:
+        await notion.aclose()
+
+def append_to_notion(title: str, content: str, date: str = None, source: str = "Human Rights LLM Agent",
+                     limiter=None):
+    """
+    Append a report to the Notion page and raise on failure. Used by the Notion outbox,
+    which owns retries and rate limiting (limiter is waited on before every append), so the
+    client's own retry is disabled. A retry resumes after the last batch that went through.
+    """
+    logger.info(f"Publishing to Notion with title: {title}, content length: {len(content)}")
+    notion = Client(auth=NOTION_API_KEY, base_url=NOTION_BASE_URL, retry=False)
+    with timed("notion_publish"):
+        return notion_writer.write(notion, title, content, date, source, limiter=limiter)
 
 # CLI entry
 if __name__ == "__main__":
@@ -0,0 +1,222 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: async_routes.py
+Description: Async (ASGI) routes for the Human Rights LLM. Generations, embeddings and Notion calls are awaited on one event loop instead of holding a Flask worker thread each.
+
+Run with:
+    uvicorn backend.async_routes:app --port 5002
+"""
+
+import os
+import sys
+import json
+import asyncio
+import logging
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse, PlainTextResponse
+from starlette.routing import Route
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from backend.agent.notion_react_agent import arun_agent, apublish_to_notion
+from backend.core.rag_chain import arun_rag_chain, astream_rag_chain
+from backend.core import vector_store
+from backend.core.metrics import metrics
+from backend.core.single_flight import AsyncSingleFlight
+from backend.core.embedding_cache import normalize_query
+from backend.core.notion_outbox import get_outbox
+from backend.core.sse import sse_event
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Shared with the Flask app through core: reports queue in the same SQLite outbox
+notion_outbox = get_outbox()
+
+
+async def _query_from(request: Request):
+    try:
+        data = await request.json()
+    except (json.JSONDecodeError, ValueError):
+        data = {}
+    return (data or {}).get('query') or request.query_params.get('query')
+
+
+# Identical in-flight /api/agent questions share one agent run and one Notion page
+agent_flight = AsyncSingleFlight("agent")
+
+# How often a waiting /api/agent request checks whether its client is still connected
+DISCONNECT_POLL_S = float(os.getenv("DISCONNECT_POLL_S", 1.0))
+
+
+async def _cancel_on_disconnect(request: Request, awaitable):
+    """
+    Await awaitable, cancelling it if the client disconnects first. Cancellation
+    reaches the agent's in-flight Ollama request and closes it. Returns (done, result).
+    """
+    task = asyncio.ensure_future(awaitable)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_S)
+        if done:
+            return True, task.result()
+        if await request.is_disconnected():
+            task.cancel()
+            return False, None
+
+
+async def agent_endpoint(request: Request):
+    """
+    Async /api/agent: same request/response contract as the Flask route.
+    """
+    logger.info("Received request to /api/agent")
+    user_query = await _query_from(request)
+    if not user_query:
+        logger.error("Missing query parameter")
+        return JSONResponse({'error': 'Missing query parameter'}, status_code=400)
+    try:
+        logger.info(f"API query: {user_query}")
+        finished, flight_result = await _cancel_on_disconnect(
+            request, agent_flight.do(normalize_query(user_query), _run_agent_and_publish, user_query))
+        if not finished:
+            logger.info(f"Client disconnected, cancelled agent run for: {user_query}")
+            metrics.increment("agent_requests", outcome="disconnected")
+            return JSONResponse({'error': 'Client disconnected', 'status': 'error'}, status_code=499)
+        outcome, coalesced = flight_result
+        metrics.increment("agent_requests", outcome="coalesced" if coalesced else "executed")
+        return JSONResponse({**outcome, 'coalesced': coalesced, 'status': 'success'})
+    except Exception as e:
+        logger.error(f"Agent error: {str(e)}")
+        return JSONResponse({'error': f'Agent error: {str(e)}', 'status': 'error'}, status_code=500)
+
+
+async def _run_agent_and_publish(user_query: str) -> dict:
+    result = await arun_agent(user_query)
+    response_text = result['output'] if isinstance(result, dict) and 'output' in result else str(result)
+
+    title = f"Human Rights Report: {user_query.title()}" if "report" in user_query.lower() else f"Summary: {user_query.title()}"
+    logger.info(f"Attempting to publish to Notion with title: {title}")
+    notion_success, publish_id = None, None
+    if notion_outbox is not None:
+        publish_id = await asyncio.to_thread(notion_outbox.enqueue, title, response_text,
+                                             datetime.now().strftime("%Y-%m-%d"), "Human Rights LLM Agent")
+    else:
+        notion_success = await apublish_to_notion(
+            title=title,
+            content=response_text,
+            date=datetime.now().strftime("%Y-%m-%d"),
+            source="Human Rights LLM Agent"
+        )
+    result = result if isinstance(result, dict) else {}
+    return {'result': response_text, 'notion_success': notion_success, 'publish_id': publish_id,
+            'route': result.get('route'),
+            'cached': bool(result.get('cached')), 'partial': bool(result.get('partial')),
+            'budget': result.get('budget')}
+
+
+async def rag_endpoint(request: Request):
+    """
+    Answer one question with the RAG chain (no agent, no Notion).
+    Returns JSON with 'result'.
+    """
+    user_query = await _query_from(request)
+    if not user_query:
+        logger.error("Missing query parameter")
+        return JSONResponse({'error': 'Missing query parameter'}, status_code=400)
+    try:
+        return JSONResponse({'result': await arun_rag_chain(user_query), 'status': 'success'})
+    except Exception as e:
+        logger.error(f"RAG error: {str(e)}")
+        return JSONResponse({'error': f'RAG error: {str(e)}', 'status': 'error'}, status_code=500)
+
+
+async def rag_stream_endpoint(request: Request):
+    """
+    Async /api/rag/stream: same Server-Sent Events contract as the Flask route.
+    """
+    user_query = await _query_from(request)
+    if not user_query:
+        logger.error("Missing query parameter")
+        return JSONResponse({'error': 'Missing query parameter'}, status_code=400)
+    logger.info(f"Streaming query: {user_query}")
+
+    async def generate():
+        stats = {}
+        try:
+            async for chunk in astream_rag_chain(user_query, stats=stats):
+                yield sse_event('token', {'text': chunk})
+            yield sse_event('done', stats)
+        except Exception as e:
+            logger.error(f"Streaming error: {str(e)}")
+            yield sse_event('error', {'error': f'Streaming error: {str(e)}'})
+
+    return StreamingResponse(generate(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+async def notion_publish_status(request: Request):
+    """
+    Status of one queued Notion publish (same contract as the Flask route).
+    """
+    publish_id = request.path_params['publish_id']
+    entry = await asyncio.to_thread(notion_outbox.get, publish_id) if notion_outbox is not None else None
+    if entry is None:
+        return JSONResponse({'error': f'Unknown publish id {publish_id}', 'status': 'error'}, status_code=404)
+    return JSONResponse({'publish': entry, 'status': 'success'})
+
+
+async def health(request: Request):
+    """
+    Report whether the vector store and embedding model are warmed up.
+    """
+    status = vector_store.get_status()
+    return JSONResponse({'status': 'ready' if status['ready'] else 'starting', 'vector_store': status},
+                        status_code=200 if status['ready'] else 503)
+
+
+async def metrics_endpoint(request: Request):
+    """
+    Per-stage latency histograms with p50/p95/p99 in Prometheus text format.
+    """
+    return PlainTextResponse(metrics.prometheus_text(), media_type='text/plain; version=0.0.4')
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Load the index and embedding model off the event loop so startup isn't blocked
+    warmup = asyncio.create_task(asyncio.to_thread(vector_store.warmup))
+    yield
+    await warmup
+
+
+app = Starlette(
+    routes=[
+        Route('/api/agent', agent_endpoint, methods=['POST']),
+        Route('/api/rag', rag_endpoint, methods=['POST']),
+        Route('/api/rag/stream', rag_stream_endpoint, methods=['GET', 'POST']),
+        Route('/api/notion/publish/{publish_id:int}', notion_publish_status, methods=['GET']),
+        Route('/api/health', health, methods=['GET']),
+        Route('/api/metrics', metrics_endpoint, methods=['GET']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan,
+)
+
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(os.environ.get('ASYNC_PORT', 5002))
+    logger.info(f"Starting async Human Rights LLM API on port {port}")
+    uvicorn.run(app, host='0.0.0.0', port=port)
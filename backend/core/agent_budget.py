@@ -0,0 +1,141 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: agent_budget.py
+Description: Per-run wall-clock, LLM-call and token budgets for the agent, enforced from a LangChain callback, with the best tool output so far kept as a partial result.
+"""
+
+import os
+import time
+import threading
+import logging
+from langchain_core.callbacks import BaseCallbackHandler
+from .metrics import _ollama_timings
+
+logger = logging.getLogger(__name__)
+
+# Defaults leave headroom under the frontend's 120 s request timeout
+AGENT_MAX_WALL_S = float(os.getenv("AGENT_MAX_WALL_S", 110))
+AGENT_MAX_LLM_CALLS = int(os.getenv("AGENT_MAX_LLM_CALLS", 12))
+AGENT_MAX_TOKENS = int(os.getenv("AGENT_MAX_TOKENS", 32000))
+
+# Tool outputs worth returning as a partial result, most useful first
+PARTIAL_RESULT_TOOLS = ("summarize_with_context", "generate_report_tool", "summarize_llm_only",
+                        "search_rag_data", "retrieve_rag_context")
+
+
+class BudgetExceeded(Exception):
+    """Raised from the budget callback to stop the agent run."""
+
+
+class AgentBudget(BaseCallbackHandler):
+    """
+    Counts wall time, LLM calls and tokens (prompt + completion, from Ollama's counts,
+    plus streamed chunks of the call in flight) across every LLM and tool run it is attached to.
+    Checks happen at each LLM/tool start and on every streamed token, so an over-budget
+    generation is aborted mid-stream and Ollama's connection closed. Once exceeded it stays
+    exceeded, so any later step stops immediately.
+    cancelled, if given, is polled at the same points; when it returns True (e.g. the client
+    disconnected) the run stops with reason "cancelled".
+    """
+
+    raise_error = True
+
+    def __init__(self, max_wall_s: float = AGENT_MAX_WALL_S, max_llm_calls: int = AGENT_MAX_LLM_CALLS,
+                 max_tokens: int = AGENT_MAX_TOKENS, cancelled=None):
+        self.max_wall_s = max_wall_s
+        self.max_llm_calls = max_llm_calls
+        self.max_tokens = max_tokens
+        self.cancelled = cancelled
+        self.started = time.perf_counter()
+        self.llm_calls = 0
+        self.tokens = 0
+        self.exceeded = None
+        self.reason = None
+        self._streamed = {}
+        self._tools = {}
+        self._outputs = {}
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return max(0.0, self.max_wall_s - (time.perf_counter() - self.started))
+
+    def _check(self):
+        if self.exceeded is None:
+            if self.cancelled is not None and self.cancelled():
+                self.expire("cancelled")
+            elif self.remaining() <= 0:
+                self.expire("wall_time")
+            elif self.llm_calls > self.max_llm_calls:
+                self.expire("llm_calls")
+            elif self.tokens + sum(self._streamed.values()) > self.max_tokens:
+                self.expire("tokens")
+        if self.exceeded:
+            raise BudgetExceeded(self.exceeded)
+
+    def expire(self, reason: str):
+        """Mark the budget exhausted; reason is wall_time, llm_calls, tokens or cancelled."""
+        if self.exceeded is None:
+            limit = {"wall_time": f"wall time {self.max_wall_s:.0f}s", "llm_calls": f"{self.max_llm_calls} LLM calls",
+                     "tokens": f"{self.max_tokens} tokens", "cancelled": "run cancelled"}
+            self.reason, self.exceeded = reason, limit[reason]
+            logger.warning(f"Agent budget exceeded: {self.exceeded}")
+
+    def _llm_start(self, run_id):
+        with self._lock:
+            self.llm_calls += 1
+            self._streamed[run_id] = 0
+            self._check()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._llm_start(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._llm_start(run_id)
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        with self._lock:
+            self._streamed[run_id] = self._streamed.get(run_id, 0) + 1
+            self._check()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        info = _ollama_timings(response)
+        with self._lock:
+            streamed = self._streamed.pop(run_id, 0)
+            self.tokens += (info.get("prompt_eval_count") or 0) + (info.get("eval_count") or streamed)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            self.tokens += self._streamed.pop(run_id, 0)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        with self._lock:
+            self._tools[run_id] = (serialized or {}).get("name")
+            self._check()
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        with self._lock:
+            name = self._tools.pop(run_id, None)
+            text = getattr(output, "content", output)
+            usable = isinstance(text, str) and text and not text.startswith(("Error", "No relevant documents"))
+            if name in PARTIAL_RESULT_TOOLS and usable:
+                self._outputs[name] = text
+
+    def best_output(self):
+        """(tool name, output) of the most useful tool that finished, or (None, None)."""
+        with self._lock:
+            for name in PARTIAL_RESULT_TOOLS:
+                if name in self._outputs:
+                    return name, self._outputs[name]
+        return None, None
+
+    def usage(self) -> dict:
+        with self._lock:
+            return {
+                "exceeded": self.exceeded,
+                "reason": self.reason,
+                "elapsed_s": round(time.perf_counter() - self.started, 2),
+                "llm_calls": self.llm_calls,
+                "tokens": self.tokens + sum(self._streamed.values()),
+            }
@@ -0,0 +1,157 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: answer_cache.py
+Description: Semantic answer cache for the RAG chain. Returns a stored answer when a new question embeds close to one already answered on the same corpus version and about the same countries and year.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+import numpy as np
+from .query_filters import detect_filters
+from .paths import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Cache settings
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "True").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.95))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", 24 * 60 * 60))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 500))
+
+
+class SemanticAnswerCache:
+    """
+    Stores answered questions with their embeddings in SQLite.
+    Lookups match on cosine similarity >= threshold, same model, same corpus version and the same
+    detected country/year filters: template questions that differ only in country or year embed
+    almost identically, so similarity alone would serve an answer about the wrong country.
+    Entries expire after ttl seconds; the least recently used are evicted past max_entries.
+    """
+
+    def __init__(self, db_path: Path = DB_PATH, threshold: float = ANSWER_CACHE_THRESHOLD,
+                 ttl: int = ANSWER_CACHE_TTL, max_entries: int = ANSWER_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.latency_saved = 0.0
+        self._init_table()
+
+    def _init_table(self):
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS answer_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                question TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                answer TEXT NOT NULL,
+                model TEXT NOT NULL,
+                corpus_version INTEGER NOT NULL,
+                generation_latency REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_hit_at REAL,
+                hits INTEGER DEFAULT 0,
+                filters TEXT
+            )
+            """)
+            # Caches created before filters were keyed get the column; their rows (NULL) never match
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(answer_cache)")]
+            if "filters" not in columns:
+                conn.execute("ALTER TABLE answer_cache ADD COLUMN filters TEXT")
+            conn.commit()
+
+    @staticmethod
+    def filter_key(question: str) -> str:
+        """Country and year detected in the question, e.g. "country=iran|year=2022" ("" when none)."""
+        filters = detect_filters(question)
+        parts = []
+        if filters.get("country"):
+            parts.append("country=" + ",".join(sorted(filters["country"])))
+        if filters.get("year"):
+            parts.append(f"year={filters['year']}")
+        return "|".join(parts)
+
+    def lookup(self, question: str, embedding: list[float], model: str, corpus_version: int):
+        """
+        Return the closest cached entry as a dict (question, answer, similarity, generation_latency)
+        or None if nothing is within the threshold.
+        """
+        with self._lock:
+            self.lookups += 1
+
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute("""
+                SELECT id, question, embedding, answer, generation_latency FROM answer_cache
+                WHERE model = ? AND corpus_version = ? AND filters = ? AND created_at >= ?
+            """, (model, corpus_version, self.filter_key(question), time.time() - self.ttl)).fetchall()
+        if not rows:
+            return None
+
+        query = np.asarray(embedding, dtype=np.float32)
+        matrix = np.vstack([np.frombuffer(row[2], dtype=np.float32) for row in rows])
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        similarities = (matrix @ query) / np.where(norms == 0, 1.0, norms)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+
+        entry_id, question, _, answer, generation_latency = rows[best]
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "UPDATE answer_cache SET hits = hits + 1, last_hit_at = ? WHERE id = ?",
+                (time.time(), entry_id)
+            )
+            conn.commit()
+        with self._lock:
+            self.hits += 1
+        return {
+            "question": question,
+            "answer": answer,
+            "similarity": float(similarities[best]),
+            "generation_latency": generation_latency,
+        }
+
+    def store(self, question: str, embedding: list[float], answer: str, model: str,
+              corpus_version: int, generation_latency: float):
+        """Insert a fresh answer, then drop expired and least recently used entries."""
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT INTO answer_cache (question, embedding, answer, model, corpus_version, generation_latency,
+                                          created_at, filters)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (question, np.asarray(embedding, dtype=np.float32).tobytes(), answer, model,
+                  corpus_version, generation_latency, now, self.filter_key(question)))
+            conn.execute("DELETE FROM answer_cache WHERE created_at < ?", (now - self.ttl,))
+            conn.execute("""
+                DELETE FROM answer_cache WHERE id NOT IN (
+                    SELECT id FROM answer_cache
+                    ORDER BY COALESCE(last_hit_at, created_at) DESC
+                    LIMIT ?
+                )
+            """, (self.max_entries,))
+            conn.commit()
+
+    def record_saved(self, seconds: float):
+        with self._lock:
+            self.latency_saved += max(seconds, 0.0)
+
+    def get_stats(self) -> dict:
+        """Hit ratio and total generation time avoided by cache hits."""
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_ratio": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "latency_saved_s": round(self.latency_saved, 2),
+            }
@@ -0,0 +1,145 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: context_packer.py
+Description: Packs retrieved chunks into a fixed token budget for the prompt: merges overlapping neighbours, drops duplicates and fills in relevance order.
+"""
+
+import os
+import re
+import hashlib
+import logging
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# Prompt context budget in tokens (cl100k_base is used as an approximation of Mistral's tokenizer)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 1500))
+TOKENIZER_ENCODING = "cl100k_base"
+
+# Chunks whose word shingles overlap at least this much are treated as near duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.85
+# Smallest shared prefix/suffix (in characters) that counts as a splitter overlap
+MIN_OVERLAP_CHARS = 20
+MAX_OVERLAP_CHARS = 200
+# Don't bother adding a truncated block with less room than this
+MIN_BLOCK_TOKENS = 40
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception as e:
+            # The encoding file is downloaded on first use; fall back to a character estimate offline
+            logger.warning(f"tiktoken unavailable, estimating tokens from characters: {str(e)}")
+            _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoding = _get_encoding()
+    if encoding:
+        return encoding.decode(encoding.encode(text)[:max_tokens])
+    return text[:max_tokens * 4]
+
+
+def _normalized(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+def _shingles(text: str, size: int = 5) -> set:
+    words = _normalized(text).split()
+    return {" ".join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))}
+
+
+def _overlap(first: str, second: str) -> int:
+    """Length of the longest suffix of first that is a prefix of second."""
+    for size in range(min(len(first), len(second), MAX_OVERLAP_CHARS), MIN_OVERLAP_CHARS - 1, -1):
+        if first.endswith(second[:size]):
+            return size
+    return 0
+
+
+def _label(metadata: dict) -> str:
+    source = metadata.get("source", "Unknown")
+    title = metadata.get("title")
+    return f"{source}, {title}" if title else source
+
+
+def dedupe_and_merge(docs: list) -> list[dict]:
+    """
+    Collapse the ranked documents into passages.
+    Exact and near-duplicate chunks are dropped; a chunk that overlaps the start or
+    end of a kept passage from the same source/title is merged into it.
+    Returns dicts with "text" and "metadata", still in rank order.
+    """
+    passages = []
+    seen_hashes = set()
+    for doc in docs:
+        text = doc.page_content.strip()
+        if not text:
+            continue
+        digest = hashlib.sha1(_normalized(text).encode("utf-8")).hexdigest()
+        if digest in seen_hashes:
+            continue
+        seen_hashes.add(digest)
+
+        merged = False
+        shingles = _shingles(text)
+        for passage in passages:
+            if _label(passage["metadata"]) != _label(doc.metadata):
+                continue
+            if text in passage["text"]:
+                merged = True
+            elif _overlap(passage["text"], text):
+                passage["text"] += text[_overlap(passage["text"], text):]
+                merged = True
+            elif _overlap(text, passage["text"]):
+                passage["text"] = text + passage["text"][_overlap(text, passage["text"]):]
+                merged = True
+            else:
+                union = shingles | passage["shingles"]
+                if union and len(shingles & passage["shingles"]) / len(union) >= NEAR_DUPLICATE_THRESHOLD:
+                    merged = True
+            if merged:
+                passage["shingles"] = _shingles(passage["text"])
+                break
+        if not merged:
+            passages.append({"text": text, "metadata": doc.metadata, "shingles": shingles})
+
+    return [{"text": p["text"], "metadata": p["metadata"]} for p in passages]
+
+
+def pack_context(docs: list, token_budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """
+    Build the prompt context from ranked Documents (best first) within token_budget.
+    Passages are added whole in rank order; the first one that doesn't fit is
+    truncated to the remaining budget and packing stops.
+    """
+    blocks = []
+    remaining = token_budget
+    for passage in dedupe_and_merge(docs):
+        block = f"Source [{_label(passage['metadata'])}]:\n{passage['text']}"
+        tokens = count_tokens(block) + 2
+        if tokens <= remaining:
+            blocks.append(block)
+            remaining -= tokens
+            continue
+        if remaining >= MIN_BLOCK_TOKENS:
+            blocks.append(truncate_to_tokens(block, remaining - 2) + "...")
+        break
+
+    logger.debug(f"Packed {len(blocks)} passages into {token_budget - remaining}/{token_budget} tokens")
+    return "\n\n".join(blocks)
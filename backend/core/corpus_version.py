@@ -0,0 +1,46 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: corpus_version.py
+Description: Tracks a corpus version number that ingest bumps, so caches built on an older corpus can be ignored.
+"""
+
+import sqlite3
+from pathlib import Path
+from .paths import DB_PATH
+
+
+def init_corpus_table(db_path: Path = DB_PATH):
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS corpus_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        conn.commit()
+
+
+def get_corpus_version(db_path: Path = DB_PATH) -> int:
+    """Return the current corpus version (0 if ingest has never recorded one)."""
+    init_corpus_table(db_path)
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute("SELECT value FROM corpus_meta WHERE key = 'corpus_version'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def bump_corpus_version(db_path: Path = DB_PATH) -> int:
+    """Increment the corpus version after a re-embed and return the new value."""
+    init_corpus_table(db_path)
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute("SELECT value FROM corpus_meta WHERE key = 'corpus_version'").fetchone()
+        version = (int(row[0]) if row else 0) + 1
+        conn.execute("""
+        INSERT OR REPLACE INTO corpus_meta (key, value, updated_at)
+        VALUES ('corpus_version', ?, CURRENT_TIMESTAMP)
+        """, (str(version),))
+        conn.commit()
+    return version
@@ -0,0 +1,205 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: embedding_cache.py
+Description: Caches query embeddings in a bounded in-memory LRU with an optional SQLite tier so repeated questions skip the Ollama embedding call.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+import ollama
+from langchain_core.embeddings import Embeddings
+from .paths import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Cache settings
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 2048))
+EMBEDDING_CACHE_PERSIST = os.getenv("EMBEDDING_CACHE_PERSIST", "False").lower() == "true"
+# Concurrent Ollama requests when embed_queries has several cache misses
+EMBED_QUERY_CONCURRENCY = int(os.getenv("EMBED_QUERY_CONCURRENCY", 4))
+
+
+#Normalize query text so trivial differences share one cache entry
+def normalize_query(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embeddings client and caches embed_query results.
+    Keys are the normalized query text plus the embedding model name.
+    Document embeddings (ingest) are passed straight through.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, max_size: int = EMBEDDING_CACHE_SIZE,
+                 persist: bool = EMBEDDING_CACHE_PERSIST, db_path: Path = DB_PATH):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.max_size = max_size
+        self.persist = persist
+        self.db_path = db_path
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.persist:
+            self._init_table()
+
+    def _init_table(self):
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                model TEXT NOT NULL,
+                query TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (model, query)
+            )
+            """)
+            conn.commit()
+
+    def _load_from_disk(self, query: str):
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT embedding FROM embedding_cache WHERE model = ? AND query = ?",
+                (self.model_name, query)
+            ).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32).tolist()
+
+    def _save_to_disk(self, query: str, embedding: list[float]):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO embedding_cache (model, query, embedding) VALUES (?, ?, ?)",
+                (self.model_name, query, np.asarray(embedding, dtype=np.float32).tobytes())
+            )
+            conn.commit()
+
+    def _remember(self, key: str, embedding: list[float]):
+        with self._lock:
+            self._cache[key] = embedding
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def get_cached(self, text: str):
+        """Return the cached embedding for a query, or None. Updates the hit counters."""
+        key = normalize_query(text)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+
+        if self.persist:
+            try:
+                embedding = self._load_from_disk(key)
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache read failed: {str(e)}")
+                embedding = None
+            if embedding is not None:
+                self._remember(key, embedding)
+                with self._lock:
+                    self.disk_hits += 1
+                return embedding
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, text: str, embedding: list[float]):
+        """Store a query embedding in memory and, if enabled, on disk."""
+        key = normalize_query(text)
+        self._remember(key, embedding)
+        if self.persist:
+            try:
+                self._save_to_disk(key, embedding)
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache write failed: {str(e)}")
+
+    def embed_query(self, text: str) -> list[float]:
+        embedding = self.get_cached(text)
+        if embedding is None:
+            embedding = self.embeddings.embed_query(text)
+            self.put(text, embedding)
+        return embedding
+
+    async def aembed_query(self, text: str) -> list[float]:
+        """
+        Async embed_query. A cache miss awaits Ollama through ollama.AsyncClient
+        instead of holding a thread; it uses the same /api/embeddings endpoint and
+        query prefix as the sync client, so both paths cache identical vectors.
+        """
+        embedding = self.get_cached(text)
+        if embedding is None:
+            instruction = getattr(self.embeddings, "query_instruction", "") or ""
+            client = ollama.AsyncClient(host=getattr(self.embeddings, "base_url", None))
+            response = await client.embeddings(model=self.model_name, prompt=f"{instruction}{text}")
+            embedding = list(response["embedding"])
+            self.put(text, embedding)
+        return embedding
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed many queries at once. Cache hits are served locally and the
+        remaining unique queries are embedded concurrently.
+        """
+        results = [self.get_cached(text) for text in texts]
+        pending = {}
+        for i, embedding in enumerate(results):
+            if embedding is None:
+                pending.setdefault(normalize_query(texts[i]), []).append(i)
+        if not pending:
+            return results
+
+        to_embed = [texts[indexes[0]] for indexes in pending.values()]
+        embeddings = self._embed_query_batch(to_embed)
+        for indexes, text, embedding in zip(pending.values(), to_embed, embeddings):
+            self.put(text, embedding)
+            for i in indexes:
+                results[i] = embedding
+        return results
+
+    def _embed_query_batch(self, texts: list[str]) -> list[list[float]]:
+        # Each query goes through the wrapped client's embed_query (Ollama /api/embeddings),
+        # the endpoint ingest and single queries use. /api/embed would be one request but
+        # returns unit-normalized vectors, which rank differently in the L2 Chroma collection.
+        if len(texts) == 1:
+            return [self.embeddings.embed_query(texts[0])]
+        with ThreadPoolExecutor(max_workers=min(EMBED_QUERY_CONCURRENCY, len(texts))) as pool:
+            return list(pool.map(self.embeddings.embed_query, texts))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def get_stats(self) -> dict:
+        """Hit/miss counters for the query embedding cache."""
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                "model": self.model_name,
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.disk_hits) / total, 4) if total else 0.0,
+            }
+
+    def clear(self):
+        """Drop the in-memory entries and reset the counters."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.disk_hits = self.misses = 0
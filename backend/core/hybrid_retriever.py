@@ -0,0 +1,99 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: hybrid_retriever.py
+Description: BM25 search over the SQLite FTS5 chunk index and reciprocal-rank fusion with the Chroma vector ranking.
+"""
+
+import re
+import json
+import hashlib
+import sqlite3
+import logging
+from pathlib import Path
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Path definitions - the FTS index is written by ingest_documents.py
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+CHUNK_DB_PATH = BACKEND_ROOT / "db" / "documents.db"
+
+# Standard RRF damping constant
+RRF_K = 60
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "did", "do", "does", "for", "from", "how",
+    "in", "is", "it", "of", "on", "or", "the", "to", "was", "were", "what", "when", "where",
+    "which", "who", "why", "with", "about", "tell", "me", "there", "any", "has", "have",
+}
+
+
+#Build an FTS5 MATCH expression: quoted phrases stay phrases, other terms are OR'ed
+def build_fts_query(query: str) -> str:
+    phrases = re.findall(r'"([^"]+)"', query)
+    remainder = re.sub(r'"[^"]+"', " ", query)
+    terms = [t for t in re.findall(r"\w+", remainder.lower()) if t not in STOPWORDS]
+    parts = ['"' + " ".join(re.findall(r"\w+", phrase)) + '"' for phrase in phrases]
+    parts += [f'"{term}"' for term in terms]
+    return " OR ".join(p for p in parts if p != '""')
+
+
+#Lexical retriever
+def lexical_search(query: str, k: int = 5, filters: dict = None, db_path: Path = CHUNK_DB_PATH) -> list[tuple]:
+    """
+    BM25 search over the chunk FTS index.
+    filters (country, year, document_type) are matched against the stored chunk metadata.
+    Returns (Document, bm25_score) pairs; lower bm25 scores are better matches.
+    """
+    fts_query = build_fts_query(query)
+    if not fts_query or not Path(db_path).exists():
+        return []
+
+    clauses, params = ["chunks_fts MATCH ?"], [fts_query]
+    for key in ("country", "year", "document_type"):
+        value = (filters or {}).get(key)
+        if value is None or value == []:
+            continue
+        values = list(value) if isinstance(value, (list, tuple)) else [value]
+        clauses.append(f"json_extract(metadata, '$.{key}') IN ({', '.join('?' for _ in values)})")
+        params.extend(values)
+
+    try:
+        with sqlite3.connect(db_path) as conn:
+            rows = conn.execute(f"""
+                SELECT content, metadata, bm25(chunks_fts) AS score FROM chunks_fts
+                WHERE {" AND ".join(clauses)}
+                ORDER BY score
+                LIMIT ?
+            """, (*params, k)).fetchall()
+    except sqlite3.Error as e:
+        logger.warning(f"Lexical search failed: {str(e)}")
+        return []
+    return [(Document(page_content=content, metadata=json.loads(metadata)), score)
+            for content, metadata, score in rows]
+
+
+#Identity used to match the same chunk across rankings
+def chunk_key(doc: Document) -> str:
+    chunk_id = doc.metadata.get("chunk_id")
+    if chunk_id:
+        return chunk_id
+    return hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()[:16]
+
+
+def reciprocal_rank_fusion(rankings: list[list[Document]], k: int = 5, rrf_k: int = RRF_K) -> list[tuple]:
+    """
+    Fuse several ranked Document lists with RRF: score(d) = sum(1 / (rrf_k + rank)).
+    Returns the top-k (Document, fused_score) pairs, best first.
+    """
+    scores = {}
+    documents = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, 1):
+            key = chunk_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            documents.setdefault(key, doc)
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+    return [(documents[key], score) for key, score in fused]
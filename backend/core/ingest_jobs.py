@@ -0,0 +1,199 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: ingest_jobs.py
+Description: Runs the ingest pipeline as a background job with stage, counts, throughput and ETA parsed from progress lines the ingest scripts print, plus cancellation and coalescing of concurrent triggers.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import threading
+import subprocess
+import logging
+from collections import deque, OrderedDict
+from pathlib import Path
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# The ingest scripts resolve data/, logs/ and kaggle/ relative to the backend directory
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+INGEST_PIPELINE = BACKEND_ROOT / "ingest" / "run_ingest_pipeline.py"
+
+# Finished jobs kept for status queries
+INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", 20))
+# Output lines kept per job for the status endpoint
+INGEST_LOG_TAIL = int(os.getenv("INGEST_LOG_TAIL", 50))
+
+PROGRESS_PREFIX = "PROGRESS "
+
+
+def report_progress(stage: str, done: int = None, total: int = None, **counts):
+    """
+    Print one machine-readable progress line for the job runner, e.g.
+    report_progress("embed", done=512, total=4096, chunks_embedded=512).
+    done/total describe the current stage; counts are cumulative job counters.
+    """
+    print(PROGRESS_PREFIX + json.dumps({"stage": stage, "done": done, "total": total, **counts}), flush=True)
+
+
+class IngestJob:
+    """State of one ingest run, updated from the pipeline's output."""
+
+    def __init__(self, command: list):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.command = command
+        self.status = "running"
+        self.stage = "starting"
+        self.stage_done = None
+        self.stage_total = None
+        self.stage_started = time.time()
+        self.stage_baseline = 0
+        self.counts = {}
+        self.started_at = time.time()
+        self.finished_at = None
+        self.returncode = None
+        self.error = None
+        self.log = deque(maxlen=INGEST_LOG_TAIL)
+        self.version = 0
+        self.process = None
+        self.changed = threading.Condition()
+
+    def _update(self, **fields):
+        with self.changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version += 1
+            self.changed.notify_all()
+
+    def apply_progress(self, progress: dict):
+        stage = progress.pop("stage")
+        done, total = progress.pop("done", None), progress.pop("total", None)
+        fields = {"stage_done": done, "stage_total": total, "counts": {**self.counts, **progress}}
+        if stage != self.stage:
+            # Throughput counts from the stage's first report, not from when the previous stage ended
+            fields.update(stage=stage, stage_started=time.time(), stage_baseline=done or 0)
+        self._update(**fields)
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+    def snapshot(self) -> dict:
+        """Status for the API: stage, counts, throughput (items/s in this stage) and ETA."""
+        with self.changed:
+            now = self.finished_at or time.time()
+            progressed = (self.stage_done or 0) - self.stage_baseline
+            stage_elapsed = now - self.stage_started
+            throughput = progressed / stage_elapsed if progressed > 0 and stage_elapsed > 0 else None
+            eta = None
+            if self.running and throughput and self.stage_total:
+                eta = round(max(self.stage_total - self.stage_done, 0) / throughput, 1)
+            return {
+                "job_id": self.job_id,
+                "status": self.status,
+                "stage": self.stage,
+                "stage_done": self.stage_done,
+                "stage_total": self.stage_total,
+                "counts": dict(self.counts),
+                "throughput_per_s": round(throughput, 2) if throughput else None,
+                "eta_s": eta,
+                "elapsed_s": round(now - self.started_at, 1),
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "returncode": self.returncode,
+                "error": self.error,
+                "log_tail": list(self.log)[-10:],
+                "version": self.version,
+            }
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """Block until the job changes past version (or timeout); returns the current version."""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+
+class IngestJobManager:
+    """
+    One ingest at a time: start() while a job runs returns that job instead of a new one.
+    The pipeline runs as a subprocess in its own process group so cancel() stops the
+    scraper/ingest scripts it spawns as well.
+    """
+
+    def __init__(self, command: list = None, history: int = INGEST_JOB_HISTORY):
+        self.command = command or [sys.executable, str(INGEST_PIPELINE)]
+        self.history = history
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self) -> tuple:
+        """Start an ingest job. Returns (job, created); created is False when one was already running."""
+        with self._lock:
+            current = next((job for job in reversed(self.jobs.values()) if job.running), None)
+            if current is not None:
+                logger.info(f"Ingest job {current.job_id} already running, coalescing trigger")
+                return current, False
+            job = IngestJob(self.command)
+            self.jobs[job.job_id] = job
+            while len(self.jobs) > self.history:
+                self.jobs.popitem(last=False)
+            env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+            job.process = subprocess.Popen(
+                self.command, cwd=BACKEND_ROOT, env=env, text=True, bufsize=1,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, start_new_session=True
+            )
+        logger.info(f"Started ingest job {job.job_id} (pid {job.process.pid})")
+        threading.Thread(target=self._follow, args=(job,), name=f"ingest-{job.job_id}", daemon=True).start()
+        return job, True
+
+    def get(self, job_id: str):
+        return self.jobs.get(job_id)
+
+    def latest(self):
+        return next(reversed(self.jobs.values()), None)
+
+    def _follow(self, job: IngestJob):
+        for line in job.process.stdout:
+            line = line.rstrip("\n")
+            if line.startswith(PROGRESS_PREFIX):
+                try:
+                    job.apply_progress(json.loads(line[len(PROGRESS_PREFIX):]))
+                    continue
+                except (ValueError, KeyError):
+                    pass
+            if line:
+                with job.changed:
+                    job.log.append(line)
+        returncode = job.process.wait()
+        if job.status == "cancelled":
+            job._update(returncode=returncode, finished_at=time.time())
+        elif returncode == 0:
+            job._update(status="succeeded", stage="done", returncode=returncode, finished_at=time.time())
+        else:
+            job._update(status="failed", returncode=returncode, finished_at=time.time(),
+                        error=job.log[-1] if job.log else f"exit code {returncode}")
+        metrics.increment("ingest_jobs", outcome=job.status)
+        metrics.observe("ingest_job", time.time() - job.started_at)
+        logger.info(f"Ingest job {job.job_id} {job.status} after {time.time() - job.started_at:.0f}s")
+
+    def cancel(self, job_id: str) -> bool:
+        """Stop a running job and everything it spawned. Returns False if it was not running."""
+        job = self.jobs.get(job_id)
+        if job is None or not job.running:
+            return False
+        job._update(status="cancelled")
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(job.process.pid, signal.SIGTERM)
+            else:
+                job.process.terminate()
+        except ProcessLookupError:
+            pass
+        logger.info(f"Cancelled ingest job {job_id}")
+        return True
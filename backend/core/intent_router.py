@@ -0,0 +1,140 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: intent_router.py
+Description: Classifies agent queries with keyword rules plus a nearest-centroid embedding classifier so clear intents run their tool sequence directly instead of through the ReAct planning loop.
+"""
+
+import os
+import re
+import threading
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Route clear intents directly; ambiguous queries still go to the ReAct agent
+INTENT_ROUTER = os.getenv("INTENT_ROUTER", "True").lower() == "true"
+
+# Embedding classifier acceptance: best centroid similarity and lead over the runner-up
+ROUTER_MIN_SIMILARITY = float(os.getenv("ROUTER_MIN_SIMILARITY", 0.75))
+ROUTER_MIN_MARGIN = float(os.getenv("ROUTER_MIN_MARGIN", 0.05))
+
+# Tool sequences, mirroring the routing rules in the agent prompt
+INTENT_TOOLS = {
+    "report": ["retrieve_rag_context", "summarize_with_context"],
+    "rag_sources": ["retrieve_rag_context", "summarize_with_context"],
+    "quick_summary": ["summarize_llm_only"],
+}
+
+# Intents the classifier recognises but leaves to the ReAct agent. Plain questions (search_rag_data)
+# need their own centroid, or the nearest routed intent would claim them
+AGENT_INTENTS = ("qa",)
+
+INTENT_RULES = {
+    "report": re.compile(r"\b(full|detailed|comprehensive|in-depth)\s+report\b|\breport\s+(on|about)\b|\bwrite\s+(me\s+)?a\s+report\b", re.I),
+    "rag_sources": re.compile(r"\b(rag|sources?|citations?|cite|documents?)\b|\bwhat does the (rag|data)\b|\bstate department\b", re.I),
+    "quick_summary": re.compile(r"\b(summari[sz]e|summary|brief|quick|overview)\b", re.I),
+}
+
+INTENT_EXAMPLES = {
+    "report": [
+        "Write me a detailed report on human rights violations in Iran",
+        "Full report on the human rights situation in Syria",
+        "Create a comprehensive human rights report about North Korea",
+        "I need an in-depth report on torture and arbitrary detention in Venezuela",
+    ],
+    "rag_sources": [
+        "What does the RAG data say about human rights in Iran",
+        "What do the State Department reports say about press freedom in Russia",
+        "Show me the sources on religious persecution in China",
+        "Which documents mention forced labor in Eritrea",
+    ],
+    "quick_summary": [
+        "Summarize human rights in Iran",
+        "Give me a quick overview of the human rights situation in Cuba",
+        "Brief summary of freedom of expression in Belarus",
+        "In a few sentences, how are minorities treated in Myanmar",
+    ],
+    "qa": [
+        "How are journalists treated in Iran",
+        "Are there reports of torture in Egyptian prisons",
+        "What happened to protesters in Belarus in 2020",
+        "Does Saudi Arabia allow freedom of religion",
+    ],
+}
+
+# ReAct spends one planning call per tool step plus one for the final answer
+def react_llm_calls(intent: str) -> int:
+    return len(INTENT_TOOLS[intent]) + 1
+
+
+_lock = threading.Lock()
+_centroids = None
+
+
+def _embed(texts: list[str]) -> list[list[float]]:
+    from .vector_store import get_embeddings
+    return get_embeddings().embed_queries(texts)
+
+
+def _embed_query(query: str) -> list[float]:
+    # Same call (and cache entry) as retrieval, so the routed tool reuses this vector
+    from .vector_store import get_embeddings
+    return get_embeddings().embed_query(query)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def get_centroids() -> dict:
+    """Unit-normalized mean embedding of each intent's examples, computed once."""
+    global _centroids
+    if _centroids is None:
+        with _lock:
+            if _centroids is None:
+                intents = list(INTENT_EXAMPLES)
+                texts = [text for intent in intents for text in INTENT_EXAMPLES[intent]]
+                embeddings = _normalize(np.asarray(_embed(texts), dtype=np.float32))
+                centroids, start = {}, 0
+                for intent in intents:
+                    end = start + len(INTENT_EXAMPLES[intent])
+                    centroids[intent] = _normalize(embeddings[start:end].mean(axis=0))
+                    start = end
+                _centroids = centroids
+    return _centroids
+
+
+def match_rules(query: str) -> list[str]:
+    return [intent for intent, pattern in INTENT_RULES.items() if pattern.search(query)]
+
+
+def classify_intent(query: str) -> dict:
+    """
+    Classify a query as one of INTENT_TOOLS or None (ambiguous or an AGENT_INTENTS question, use ReAct).
+    A single keyword-rule match wins outright; no match or several matches are
+    settled by the embedding classifier among the candidates.
+    Returns {"intent", "source" ("rules" | "embedding" | None), "similarity", "margin"};
+    embedding results also carry "nearest", the closest intent whether or not it was accepted.
+    """
+    candidates = match_rules(query)
+    if len(candidates) == 1:
+        return {"intent": candidates[0], "source": "rules", "similarity": None, "margin": None}
+
+    try:
+        centroids = get_centroids()
+        query_embedding = _normalize(np.asarray(_embed_query(query), dtype=np.float32))
+    except Exception as e:
+        logger.warning(f"Intent embedding failed, falling back to the agent: {str(e)}")
+        return {"intent": None, "source": None, "similarity": None, "margin": None}
+
+    scores = sorted(((float(centroids[intent] @ query_embedding), intent) for intent in (candidates or centroids)),
+                    reverse=True)
+    best, intent = scores[0]
+    margin = best - scores[1][0] if len(scores) > 1 else 1.0
+    accepted = best >= ROUTER_MIN_SIMILARITY and margin >= ROUTER_MIN_MARGIN and intent not in AGENT_INTENTS
+    return {"intent": intent if accepted else None, "source": "embedding" if accepted else None,
+            "similarity": round(best, 4), "margin": round(margin, 4), "nearest": intent}
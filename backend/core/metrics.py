@@ -0,0 +1,208 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: metrics.py
+Description: In-process latency histograms per pipeline stage (embedding, search, packing, LLM prefill/decode, tools, Notion) with p50/p95/p99, exported in Prometheus text format.
+"""
+
+import os
+import time
+import threading
+import logging
+import bisect
+from collections import deque
+from contextlib import contextmanager
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "hr_llm"
+
+# Histogram bucket upper bounds in seconds; LLM stages run to minutes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Recent samples kept per stage for the p50/p95/p99 estimates
+QUANTILE_WINDOW = int(os.getenv("METRICS_QUANTILE_WINDOW", 1024))
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """Cumulative bucket counts plus a sliding window of recent samples for quantiles."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS, window: int = QUANTILE_WINDOW):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class MetricsRegistry:
+    """Thread-safe registry of per-stage latency histograms and counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            self.histograms.setdefault(stage, LatencyHistogram()).observe(seconds)
+
+    def increment(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def mean(self, stage: str, default: float = None) -> float:
+        """Mean latency of a stage, or default when it has no samples yet."""
+        with self._lock:
+            h = self.histograms.get(stage)
+            return h.sum / h.count if h and h.count else default
+
+    def snapshot(self) -> dict:
+        """count/sum/p50/p95/p99 per stage, for logs and JSON."""
+        with self._lock:
+            return {
+                stage: {
+                    "count": h.count,
+                    "sum_s": round(h.sum, 4),
+                    **{f"p{int(q * 100)}_s": round(h.quantile(q), 4) for q in QUANTILES},
+                }
+                for stage, h in sorted(self.histograms.items())
+            }
+
+    def prometheus_text(self) -> str:
+        """Render every histogram, quantile and counter in the Prometheus text exposition format."""
+        name = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines = [f"# HELP {name} Latency of each pipeline stage.", f"# TYPE {name} histogram"]
+        quantile_lines = []
+        with self._lock:
+            for stage, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+                for q in QUANTILES:
+                    quantile_lines.append(f'{name}_quantile{{stage="{stage}",quantile="{q}"}} {h.quantile(q):.6f}')
+            counters = sorted(self.counters.items())
+
+        lines += [f"# HELP {name}_quantile p50/p95/p99 over the last {QUANTILE_WINDOW} samples per stage.",
+                  f"# TYPE {name}_quantile gauge"] + quantile_lines
+        seen = set()
+        for (counter, labels), value in counters:
+            full_name = f"{METRIC_PREFIX}_{counter}_total"
+            if full_name not in seen:
+                lines.append(f"# TYPE {full_name} counter")
+                seen.add(full_name)
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+            lines.append(f"{full_name}{{{label_text}}} {value}" if label_text else f"{full_name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+# Process-wide registry used by the pipeline and the /api/metrics route
+metrics = MetricsRegistry()
+timed = metrics.timer
+
+
+def _ollama_timings(response) -> dict:
+    # Ollama reports durations in nanoseconds on the final chunk; langchain_community's
+    # ChatOllama puts them in generation_info, langchain_ollama in response_metadata
+    for generations in response.generations:
+        for generation in generations:
+            info = dict(generation.generation_info or {})
+            message = getattr(generation, "message", None)
+            info.update(getattr(message, "response_metadata", None) or {})
+            if "eval_duration" in info or "prompt_eval_duration" in info:
+                return info
+    return {}
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Records LLM wall time, Ollama prefill (prompt_eval_duration) and decode (eval_duration)
+    time and token counts, and the duration of every agent tool call.
+    LLMs tagged "react_planner" (the agent's own model) are also timed as llm_react_planner.
+    """
+
+    def __init__(self, registry: MetricsRegistry = metrics):
+        self.registry = registry
+        self._starts = {}
+
+    def _start(self, run_id, *labels: str):
+        self._starts[run_id] = (labels, time.perf_counter())
+
+    def _end(self, run_id):
+        labels, start = self._starts.pop(run_id, ((), None))
+        for label in labels:
+            self.registry.observe(label, time.perf_counter() - start)
+
+    def _llm_labels(self, tags) -> tuple:
+        return ("llm_total", "llm_react_planner") if "react_planner" in (tags or []) else ("llm_total",)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, tags=None, **kwargs):
+        self._start(run_id, *self._llm_labels(tags))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, tags=None, **kwargs):
+        self._start(run_id, *self._llm_labels(tags))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+        info = _ollama_timings(response)
+        if info.get("prompt_eval_duration"):
+            self.registry.observe("llm_prefill", info["prompt_eval_duration"] / 1e9)
+        if info.get("eval_duration"):
+            self.registry.observe("llm_decode", info["eval_duration"] / 1e9)
+        if info.get("load_duration"):
+            self.registry.observe("llm_load", info["load_duration"] / 1e9)
+        model = info.get("model", "unknown")
+        self.registry.increment("llm_prompt_tokens", info.get("prompt_eval_count") or 0, model=model)
+        self.registry.increment("llm_completion_tokens", info.get("eval_count") or 0, model=model)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+        self.registry.increment("stage_errors", stage="llm")
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, f"tool_{(serialized or {}).get('name', 'unknown')}")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        labels = self._starts.get(run_id, (("tool_unknown",),))[0]
+        self._end(run_id)
+        self.registry.increment("stage_errors", stage=labels[0])
+
+
+# Shared handler: attach to LLM constructors and agent invocations
+metrics_callback = MetricsCallbackHandler()
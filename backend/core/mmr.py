@@ -0,0 +1,63 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: mmr.py
+Description: Vectorized maximal-marginal-relevance reranking so overlapping chunks from the same report don't fill the whole context.
+"""
+
+import time
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def maximal_marginal_relevance(query_embedding, candidate_embeddings, k: int = 5, lambda_mult: float = 0.5) -> list[int]:
+    """
+    Pick k candidate indexes that balance relevance to the query against
+    similarity to already selected candidates:
+        argmax  lambda * sim(q, d) - (1 - lambda) * max_{s in selected} sim(d, s)
+    Cosine similarities are computed with matrix products; each step updates a
+    running max-similarity vector instead of recomputing the pairwise matrix.
+    """
+    candidates = _normalize(np.asarray(candidate_embeddings, dtype=np.float32))
+    if candidates.ndim != 2 or len(candidates) == 0:
+        return []
+    query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+    k = min(k, len(candidates))
+
+    relevance = candidates @ query
+    max_redundancy = np.full(len(candidates), -np.inf, dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+    selected = []
+
+    for _ in range(k):
+        if selected:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * max_redundancy
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        max_redundancy = np.maximum(max_redundancy, candidates @ candidates[best])
+
+    return selected
+
+
+def mmr_rerank(query_embedding, candidates: list, embeddings, k: int = 5, lambda_mult: float = 0.5) -> tuple[list, float]:
+    """
+    Rerank candidates (any per-item objects) with MMR on their embeddings.
+    Returns the selected candidates in pick order and the rerank time in milliseconds.
+    """
+    start_time = time.perf_counter()
+    indexes = maximal_marginal_relevance(query_embedding, embeddings, k=k, lambda_mult=lambda_mult)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    logger.info(f"MMR rerank: {len(candidates)} candidates -> {len(indexes)} in {elapsed_ms:.2f} ms")
+    return [candidates[i] for i in indexes], elapsed_ms
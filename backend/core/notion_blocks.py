@@ -0,0 +1,292 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: notion_blocks.py
+Description: Converts markdown reports to native Notion blocks and appends them in rate-limited batches of at most 100, skipping reports whose content hash was already published.
+"""
+
+import os
+import re
+import time
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from .metrics import metrics
+from .paths import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Notion API limits: characters per rich text item, items per block, children per append
+NOTION_TEXT_LIMIT = 2000
+NOTION_RICH_TEXT_LIMIT = 100
+NOTION_APPEND_LIMIT = 100
+
+# Notion allows an average of three requests per second per integration
+NOTION_RATE_LIMIT_PER_S = float(os.getenv("NOTION_RATE_LIMIT_PER_S", 3.0))
+
+# Skip publishing a report whose title + content hash is already in Notion
+NOTION_DEDUPE = os.getenv("NOTION_DEDUPE", "True").lower() == "true"
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_BULLET = re.compile(r"^\s*[-*+]\s+(.*)$")
+_NUMBERED = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+_QUOTE = re.compile(r"^>\s?(.*)$")
+_DIVIDER = re.compile(r"^\s*(-{3,}|\*{3,}|_{3,})\s*$")
+_FENCE = re.compile(r"^```\s*(\S*)")
+# Inline markdown: **bold**, *italic* / _italic_, `code`, [text](url)
+_INLINE = re.compile(r"\*\*(?P<bold>.+?)\*\*|`(?P<code>[^`]+)`|\[(?P<link>[^\]]+)\]\((?P<url>[^)\s]+)\)"
+                     r"|(?<![\w*])\*(?P<star>[^*\n]+?)\*(?![\w*])|(?<!\w)_(?P<under>[^_\n]+?)_(?!\w)")
+
+
+def split_text(text: str, limit: int = NOTION_TEXT_LIMIT) -> list[str]:
+    """Split text into pieces of at most limit characters, at whitespace where possible."""
+    pieces = []
+    while len(text) > limit:
+        cut = max(text.rfind(" ", 0, limit), text.rfind("\n", 0, limit))
+        # Keep the whitespace with the first piece so the pieces concatenate back to the text
+        cut = cut + 1 if cut > 0 else limit
+        pieces.append(text[:cut])
+        text = text[cut:]
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+def _text_item(content: str, url: str = None, **annotations) -> dict:
+    item = {"type": "text", "text": {"content": content}}
+    if url:
+        item["text"]["link"] = {"url": url}
+    if annotations:
+        item["annotations"] = annotations
+    return item
+
+
+def rich_text(text: str) -> list[dict]:
+    """Inline markdown to Notion rich text items, each within NOTION_TEXT_LIMIT."""
+    spans, position = [], 0
+    for match in _INLINE.finditer(text):
+        if match.start() > position:
+            spans.append((text[position:match.start()], None, {}))
+        if match.group("bold"):
+            spans.append((match.group("bold"), None, {"bold": True}))
+        elif match.group("code"):
+            spans.append((match.group("code"), None, {"code": True}))
+        elif match.group("link"):
+            spans.append((match.group("link"), match.group("url"), {}))
+        else:
+            spans.append((match.group("star") or match.group("under"), None, {"italic": True}))
+        position = match.end()
+    if position < len(text):
+        spans.append((text[position:], None, {}))
+    return [_text_item(piece, url, **annotations)
+            for content, url, annotations in spans for piece in split_text(content)]
+
+
+def _blocks(block_type: str, items: list[dict], **extra) -> list[dict]:
+    # A block holds at most NOTION_RICH_TEXT_LIMIT items; longer text continues in a second block
+    groups = [items[i:i + NOTION_RICH_TEXT_LIMIT] for i in range(0, len(items), NOTION_RICH_TEXT_LIMIT)] or [[]]
+    return [{"object": "block", "type": block_type, block_type: {"rich_text": group, **extra}} for group in groups]
+
+
+def text_block(block_type: str, text: str) -> list[dict]:
+    return _blocks(block_type, rich_text(text))
+
+
+def markdown_to_blocks(markdown: str) -> list[dict]:
+    """
+    Convert markdown to Notion blocks: # to ### headings (deeper levels become heading_3),
+    bulleted and numbered list items, quotes, fenced code, dividers and paragraphs
+    (consecutive lines are joined). Nested lists are flattened.
+    """
+    blocks, paragraph, code, language = [], [], None, ""
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.extend(text_block("paragraph", " ".join(line.strip() for line in paragraph)))
+            paragraph.clear()
+
+    for line in markdown.splitlines():
+        fence = _FENCE.match(line.strip())
+        if code is not None:
+            if fence:
+                blocks.extend(_blocks("code", [_text_item(piece) for piece in split_text("\n".join(code))],
+                                      language=language or "plain text"))
+                code = None
+            else:
+                code.append(line)
+            continue
+        if fence:
+            flush_paragraph()
+            code, language = [], fence.group(1)
+            continue
+        if not line.strip():
+            flush_paragraph()
+            continue
+
+        heading, bullet, numbered = _HEADING.match(line), _BULLET.match(line), _NUMBERED.match(line)
+        quote, divider = _QUOTE.match(line), _DIVIDER.match(line)
+        if heading or bullet or numbered or quote or divider:
+            flush_paragraph()
+        if divider:
+            blocks.append({"object": "block", "type": "divider", "divider": {}})
+        elif heading:
+            blocks.extend(text_block(f"heading_{min(len(heading.group(1)), 3)}", heading.group(2).strip("# ")))
+        elif bullet:
+            blocks.extend(text_block("bulleted_list_item", bullet.group(1)))
+        elif numbered:
+            blocks.extend(text_block("numbered_list_item", numbered.group(1)))
+        elif quote:
+            blocks.extend(text_block("quote", quote.group(1)))
+        else:
+            paragraph.append(line)
+
+    flush_paragraph()
+    if code is not None:  # unterminated fence
+        blocks.extend(_blocks("code", [_text_item(piece) for piece in split_text("\n".join(code))],
+                              language=language or "plain text"))
+    return blocks
+
+
+def batch_blocks(blocks: list[dict], size: int = NOTION_APPEND_LIMIT) -> list[list[dict]]:
+    return [blocks[i:i + size] for i in range(0, len(blocks), size)]
+
+
+def content_hash(title: str, content: str) -> str:
+    """sha256 of the title and whitespace-normalized content; the date is left out on purpose."""
+    normalized = re.sub(r"\s+", " ", f"{title}\n{content}").strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def report_blocks(title: str, content: str, date: str, source: str, digest: str) -> list[dict]:
+    """Title heading, date/source line (with a short content hash) and the report body."""
+    return (text_block("heading_2", title)
+            + text_block("paragraph", f"Date: {date} | Source: {source} | Ref: {digest[:12]}")
+            + markdown_to_blocks(content))
+
+
+class NotionBlockWriter:
+    """
+    Appends a report to a Notion page in batches of at most NOTION_APPEND_LIMIT blocks.
+    A ledger in SQLite records the content hash and how many batches went through, so a
+    retried publish resumes after the last appended batch and a finished one is skipped.
+    """
+
+    def __init__(self, page_id: str, db_path: Path = DB_PATH, dedupe: bool = NOTION_DEDUPE):
+        self.page_id = page_id
+        self.db_path = db_path
+        self.dedupe = dedupe
+        self._init_table()
+
+    def _init_table(self):
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS notion_published (
+                content_hash TEXT NOT NULL,
+                page_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                batches_done INTEGER NOT NULL DEFAULT 0,
+                batches_total INTEGER NOT NULL,
+                completed_at REAL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (content_hash, page_id)
+            )
+            """)
+            conn.commit()
+
+    def _progress(self, digest: str):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("""
+                SELECT batches_done, completed_at FROM notion_published WHERE content_hash = ? AND page_id = ?
+            """, (digest, self.page_id)).fetchone()
+
+    def _record(self, digest: str, title: str, done: int, total: int):
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO notion_published
+                    (content_hash, page_id, title, batches_done, batches_total, completed_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (digest, self.page_id, title, done, total, now if done == total else None, now))
+            conn.commit()
+
+    def _plan(self, title: str, content: str, date: str, source: str):
+        digest = content_hash(title, content)
+        progress = self._progress(digest) if self.dedupe else None
+        if progress and progress[1] is not None:
+            logger.info(f"Skipping Notion publish of '{title}': identical report already published")
+            metrics.increment("notion_publish_deduped")
+            return digest, None, 0
+        batches = batch_blocks(report_blocks(title, content, date or time.strftime("%Y-%m-%d"), source, digest))
+        start = progress[0] if progress else 0
+        if start:
+            logger.info(f"Resuming Notion publish of '{title}' after batch {start}/{len(batches)}")
+        return digest, batches, start
+
+    def write(self, client, title: str, content: str, date: str = None, source: str = "Human Rights LLM Agent",
+              limiter: "RateLimiter" = None) -> dict:
+        """
+        Append the report with notion_client Client; raises on API errors. Returns what was done.
+        limiter, if given, is waited on before every append request.
+        """
+        digest, batches, start = self._plan(title, content, date, source)
+        if batches is None:
+            return {"status": "duplicate", "content_hash": digest, "requests": 0}
+        for number in range(start, len(batches)):
+            if limiter is not None:
+                limiter.wait()
+            client.blocks.children.append(block_id=self.page_id, children=batches[number])
+            if self.dedupe:
+                self._record(digest, title, number + 1, len(batches))
+        metrics.increment("notion_append_requests", len(batches) - start)
+        return {"status": "published", "content_hash": digest, "requests": len(batches) - start,
+                "blocks": sum(len(batch) for batch in batches)}
+
+    async def awrite(self, client, title: str, content: str, date: str = None,
+                     source: str = "Human Rights LLM Agent", limiter: "RateLimiter" = None) -> dict:
+        """Async variant of write for notion_client AsyncClient; ledger reads/writes run in worker threads."""
+        digest, batches, start = await asyncio.to_thread(self._plan, title, content, date, source)
+        if batches is None:
+            return {"status": "duplicate", "content_hash": digest, "requests": 0}
+        for number in range(start, len(batches)):
+            if limiter is not None:
+                await limiter.await_slot()
+            await client.blocks.children.append(block_id=self.page_id, children=batches[number])
+            if self.dedupe:
+                await asyncio.to_thread(self._record, digest, title, number + 1, len(batches))
+        metrics.increment("notion_append_requests", len(batches) - start)
+        return {"status": "published", "content_hash": digest, "requests": len(batches) - start,
+                "blocks": sum(len(batch) for batch in batches)}
+
+
+class RateLimiter:
+    """
+    Spaces requests at most rate_per_s apart across threads and coroutines. Each caller
+    reserves the next free slot under a lock, then sleeps until it.
+    """
+
+    def __init__(self, rate_per_s: float = NOTION_RATE_LIMIT_PER_S):
+        self.min_interval = 1.0 / rate_per_s if rate_per_s > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+            return slot - now
+
+    def wait(self):
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def await_slot(self):
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
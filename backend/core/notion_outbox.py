@@ -0,0 +1,239 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: notion_outbox.py
+Description: Durable SQLite outbox for Notion publishing. Requests enqueue a report and return; a background worker publishes it with retry/backoff and rate limiting.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+from .metrics import metrics
+from .notion_blocks import RateLimiter, NOTION_RATE_LIMIT_PER_S
+from .paths import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Outbox settings
+NOTION_OUTBOX = os.getenv("NOTION_OUTBOX", "True").lower() == "true"
+NOTION_OUTBOX_MAX_ATTEMPTS = int(os.getenv("NOTION_OUTBOX_MAX_ATTEMPTS", 8))
+NOTION_OUTBOX_BACKOFF_S = float(os.getenv("NOTION_OUTBOX_BACKOFF_S", 2.0))
+NOTION_OUTBOX_MAX_BACKOFF_S = float(os.getenv("NOTION_OUTBOX_MAX_BACKOFF_S", 300.0))
+# A publish claimed longer ago than this (worker died mid-request) is picked up again
+NOTION_OUTBOX_LEASE_S = float(os.getenv("NOTION_OUTBOX_LEASE_S", 300.0))
+
+# HTTP statuses worth retrying; other 4xx (validation, auth, not found) fail immediately
+RETRYABLE_STATUSES = {409, 429}
+
+
+def is_retryable(error: Exception) -> bool:
+    status = getattr(error, "status", None)
+    return status is None or status in RETRYABLE_STATUSES or status >= 500
+
+
+def retry_after(error: Exception):
+    """Seconds from a Retry-After header on a rate-limited response, if any."""
+    headers = getattr(error, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class NotionOutbox:
+    """
+    Reports waiting to be published, stored in SQLite so a restart or a Notion outage
+    loses nothing. publish_fn(title, content, date, source, limiter=...) must raise on failure
+    and wait on limiter before every Notion request it makes, so a report appended in several
+    batches stays within rate_per_s too.
+    Status per entry: pending -> publishing -> published | failed (after max_attempts
+    or a non-retryable error). Retries back off exponentially from backoff_s and honour
+    Retry-After.
+    """
+
+    def __init__(self, publish_fn, db_path: Path = DB_PATH, max_attempts: int = NOTION_OUTBOX_MAX_ATTEMPTS,
+                 backoff_s: float = NOTION_OUTBOX_BACKOFF_S, max_backoff_s: float = NOTION_OUTBOX_MAX_BACKOFF_S,
+                 rate_per_s: float = NOTION_RATE_LIMIT_PER_S, lease_s: float = NOTION_OUTBOX_LEASE_S):
+        self.publish_fn = publish_fn
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.limiter = RateLimiter(rate_per_s)
+        self.lease_s = lease_s
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._init_table()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_table(self):
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS notion_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                date TEXT,
+                source TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                next_attempt_at REAL NOT NULL,
+                claimed_at REAL,
+                created_at REAL NOT NULL,
+                published_at REAL
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_notion_outbox_due ON notion_outbox (status, next_attempt_at)")
+            conn.commit()
+
+    def enqueue(self, title: str, content: str, date: str = None, source: str = "Human Rights LLM Agent") -> int:
+        """Store a report for publishing, make sure the worker runs, and return its publish id."""
+        now = time.time()
+        with self._connect() as conn:
+            publish_id = conn.execute("""
+                INSERT INTO notion_outbox (title, content, date, source, next_attempt_at, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (title, content, date, source, now, now)).lastrowid
+            conn.commit()
+        metrics.increment("notion_outbox", outcome="enqueued")
+        self.start()
+        self._wake.set()
+        return publish_id
+
+    def get(self, publish_id: int):
+        """Publish status of one entry as a dict, or None if the id is unknown."""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("""
+                SELECT id, title, status, attempts, last_error, next_attempt_at, created_at, published_at
+                FROM notion_outbox WHERE id = ?
+            """, (publish_id,)).fetchone()
+        return dict(row) if row else None
+
+    def get_stats(self) -> dict:
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM notion_outbox GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in ("pending", "publishing", "published", "failed")}
+
+    def _claim(self):
+        """Atomically take the oldest due entry (or one whose lease expired), even across processes."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("""
+                SELECT id, title, content, date, source, attempts, created_at FROM notion_outbox
+                WHERE (status = 'pending' AND next_attempt_at <= ?) OR (status = 'publishing' AND claimed_at < ?)
+                ORDER BY id LIMIT 1
+            """, (now, now - self.lease_s)).fetchone()
+            if row:
+                conn.execute("UPDATE notion_outbox SET status = 'publishing', claimed_at = ? WHERE id = ?", (now, row[0]))
+            conn.commit()
+            return row
+        finally:
+            conn.close()
+
+    def process_one(self) -> bool:
+        """Publish the next due entry. Returns False when nothing is due."""
+        item = self._claim()
+        if item is None:
+            return False
+        publish_id, title, content, date, source, attempts, created_at = item
+        attempts += 1
+        try:
+            self.publish_fn(title, content, date, source, limiter=self.limiter)
+        except Exception as e:
+            self._failed_attempt(publish_id, attempts, e)
+            return True
+
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE notion_outbox SET status = 'published', attempts = ?, published_at = ?, last_error = NULL
+                WHERE id = ?
+            """, (attempts, time.time(), publish_id))
+            conn.commit()
+        metrics.increment("notion_outbox", outcome="published")
+        metrics.observe("notion_outbox_delay", time.time() - created_at)
+        logger.info(f"Published outbox entry {publish_id} to Notion after {attempts} attempt(s)")
+        return True
+
+    def _failed_attempt(self, publish_id: int, attempts: int, error: Exception):
+        if is_retryable(error) and attempts < self.max_attempts:
+            delay = retry_after(error) or min(self.max_backoff_s, self.backoff_s * 2 ** (attempts - 1))
+            status, next_attempt_at = "pending", time.time() + delay
+            metrics.increment("notion_outbox", outcome="retry")
+            logger.warning(f"Notion publish {publish_id} failed (attempt {attempts}), retrying in {delay:.1f}s: {str(error)}")
+        else:
+            status, next_attempt_at = "failed", time.time()
+            metrics.increment("notion_outbox", outcome="failed")
+            metrics.increment("stage_errors", stage="notion_publish")
+            logger.error(f"Notion publish {publish_id} failed permanently after {attempts} attempt(s): {str(error)}")
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE notion_outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?
+                WHERE id = ?
+            """, (status, attempts, str(error)[:1000], next_attempt_at, publish_id))
+            conn.commit()
+
+    def _seconds_until_due(self) -> float:
+        with self._connect() as conn:
+            row = conn.execute("SELECT MIN(next_attempt_at) FROM notion_outbox WHERE status = 'pending'").fetchone()
+        return max(0.0, row[0] - time.time()) if row and row[0] is not None else self.lease_s
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.process_one():
+                    continue
+                self._wake.wait(timeout=min(self._seconds_until_due(), self.lease_s))
+                self._wake.clear()
+            except Exception as e:
+                logger.error(f"Notion outbox worker error: {str(e)}")
+                self._stop.wait(1.0)
+
+    def start(self):
+        """Start the background worker thread once per process."""
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stop.clear()
+                self._worker = threading.Thread(target=self._run, name="notion-outbox", daemon=True)
+                self._worker.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox():
+    """
+    Return the process-wide outbox publishing through the agent's append_to_notion, creating
+    it and starting its worker on first use, or None when NOTION_OUTBOX is off. Both route
+    layers call this at startup so entries left by a previous process are picked up at boot.
+    """
+    global _outbox
+    if not NOTION_OUTBOX:
+        return None
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                from backend.agent.notion_react_agent import append_to_notion
+                outbox = NotionOutbox(publish_fn=append_to_notion)
+                outbox.start()
+                _outbox = outbox
+    return _outbox
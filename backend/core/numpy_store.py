@@ -0,0 +1,275 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: numpy_store.py
+Description: Exact-search vector backend. Chunk embeddings live in one memory-mapped .npy matrix with metadata in SQLite; top-k is a matrix-vector product plus argpartition. An optional int8/float16 copy or Matryoshka-truncated prefix index serves a first pass, with full-precision rescoring of the top candidates.
+"""
+
+import os
+import json
+import sqlite3
+import logging
+from pathlib import Path
+import numpy as np
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Path definitions - use backend structure
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+NUMPY_STORE_DIR = BACKEND_ROOT / "embeddings" / "numpy_store"
+
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.db"
+FLOAT16_FILE = "embeddings.float16.npy"
+INT8_FILE = "embeddings.int8.npy"
+INT8_SCALE_FILE = "embeddings.int8_scale.npy"
+
+# First-pass quantization: "none", "float16" or "int8" (scalar, per-row scale)
+QUANTIZATION = os.getenv("NUMPY_STORE_QUANTIZATION", "none")
+# Candidates rescored at full precision = k * RESCORE_FACTOR
+RESCORE_FACTOR = int(os.getenv("NUMPY_STORE_RESCORE_FACTOR", 4))
+
+# Matryoshka coarse pass: search renormalized first COARSE_DIMS dims (0 = off), rerank top COARSE_N
+COARSE_DIMS = int(os.getenv("NUMPY_STORE_COARSE_DIMS", 0))
+COARSE_N = int(os.getenv("NUMPY_STORE_COARSE_N", 100))
+
+# Metadata fields that can be used in where clauses
+FILTER_FIELDS = ("country", "year", "document_type")
+
+# Rows scored per block so float16/int8 matrices are upcast a cache-sized slice at a time
+SCORE_BLOCK_ROWS = 1024
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def quantize_int8(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric scalar quantization with one float32 scale per row: row ~= scale * int8_row."""
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+    quantized = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales
+
+
+def build_numpy_store(ids: list, texts: list, metadatas: list, embeddings, store_dir: Path = NUMPY_STORE_DIR,
+                      dtype: str = "float32"):
+    """
+    Write unit-normalized embeddings to store_dir/embeddings.npy (float32 or float16),
+    float16 and int8 first-pass copies next to it, and chunk text/metadata to
+    store_dir/metadata.db. Row i of every matrix is row i in SQLite.
+    """
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    full = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+    matrix = full.astype(dtype)
+    np.save(store_dir / EMBEDDINGS_FILE, matrix)
+    np.save(store_dir / FLOAT16_FILE, full.astype(np.float16))
+    quantized, scales = quantize_int8(full)
+    np.save(store_dir / INT8_FILE, quantized)
+    np.save(store_dir / INT8_SCALE_FILE, scales)
+
+    db_path = store_dir / METADATA_FILE
+    if db_path.exists():
+        db_path.unlink()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE vectors (
+                row INTEGER PRIMARY KEY,
+                chunk_id TEXT,
+                content TEXT,
+                metadata TEXT,
+                country TEXT,
+                year INTEGER,
+                document_type TEXT
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO vectors (row, chunk_id, content, metadata, country, year, document_type) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(row, chunk_id, text, json.dumps(metadata or {}),
+              *((metadata or {}).get(field) for field in FILTER_FIELDS))
+             for row, (chunk_id, text, metadata) in enumerate(zip(ids, texts, metadatas))]
+        )
+        conn.commit()
+    logger.info(f"Wrote {len(matrix)} x {matrix.shape[1] if len(matrix) else 0} {dtype} vectors to {store_dir}")
+
+
+def export_from_chroma(chroma_store, store_dir: Path = NUMPY_STORE_DIR, dtype: str = "float32", page_size: int = 5000):
+    """Copy every embedding, document and metadata from a Chroma store into a NumPy store."""
+    collection = chroma_store._collection
+    ids, texts, metadatas, embeddings = [], [], [], []
+    offset = 0
+    while True:
+        page = collection.get(include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset)
+        if not page["ids"]:
+            break
+        ids.extend(page["ids"])
+        texts.extend(page["documents"])
+        metadatas.extend(page["metadatas"])
+        embeddings.extend(page["embeddings"])
+        offset += len(page["ids"])
+    build_numpy_store(ids, texts, metadatas, embeddings, store_dir=store_dir, dtype=dtype)
+    return len(ids)
+
+
+#Evaluate a Chroma-style where clause ({k: v}, {k: {"$in": [...]}}, {"$and": [...]}) as a row mask
+def where_mask(where: dict, columns: dict, size: int) -> np.ndarray:
+    if not where:
+        return np.ones(size, dtype=bool)
+    if "$and" in where:
+        mask = np.ones(size, dtype=bool)
+        for condition in where["$and"]:
+            mask &= where_mask(condition, columns, size)
+        return mask
+    if "$or" in where:
+        mask = np.zeros(size, dtype=bool)
+        for condition in where["$or"]:
+            mask |= where_mask(condition, columns, size)
+        return mask
+    mask = np.ones(size, dtype=bool)
+    for key, value in where.items():
+        column = columns.get(key)
+        if column is None:
+            return np.zeros(size, dtype=bool)
+        if isinstance(value, dict) and "$in" in value:
+            mask &= np.isin(column, value["$in"])
+        elif isinstance(value, dict) and "$eq" in value:
+            mask &= column == value["$eq"]
+        else:
+            mask &= column == value
+    return mask
+
+
+class NumpyVectorStore:
+    """
+    Exact cosine-similarity search over a memory-mapped embedding matrix.
+    With quantization="int8" or "float16", a compact in-memory copy ranks every row
+    and only the top k * rescore_factor candidates are rescored from the full matrix.
+    With coarse_dims > 0 (takes precedence), the first pass instead searches the renormalized
+    leading coarse_dims dimensions (nomic-embed-text is Matryoshka-trained) and the top
+    coarse_n rows are reranked with full vectors.
+    Exposes similarity_search / similarity_search_with_score like the Chroma store;
+    scores are cosine distances (1 - cosine similarity), lower is better.
+    """
+
+    def __init__(self, embedding_function=None, store_dir: Path = NUMPY_STORE_DIR,
+                 quantization: str = QUANTIZATION, rescore_factor: int = RESCORE_FACTOR,
+                 coarse_dims: int = COARSE_DIMS, coarse_n: int = COARSE_N):
+        self.embedding_function = embedding_function
+        self.store_dir = Path(store_dir)
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor
+        self.coarse_dims = coarse_dims
+        self.coarse_n = coarse_n
+        # mmap_mode="r" keeps the matrix in the page cache instead of process memory
+        self.matrix = np.load(self.store_dir / EMBEDDINGS_FILE, mmap_mode="r")
+        # The first-pass index is held in memory; only rescored rows touch the mmap
+        self.first_pass = None
+        self.first_pass_scales = None
+        if 0 < coarse_dims < self.matrix.shape[1]:
+            prefix = np.asarray(self.matrix[:, :coarse_dims], dtype=np.float32)
+            self.first_pass = _normalize_rows(prefix)
+        else:
+            self.coarse_dims = 0
+            try:
+                if quantization == "int8":
+                    self.first_pass = np.load(self.store_dir / INT8_FILE)
+                    self.first_pass_scales = np.load(self.store_dir / INT8_SCALE_FILE)
+                elif quantization == "float16":
+                    self.first_pass = np.load(self.store_dir / FLOAT16_FILE)
+            except FileNotFoundError:
+                logger.warning(f"No {quantization} copy in {self.store_dir}, re-run ingest; using exact search")
+                self.first_pass, self.first_pass_scales, self.quantization = None, None, "none"
+        self.db_path = self.store_dir / METADATA_FILE
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(f"SELECT {', '.join(FILTER_FIELDS)} FROM vectors ORDER BY row").fetchall()
+        self.columns = {
+            field: np.array([row[i] for row in rows], dtype=object)
+            for i, field in enumerate(FILTER_FIELDS)
+        }
+        logger.info(f"Loaded NumPy vector store from {self.store_dir} ({len(self.matrix)} vectors)")
+
+    def count(self) -> int:
+        return len(self.matrix)
+
+    def memory_bytes(self) -> int:
+        """Bytes held in process memory for the first pass (the full matrix stays memory-mapped)."""
+        if self.first_pass is None:
+            return self.matrix.nbytes
+        scales = self.first_pass_scales.nbytes if self.first_pass_scales is not None else 0
+        return self.first_pass.nbytes + scales
+
+    def _scores(self, query: np.ndarray, matrix: np.ndarray = None) -> np.ndarray:
+        matrix = self.matrix if matrix is None else matrix
+        if matrix.dtype == np.float32 and not isinstance(matrix, np.memmap):
+            return matrix @ query
+        scores = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), SCORE_BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            scores[start:start + len(block)] = block @ query
+        return scores
+
+    def _first_pass_scores(self, query: np.ndarray) -> np.ndarray:
+        if self.coarse_dims:
+            prefix = query[:self.coarse_dims]
+            return self._scores(prefix / (np.linalg.norm(prefix) or 1.0), self.first_pass)
+        scores = self._scores(query, self.first_pass)
+        if self.first_pass_scales is not None:
+            scores *= self.first_pass_scales
+        return scores
+
+    def _rows(self, rows: list[int]) -> dict:
+        with sqlite3.connect(self.db_path) as conn:
+            found = conn.execute(
+                f"SELECT row, content, metadata FROM vectors WHERE row IN ({', '.join('?' for _ in rows)})",
+                [int(row) for row in rows]
+            ).fetchall()
+        return {row: (content, json.loads(metadata)) for row, content, metadata in found}
+
+    def top_k(self, query_embedding, k: int, where: dict = None) -> tuple[np.ndarray, np.ndarray]:
+        """Row indexes and cosine similarities of the k best rows, best first."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = self._scores(query) if self.first_pass is None else self._first_pass_scores(query)
+        if where:
+            scores[~where_mask(where, self.columns, len(scores))] = -np.inf
+        available = int(np.isfinite(scores).sum())
+        k = min(k, available)
+        if k <= 0:
+            return np.array([], dtype=int), np.array([], dtype=np.float32)
+
+        if self.first_pass is not None:
+            # Rescore the best first-pass candidates with the full-precision rows on disk
+            n_candidates = min(max(self.coarse_n, k) if self.coarse_dims else k * self.rescore_factor, available)
+            candidates = np.sort(np.argpartition(-scores, n_candidates - 1)[:n_candidates])
+            scores = np.full(len(scores), -np.inf, dtype=np.float32)
+            scores[candidates] = np.asarray(self.matrix[candidates], dtype=np.float32) @ query
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+    def query_by_vectors(self, query_embeddings: list, k: int = 5, where: dict = None,
+                         include_embeddings: bool = False) -> list[list[tuple]]:
+        """Same contract as vector_store.query_by_vectors: (Document, distance, embedding) per hit."""
+        results = []
+        for query_embedding in query_embeddings:
+            rows, similarities = self.top_k(query_embedding, k, where)
+            stored = self._rows(rows.tolist()) if len(rows) else {}
+            hits = []
+            for row, similarity in zip(rows.tolist(), similarities.tolist()):
+                content, metadata = stored[row]
+                embedding = np.asarray(self.matrix[row], dtype=np.float32) if include_embeddings else None
+                hits.append((Document(page_content=content, metadata=metadata), 1.0 - similarity, embedding))
+            results.append(hits)
+        return results
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: dict = None) -> list[tuple]:
+        query_embedding = self.embedding_function.embed_query(query)
+        return [(doc, distance) for doc, distance, _ in self.query_by_vectors([query_embedding], k, filter)[0]]
+
+    def similarity_search(self, query: str, k: int = 4, filter: dict = None) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter)]
@@ -0,0 +1,81 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: passage_expander.py
+Description: Small-to-big retrieval. Expands matched chunks to a window of surrounding text read by offset from the SQLite documents table.
+"""
+
+import os
+import sqlite3
+import logging
+from pathlib import Path
+from langchain_core.documents import Document
+from .hybrid_retriever import CHUNK_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Characters of surrounding text added on each side of a matched chunk
+SMALL_TO_BIG_WINDOW = int(os.getenv("SMALL_TO_BIG_WINDOW", 600))
+
+
+def _windows(docs: list, window: int) -> list[dict]:
+    """Compute expansion windows, merging overlapping windows from the same document."""
+    windows = []
+    for rank, doc in enumerate(docs):
+        doc_id = doc.metadata.get("doc_id")
+        start = doc.metadata.get("start_index")
+        end = doc.metadata.get("end_index")
+        if doc_id is None or start is None or end is None or start < 0:
+            windows.append({"doc": doc, "rank": rank})
+            continue
+        lo, hi = max(0, start - window), end + window
+        for existing in windows:
+            if existing.get("doc_id") == doc_id and lo <= existing["hi"] and hi >= existing["lo"]:
+                existing["lo"], existing["hi"] = min(existing["lo"], lo), max(existing["hi"], hi)
+                break
+        else:
+            windows.append({"doc": doc, "rank": rank, "doc_id": doc_id, "lo": lo, "hi": hi})
+    return windows
+
+
+def _trim_to_words(text: str, at_start: bool, at_end: bool) -> str:
+    # Drop the partial words cut by the window edges unless the edge is the document boundary
+    if not at_start and " " in text:
+        text = text[text.index(" ") + 1:]
+    if not at_end and " " in text:
+        text = text[:text.rindex(" ")]
+    return text.strip()
+
+
+def expand_documents(docs: list, window: int = SMALL_TO_BIG_WINDOW, db_path: Path = CHUNK_DB_PATH) -> list:
+    """
+    Replace each matched chunk with its surrounding passage from the documents table.
+    Hits close together in the same document become one passage, ranked by the best hit.
+    Chunks without doc_id/offsets (older ingests, missing DB) are returned unchanged.
+    """
+    windows = _windows(docs, window)
+    if not any("doc_id" in w for w in windows) or not Path(db_path).exists():
+        return docs
+
+    expanded = []
+    try:
+        with sqlite3.connect(db_path) as conn:
+            for w in windows:
+                if "doc_id" not in w:
+                    expanded.append(w["doc"])
+                    continue
+                row = conn.execute(
+                    "SELECT substr(content, ?, ?), length(content) FROM documents WHERE id = ?",
+                    (w["lo"] + 1, w["hi"] - w["lo"], w["doc_id"])
+                ).fetchone()
+                if row is None or not row[0]:
+                    expanded.append(w["doc"])
+                    continue
+                text = _trim_to_words(row[0], at_start=w["lo"] == 0, at_end=w["hi"] >= row[1])
+                metadata = dict(w["doc"].metadata, start_index=w["lo"], end_index=min(w["hi"], row[1]), expanded=True)
+                expanded.append(Document(page_content=text, metadata=metadata))
+    except sqlite3.Error as e:
+        logger.warning(f"Passage expansion failed, using matched chunks: {str(e)}")
+        return docs
+    return expanded
@@ -0,0 +1,12 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: paths.py
+Description: Shared path definitions. The chat history, caches, corpus version, Notion outbox and Notion publish ledger all live in one SQLite database.
+"""
+
+from pathlib import Path
+
+# Application database (data/db/documents.db at the project root)
+DB_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "db" / "documents.db"
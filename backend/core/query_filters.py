@@ -0,0 +1,138 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: query_filters.py
+Description: Extracts country/year metadata from DOS report filenames at ingest and detects the same filters in user queries for Chroma where clauses.
+"""
+
+import re
+
+# Same slugs as TARGET_COUNTRIES in ingest/dos_scraper.py
+COUNTRIES = [
+    "afghanistan", "venezuela", "el-salvador", "honduras", "iran", "iraq",
+    "guatemala", "syria", "somalia", "eritrea", "yemen", "cuba", "nicaragua",
+    "democratic-republic-of-the-congo", "sudan", "south-sudan", "burundi",
+    "pakistan", "bangladesh", "ethiopia"
+]
+
+# Extra ways users refer to a country in questions. None marks a name that is recognised but
+# ambiguous, so it applies no filter: a bare "Congo" may mean the DRC or the Republic of the Congo
+COUNTRY_ALIASES = {
+    "drc": "democratic-republic-of-the-congo",
+    "dr congo": "democratic-republic-of-the-congo",
+    "democratic republic of congo": "democratic-republic-of-the-congo",
+    "congo kinshasa": "democratic-republic-of-the-congo",
+    "congo": None,
+    "congolese": None,
+    "republic of the congo": None,
+    "republic of congo": None,
+    "congo brazzaville": None,
+    "south sudanese": "south-sudan",
+    "sudanese": "sudan",
+    "afghan": "afghanistan",
+    "venezuelan": "venezuela",
+    "salvadoran": "el-salvador",
+    "honduran": "honduras",
+    "iranian": "iran",
+    "iraqi": "iraq",
+    "guatemalan": "guatemala",
+    "syrian": "syria",
+    "somali": "somalia",
+    "eritrean": "eritrea",
+    "yemeni": "yemen",
+    "cuban": "cuba",
+    "nicaraguan": "nicaragua",
+    "burundian": "burundi",
+    "pakistani": "pakistan",
+    "bangladeshi": "bangladesh",
+    "ethiopian": "ethiopia",
+}
+
+YEAR_PATTERN = re.compile(r"\b(19[5-9]\d|20\d{2})\b")
+
+
+#Longest names first so "south sudan" wins over "sudan"
+def _country_patterns():
+    names = {slug.replace("-", " "): slug for slug in COUNTRIES}
+    names.update(COUNTRY_ALIASES)
+    return sorted(names.items(), key=lambda item: len(item[0]), reverse=True)
+
+
+COUNTRY_PATTERNS = _country_patterns()
+
+
+def find_countries(text: str) -> list[str]:
+    """Return the country slugs mentioned in free text, in order of first mention (ambiguous names add none)."""
+    text = re.sub(r"[^a-z0-9]+", " ", text.lower())
+    found = []
+    for name, slug in COUNTRY_PATTERNS:
+        pattern = rf"\b{re.escape(name)}\b"
+        match = re.search(pattern, text)
+        if match:
+            found.append((match.start(), slug))
+            # Blank out the match so shorter names inside it don't match again
+            text = re.sub(pattern, lambda m: " " * len(m.group(0)), text)
+    seen = []
+    for _, slug in sorted(found):
+        if slug is not None and slug not in seen:
+            seen.append(slug)
+    return seen
+
+
+def country_from_filename(filename: str):
+    """Country slug from a DOS PDF name such as 528267_IRAN-2023-HUMAN-RIGHTS-REPORT.pdf."""
+    countries = find_countries(filename)
+    return countries[0] if countries else None
+
+
+def year_from_text(text: str):
+    match = YEAR_PATTERN.search(text)
+    return int(match.group(1)) if match else None
+
+
+def detect_filters(query: str) -> dict:
+    """
+    Detect metadata filters in a user question.
+    Returns a dict with optional "country" (list of slugs) and "year" (int) keys.
+    """
+    filters = {}
+    countries = find_countries(query)
+    if countries:
+        filters["country"] = countries
+    year = year_from_text(query)
+    if year:
+        filters["year"] = year
+    return filters
+
+
+def build_where(filters: dict):
+    """
+    Convert filters (country, year, document_type) into a Chroma where clause.
+    List values become $in conditions. Returns None when there is nothing to filter on.
+    """
+    conditions = []
+    for key in ("country", "year", "document_type"):
+        value = (filters or {}).get(key)
+        if value is None or value == []:
+            continue
+        if isinstance(value, (list, tuple)):
+            conditions.append({key: {"$in": list(value)}} if len(value) > 1 else {key: value[0]})
+        else:
+            conditions.append({key: value})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def relaxed_filters(filters: dict) -> list[dict]:
+    """
+    Filters to try in turn when a filtered search finds nothing: as given, then the
+    country alone (a year or document type missing from the corpus should not drop
+    the country), then no filter at all.
+    """
+    filters = filters or {}
+    ladder = [filters] if build_where(filters) else []
+    if filters.get("country") and any(filters.get(key) is not None for key in ("year", "document_type")):
+        ladder.append({"country": filters["country"]})
+    return ladder + [{}]
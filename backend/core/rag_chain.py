@@ -10,15 +10,35 @@ import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
 
+import os
 import time
+import asyncio
+import logging
+from typing import Iterator, AsyncIterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from langchain_core.runnables import RunnableMap
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_community.chat_models import ChatOllama
-from .retriever import retrieve_documents
+from .retriever import retrieve_documents, retrieve_documents_batch, aretrieve_documents
+from .vector_store import get_embeddings
+from .context_packer import pack_context, CONTEXT_TOKEN_BUDGET
+from .answer_cache import SemanticAnswerCache, ANSWER_CACHE_ENABLED
+from .corpus_version import get_corpus_version
+from .metrics import metrics, timed, metrics_callback
 from langchain_core.output_parsers import StrOutputParser
 
-## Instantiate the LLM
-llm = ChatOllama(model="mistral:latest")
+logger = logging.getLogger(__name__)
+
+LLM_MODEL = "mistral:latest"
+
+# Generations in flight against Ollama for batch requests
+RAG_BATCH_CONCURRENCY = int(os.getenv("RAG_BATCH_CONCURRENCY", 4))
+
+## Instantiate the LLM (metrics_callback records prefill/decode time from Ollama's response)
+llm = ChatOllama(model=LLM_MODEL, callbacks=[metrics_callback])
+
+# Semantic answer cache in front of the chain
+answer_cache = SemanticAnswerCache() if ANSWER_CACHE_ENABLED else None
 
 #Prompt template with citation template
 RAG_PROMPT = ChatPromptTemplate.from_template("""
@@ -32,33 +52,236 @@ Context: {context}
 Answer:
 """)
 
-#Document formatter to merge sources
-format_docs = lambda docs: "\n\n".join(
-    f"Source [{doc.metadata.get('source', 'Unknown')}]:\n{doc.page_content[:800]}..."
-    for doc in docs
-    )
+#Document formatter: merge overlapping chunks, drop duplicates and fit the token budget
+def format_docs(docs: list) -> str:
+    with timed("pack_context"):
+        return pack_context(docs, token_budget=CONTEXT_TOKEN_BUDGET)
+
 
+#Generation half of the chain: prompt + LLM on an already retrieved context
+answer_chain = RAG_PROMPT | llm | StrOutputParser()
 
 #main RAG chain
 rag_chain = (
     RunnableMap({
         "context": lambda x: format_docs(retrieve_documents(x["question"])),
         "question": lambda x: x["question"]})
-        | RAG_PROMPT
-        | llm
-        | StrOutputParser()
+        | answer_chain
 )
 
+def retrieve_context(query: str, k: int = 5) -> str:
+    """
+    Retrieval half of the chain only: the packed top-k chunks with their Source [...]
+    labels, no LLM call. For callers that run their own generation on the context.
+    """
+    with timed("retrieve_context"):
+        return format_docs(retrieve_documents(query, k=k))
+
+async def aretrieve_context(query: str, k: int = 5) -> str:
+    with timed("retrieve_context"):
+        return format_docs(await aretrieve_documents(query, k=k))
+
 def run_rag_chain(query: str):
     """
     Run the RAG chain with a user question.
+    Answers for semantically equivalent questions on the same corpus version come from the answer cache.
     """
     start_time = time.time()
+    if answer_cache is not None:
+        # The query embedding is cached, so retrieval on a miss reuses it
+        question_embedding = get_embeddings().embed_query(query)
+        corpus_version = get_corpus_version()
+        with timed("answer_cache_lookup"):
+            cached = answer_cache.lookup(query, question_embedding, LLM_MODEL, corpus_version)
+        if cached:
+            return _serve_cached(cached, start_time)
+
     response = rag_chain.invoke({"question": query})
     latency = round(time.time() - start_time, 2)
+    metrics.observe("rag_total", time.time() - start_time)
     print(f"Time taken: (Latency: {latency}s):\n\n{response}")
+
+    if answer_cache is not None and response:
+        answer_cache.store(query, question_embedding, response, LLM_MODEL, corpus_version, latency)
     return response
 
+def _serve_cached(cached: dict, start_time: float) -> str:
+    latency = round(time.time() - start_time, 2)
+    saved = cached["generation_latency"] - latency
+    answer_cache.record_saved(saved)
+    stats = answer_cache.get_stats()
+    print(f"Answer cache hit (similarity {cached['similarity']:.3f}, latency {latency}s, "
+          f"saved {saved:.2f}s, hit ratio {stats['hit_ratio']:.2%}):\n\n{cached['answer']}")
+    return cached["answer"]
+
+async def arun_rag_chain(query: str):
+    """
+    Async variant of run_rag_chain. The query embedding, retrieval and generation
+    (answer_chain.ainvoke) are awaited, so one event loop can keep many questions
+    in flight against Ollama; SQLite cache reads/writes run in worker threads.
+    """
+    start_time = time.time()
+    if answer_cache is not None:
+        question_embedding = await get_embeddings().aembed_query(query)
+        corpus_version = get_corpus_version()
+        with timed("answer_cache_lookup"):
+            cached = await asyncio.to_thread(answer_cache.lookup, query, question_embedding, LLM_MODEL, corpus_version)
+        if cached:
+            return _serve_cached(cached, start_time)
+
+    docs = await aretrieve_documents(query)
+    response = await answer_chain.ainvoke({"question": query, "context": format_docs(docs)})
+    latency = round(time.time() - start_time, 2)
+    metrics.observe("rag_total", time.time() - start_time)
+    print(f"Time taken: (Latency: {latency}s):\n\n{response}")
+
+    if answer_cache is not None and response:
+        await asyncio.to_thread(answer_cache.store, query, question_embedding, response, LLM_MODEL, corpus_version, latency)
+    return response
+
+def stream_rag_chain(query: str, stats: dict = None) -> Iterator[str]:
+    """
+    Stream the answer to a user question token by token with rag_chain.stream.
+    Time-to-first-token (retrieval + prompt eval + first decoded token) is logged and,
+    with the total latency, written to stats when a dict is passed in.
+    An answer cache hit is yielded as a single chunk.
+    """
+    stats = stats if stats is not None else {}
+    stats.update(cached=False, ttft_s=None, latency_s=None)
+    start_time = time.time()
+    if answer_cache is not None:
+        question_embedding = get_embeddings().embed_query(query)
+        corpus_version = get_corpus_version()
+        with timed("answer_cache_lookup"):
+            cached = answer_cache.lookup(query, question_embedding, LLM_MODEL, corpus_version)
+        if cached:
+            stats.update(cached=True, ttft_s=round(time.time() - start_time, 3))
+            answer_cache.record_saved(cached["generation_latency"] - stats["ttft_s"])
+            yield cached["answer"]
+            stats["latency_s"] = stats["ttft_s"]
+            logger.info(f"Streamed cached answer (TTFT {stats['ttft_s']}s)")
+            return
+
+    chunks = []
+    for chunk in rag_chain.stream({"question": query}):
+        if not chunk:
+            continue
+        if stats["ttft_s"] is None:
+            stats["ttft_s"] = round(time.time() - start_time, 3)
+            metrics.observe("rag_ttft", time.time() - start_time)
+            logger.info(f"Time to first token: {stats['ttft_s']}s")
+        chunks.append(chunk)
+        yield chunk
+    stats["latency_s"] = round(time.time() - start_time, 3)
+    metrics.observe("rag_total", time.time() - start_time)
+    logger.info(f"Streamed answer: TTFT {stats['ttft_s']}s, total {stats['latency_s']}s, {len(chunks)} chunks")
+
+    response = "".join(chunks)
+    if answer_cache is not None and response:
+        answer_cache.store(query, question_embedding, response, LLM_MODEL, corpus_version, stats["latency_s"])
+
+async def astream_rag_chain(query: str, stats: dict = None) -> AsyncIterator[str]:
+    """Async variant of stream_rag_chain using answer_chain.astream; fills stats the same way."""
+    stats = stats if stats is not None else {}
+    stats.update(cached=False, ttft_s=None, latency_s=None)
+    start_time = time.time()
+    if answer_cache is not None:
+        question_embedding = await get_embeddings().aembed_query(query)
+        corpus_version = get_corpus_version()
+        with timed("answer_cache_lookup"):
+            cached = await asyncio.to_thread(answer_cache.lookup, query, question_embedding, LLM_MODEL, corpus_version)
+        if cached:
+            stats.update(cached=True, ttft_s=round(time.time() - start_time, 3))
+            answer_cache.record_saved(cached["generation_latency"] - stats["ttft_s"])
+            yield cached["answer"]
+            stats["latency_s"] = stats["ttft_s"]
+            logger.info(f"Streamed cached answer (TTFT {stats['ttft_s']}s)")
+            return
+
+    docs = await aretrieve_documents(query)
+    chunks = []
+    async for chunk in answer_chain.astream({"question": query, "context": format_docs(docs)}):
+        if not chunk:
+            continue
+        if stats["ttft_s"] is None:
+            stats["ttft_s"] = round(time.time() - start_time, 3)
+            metrics.observe("rag_ttft", time.time() - start_time)
+            logger.info(f"Time to first token: {stats['ttft_s']}s")
+        chunks.append(chunk)
+        yield chunk
+    stats["latency_s"] = round(time.time() - start_time, 3)
+    metrics.observe("rag_total", time.time() - start_time)
+    logger.info(f"Streamed answer: TTFT {stats['ttft_s']}s, total {stats['latency_s']}s, {len(chunks)} chunks")
+
+    response = "".join(chunks)
+    if answer_cache is not None and response:
+        await asyncio.to_thread(answer_cache.store, query, question_embedding, response, LLM_MODEL, corpus_version,
+                                stats["latency_s"])
+
+def run_rag_chain_batch(queries: list[str], k: int = 5, max_concurrency: int = RAG_BATCH_CONCURRENCY) -> list[str]:
+    """
+    Run the RAG chain over many questions for offline evaluation and report generation.
+    Retrieval is batched (cached or concurrent query embeddings, one collection query per filter group);
+    generations run through answer_chain.batch with at most max_concurrency in flight.
+    Returns answers in the same order as queries.
+    """
+    start_time = time.time()
+    contexts = retrieve_documents_batch(queries, k=k)
+    metrics.observe("retrieval_batch", time.time() - start_time)
+    retrieval_latency = round(time.time() - start_time, 2)
+
+    inputs = [{"question": q, "context": format_docs(docs)} for q, docs in zip(queries, contexts)]
+    responses = answer_chain.batch(inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True)
+    responses = [f"Error: {str(r)}" if isinstance(r, Exception) else r for r in responses]
+
+    latency = round(time.time() - start_time, 2)
+    print(f"Batch of {len(queries)} questions (retrieval {retrieval_latency}s, total {latency}s)")
+    return responses
+
+def iter_rag_chain_batch(queries: list[str], k: int = 5, max_concurrency: int = RAG_BATCH_CONCURRENCY) -> Iterator[dict]:
+    """
+    Answer many questions and yield each result as soon as its generation finishes.
+    Retrieval is shared (retrieve_documents_batch); at most max_concurrency generations
+    run at once. Each result is {"index", "question", "answer", "error", "retrieval_s",
+    "queued_s", "generation_s"}; a failed item has answer None and the error message.
+    Closing the generator early cancels the generations that have not started.
+    """
+    start_time = time.time()
+    try:
+        contexts = retrieve_documents_batch(queries, k=k)
+    except Exception as e:
+        logger.error(f"Batch retrieval failed: {str(e)}")
+        for i, query in enumerate(queries):
+            yield {"index": i, "question": query, "answer": None, "error": f"Retrieval failed: {str(e)}",
+                   "retrieval_s": None, "queued_s": None, "generation_s": None}
+        return
+    retrieval_s = round(time.time() - start_time, 3)
+    metrics.observe("retrieval_batch", retrieval_s)
+
+    def generate(i: int, query: str, docs: list) -> dict:
+        started = time.time()
+        result = {"index": i, "question": query, "answer": None, "error": None,
+                  "retrieval_s": retrieval_s, "queued_s": round(started - start_time - retrieval_s, 3)}
+        try:
+            result["answer"] = answer_chain.invoke({"question": query, "context": format_docs(docs)})
+        except Exception as e:
+            logger.error(f"Batch item {i} failed: {str(e)}")
+            result["error"] = str(e)
+            metrics.increment("stage_errors", stage="rag_batch_item")
+        result["generation_s"] = round(time.time() - started, 3)
+        metrics.observe("rag_batch_item", result["generation_s"])
+        return result
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_concurrency))
+    futures = [pool.submit(generate, i, q, docs) for i, (q, docs) in enumerate(zip(queries, contexts))]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # A closed generator (client disconnected) drops the queued generations instead of
+        # holding Ollama slots until the whole batch finishes; running ones complete on their own
+        pool.shutdown(wait=False, cancel_futures=True)
+
 # Example usage
 if __name__ == "__main__":
     q = "What human rights issues were reported in Syria in 2023?"
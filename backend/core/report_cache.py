@@ -0,0 +1,126 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: report_cache.py
+Description: Persistent cache of generated agent reports in SQLite, keyed on the normalized query, tool/prompt version, model and corpus version.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from pathlib import Path
+from .embedding_cache import normalize_query
+from .paths import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Cache settings
+REPORT_CACHE_ENABLED = os.getenv("REPORT_CACHE_ENABLED", "True").lower() == "true"
+REPORT_CACHE_TTL = int(os.getenv("REPORT_CACHE_TTL", 7 * 24 * 60 * 60))
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", 1000))
+
+
+def report_cache_key(query: str, tool_version: str, model: str, corpus_version: int) -> str:
+    """sha256 over every input that changes the generated report."""
+    normalized = normalize_query(query).rstrip("?.! ")
+    return hashlib.sha256(f"{normalized}\x1f{tool_version}\x1f{model}\x1f{corpus_version}".encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """
+    Stores finished reports in SQLite. A lookup hits only on the same normalized query,
+    tool/prompt version, model and corpus version; entries expire after ttl seconds and
+    the least recently used are evicted past max_entries.
+    """
+
+    def __init__(self, db_path: Path = DB_PATH, ttl: int = REPORT_CACHE_TTL,
+                 max_entries: int = REPORT_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.latency_saved = 0.0
+        self._init_table()
+
+    def _init_table(self):
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS report_cache (
+                cache_key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                report TEXT NOT NULL,
+                tool_version TEXT NOT NULL,
+                model TEXT NOT NULL,
+                corpus_version INTEGER NOT NULL,
+                generation_latency REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_hit_at REAL,
+                hits INTEGER DEFAULT 0
+            )
+            """)
+            conn.commit()
+
+    def lookup(self, query: str, tool_version: str, model: str, corpus_version: int):
+        """Return the cached entry as a dict (query, report, generation_latency, created_at) or None."""
+        key = report_cache_key(query, tool_version, model, corpus_version)
+        with self._lock:
+            self.lookups += 1
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("""
+                SELECT query, report, generation_latency, created_at FROM report_cache
+                WHERE cache_key = ? AND created_at >= ?
+            """, (key, time.time() - self.ttl)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE report_cache SET hits = hits + 1, last_hit_at = ? WHERE cache_key = ?",
+                         (time.time(), key))
+            conn.commit()
+        with self._lock:
+            self.hits += 1
+            self.latency_saved += row[2]
+        return {"query": row[0], "report": row[1], "generation_latency": row[2], "created_at": row[3]}
+
+    def store(self, query: str, report: str, tool_version: str, model: str, corpus_version: int,
+              generation_latency: float):
+        """Insert or replace a report, then drop expired and least recently used entries."""
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO report_cache
+                    (cache_key, query, report, tool_version, model, corpus_version, generation_latency, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (report_cache_key(query, tool_version, model, corpus_version), query, report, tool_version,
+                  model, corpus_version, generation_latency, now))
+            conn.execute("DELETE FROM report_cache WHERE created_at < ?", (now - self.ttl,))
+            conn.execute("""
+                DELETE FROM report_cache WHERE cache_key NOT IN (
+                    SELECT cache_key FROM report_cache
+                    ORDER BY COALESCE(last_hit_at, created_at) DESC
+                    LIMIT ?
+                )
+            """, (self.max_entries,))
+            conn.commit()
+
+    def invalidate(self, corpus_version: int) -> int:
+        """Delete reports generated on any corpus older than corpus_version; returns how many."""
+        with sqlite3.connect(self.db_path) as conn:
+            deleted = conn.execute("DELETE FROM report_cache WHERE corpus_version < ?", (corpus_version,)).rowcount
+            conn.commit()
+        return deleted
+
+    def get_stats(self) -> dict:
+        """Hit ratio and total generation time avoided by cache hits."""
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_ratio": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "latency_saved_s": round(self.latency_saved, 2),
+            }
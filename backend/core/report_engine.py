@@ -0,0 +1,197 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: report_engine.py
+Description: Section-wise report generation. Each report section gets its own prompt (and, for grounded reports, its own targeted retrieval), the sections are generated concurrently and the markdown is assembled at the end.
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import ConfigurableField
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langchain_community.chat_models import ChatOllama
+from .rag_chain import retrieve_context, aretrieve_context, LLM_MODEL
+from .metrics import metrics, timed, metrics_callback
+from .agent_budget import BudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+# Use the section engine for generate_report_tool / summarize_with_context
+REPORT_ENGINE = os.getenv("REPORT_ENGINE", "True").lower() == "true"
+
+# Bump when SECTIONS, SECTION_PROMPT or generation settings change so cached reports are regenerated
+REPORT_ENGINE_VERSION = "2"
+
+# Sections in flight at once; Ollama only runs them in parallel up to OLLAMA_NUM_PARALLEL
+REPORT_SECTION_CONCURRENCY = int(os.getenv("REPORT_SECTION_CONCURRENCY", 5))
+
+# Chunks retrieved per section
+REPORT_SECTION_K = int(os.getenv("REPORT_SECTION_K", 4))
+
+# (heading, retrieval focus appended to the topic, instruction). A None focus reuses the
+# caller's context (or the plain topic); References is built from the retrieved sources
+SECTIONS = [
+    ("Executive Summary", None,
+     "A brief overview of the human rights situation (150-200 words)."),
+    ("Key Issues and Violations", "human rights abuses arbitrary detention torture killings restrictions",
+     "A detailed bulleted list of specific human rights abuses, with concrete examples (250-300 words)."),
+    ("Affected Groups", "women children minorities ethnic religious groups journalists refugees",
+     "The groups most impacted and how (150-200 words)."),
+    ("Current Status", "recent developments government actions ongoing",
+     "Recent developments and ongoing issues as of the latest available data (150-200 words)."),
+    ("Recommendations", "accountability investigations government response reforms",
+     "Actionable bulleted steps for governments, NGOs and international bodies (150-200 words)."),
+]
+REFERENCES_HEADING = "References"
+
+SECTION_PROMPT = ChatPromptTemplate.from_template("""
+You are a human rights research assistant writing ONE section of a markdown report on: {topic}
+
+Section: {heading}
+Write: {instruction}
+
+Be objective and factual. {grounding}
+Return ONLY the section body: no heading, no title, no meta-commentary.
+
+Context: {context}
+""")
+
+_GROUNDED = "Base the section on the context from Department of State human rights reports and cite sources inline as [source]."
+_GENERAL = "Use your general knowledge; no documents are provided."
+
+# Temperature is configurable per report so callers keep their own generation settings
+llm = ChatOllama(model=LLM_MODEL, callbacks=[metrics_callback]).configurable_fields(
+    temperature=ConfigurableField(id="section_temperature"))
+section_chain = SECTION_PROMPT | llm | StrOutputParser()
+
+_SOURCE_LABEL = re.compile(r"^Source \[(.+?)\]:", re.M)
+_LEADING_HEADING = re.compile(r"^\s*#+\s*[^\n]*\n+")
+
+
+def _section_inputs(topic: str, heading: str, instruction: str, context: str) -> dict:
+    return {"topic": topic, "heading": heading, "instruction": instruction,
+            "grounding": _GROUNDED if context else _GENERAL, "context": context or "None"}
+
+
+def _section_config(temperature: float):
+    return {"configurable": {"section_temperature": temperature}} if temperature is not None else None
+
+
+def _section_query(topic: str, focus: str) -> str:
+    return f"{topic} {focus}" if focus else topic
+
+
+def _clean(body: str) -> str:
+    # Models sometimes repeat the heading despite the prompt
+    return _LEADING_HEADING.sub("", body.strip(), count=1).strip()
+
+
+def _references(contexts: list) -> str:
+    sources = list(dict.fromkeys(label for context in contexts if context for label in _SOURCE_LABEL.findall(context)))
+    if not sources:
+        return "- General knowledge; no U.S. Department of State report excerpts were retrieved."
+    return "\n".join(f"- U.S. Department of State Human Rights Reports: {source}" for source in sources)
+
+
+def assemble_report(topic: str, bodies: list, contexts: list) -> str:
+    """Join the section bodies, in SECTIONS order, into one markdown report."""
+    parts = [f"# Human Rights Report: {topic}"]
+    for (heading, _, _), body in zip(SECTIONS, bodies):
+        parts.append(f"## {heading}\n\n{body}")
+    parts.append(f"## {REFERENCES_HEADING}\n\n{_references(contexts)}")
+    return "\n\n".join(parts) + "\n"
+
+
+# Body of a section whose generation failed; reports containing it are not cached
+SECTION_FAILED = "_This section could not be generated._"
+
+
+def _section_failed(heading: str, error: Exception) -> str:
+    logger.error(f"Report section '{heading}' failed: {str(error)}")
+    metrics.increment("stage_errors", stage="report_section")
+    return SECTION_FAILED
+
+
+def failed_sections(report: str) -> int:
+    """Number of sections in an assembled report that could not be generated."""
+    return report.count(SECTION_FAILED)
+
+
+def generate_report(topic: str, context: str = None, use_rag: bool = True, stats: dict = None,
+                    temperature: float = None) -> str:
+    """
+    Generate a structured markdown report with one prompt per section, REPORT_SECTION_CONCURRENCY at a time.
+    context (e.g. retrieve_rag_context output) is used for the Executive Summary;
+    the other sections retrieve their own when use_rag is True, otherwise use general knowledge.
+    temperature overrides the model default for every section.
+    stats, if given, receives per-section seconds, the total and failed_sections.
+    """
+    start = time.perf_counter()
+
+    def run_section(section):
+        heading, focus, instruction = section
+        section_start = time.perf_counter()
+        section_context = None
+        try:
+            if use_rag:
+                section_context = (context if focus is None and context
+                                   else retrieve_context(_section_query(topic, focus), k=REPORT_SECTION_K))
+            with timed("report_section"):
+                body = _clean(section_chain.invoke(_section_inputs(topic, heading, instruction, section_context),
+                                                   config=_section_config(temperature)))
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            body = _section_failed(heading, e)
+        return body, section_context, time.perf_counter() - section_start
+
+    # ContextThreadPoolExecutor carries the caller's run config (callbacks, agent budget) into the sections
+    with timed("report_total"), ContextThreadPoolExecutor(max_workers=max(1, REPORT_SECTION_CONCURRENCY)) as executor:
+        results = list(executor.map(run_section, SECTIONS))
+    return _finish(topic, results, start, stats)
+
+
+async def agenerate_report(topic: str, context: str = None, use_rag: bool = True, stats: dict = None,
+                           temperature: float = None) -> str:
+    """Async variant of generate_report: sections are awaited concurrently on the event loop."""
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, REPORT_SECTION_CONCURRENCY))
+
+    async def run_section(section):
+        heading, focus, instruction = section
+        async with semaphore:
+            section_start = time.perf_counter()
+            section_context = None
+            try:
+                if use_rag:
+                    section_context = (context if focus is None and context
+                                       else await aretrieve_context(_section_query(topic, focus), k=REPORT_SECTION_K))
+                with timed("report_section"):
+                    body = _clean(await section_chain.ainvoke(_section_inputs(topic, heading, instruction, section_context),
+                                                              config=_section_config(temperature)))
+            except BudgetExceeded:
+                raise
+            except Exception as e:
+                body = _section_failed(heading, e)
+            return body, section_context, time.perf_counter() - section_start
+
+    with timed("report_total"):
+        results = await asyncio.gather(*(run_section(section) for section in SECTIONS))
+    return _finish(topic, results, start, stats)
+
+
+def _finish(topic: str, results: list, start: float, stats: dict) -> str:
+    bodies, contexts, seconds = zip(*results)
+    total = time.perf_counter() - start
+    logger.info(f"Report on '{topic}' generated in {total:.1f}s (longest section {max(seconds):.1f}s, "
+                f"sum of sections {sum(seconds):.1f}s)")
+    if stats is not None:
+        stats.update(total_s=round(total, 3), sections_s={heading: round(s, 3) for (heading, _, _), s in zip(SECTIONS, seconds)},
+                     failed_sections=sum(body == SECTION_FAILED for body in bodies))
+    return assemble_report(topic, list(bodies), list(contexts))
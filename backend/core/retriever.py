@@ -7,29 +7,145 @@ Description: This loads the ChromaDB embeddings and retrieves the top-k similar
 """
 
 import os
-from pathlib import Path
-from langchain_community.embeddings import OllamaEmbeddings
-from langchain_community.vectorstores import Chroma
+import asyncio
+import logging
 from langchain_core.documents import Document
+from .vector_store import get_embeddings, query_by_vectors
+from .hybrid_retriever import lexical_search, reciprocal_rank_fusion
+from .query_filters import detect_filters, build_where, relaxed_filters
+from .mmr import mmr_rerank
+from .passage_expander import expand_documents, SMALL_TO_BIG_WINDOW
+from .metrics import timed
 
-# Path definitions - use backend structure
-BACKEND_ROOT = Path(__file__).resolve().parent.parent
-CHROMA_DB_PATH = BACKEND_ROOT / "embeddings" / "chroma_db"
+logger = logging.getLogger(__name__)
 
-# Load the embeddings and vector store
-embeddings_fn = OllamaEmbeddings(model="nomic-embed-text")
-db = Chroma(persist_directory=str(CHROMA_DB_PATH), embedding_function=embeddings_fn)
+# Retrieval mode: "vector" (Chroma only) or "hybrid" (BM25 + vector with RRF)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "vector")
+
+# Detect country/year filters in the question when the caller passes none
+AUTO_FILTERS = os.getenv("RETRIEVAL_AUTO_FILTERS", "True").lower() == "true"
+
+# MMR diversification defaults: candidates over-fetched and relevance/diversity balance
+MMR_FETCH_K = int(os.getenv("MMR_FETCH_K", 20))
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", 0.5))
+
+# Small-to-big: match on small chunks, return the surrounding passage from SQLite
+SMALL_TO_BIG = os.getenv("SMALL_TO_BIG", "False").lower() == "true"
+
+# The embedding client and Chroma store are shared and opened lazily by vector_store
 
 #Retriever function
-def retrieve_documents(query: str, k: int = 5):
+def retrieve_documents(query: str, k: int = 5, mode: str = None, filters: dict = None,
+                       mmr: bool = False, fetch_k: int = MMR_FETCH_K, lambda_mult: float = MMR_LAMBDA,
+                       small_to_big: bool = None, window: int = SMALL_TO_BIG_WINDOW, query_embedding: list = None):
     """
     Retrieve top-k similar documents from ChromaDB given a query string.
+    mode="hybrid" fuses the vector ranking with BM25 over the FTS chunk index.
+    filters (country, year, document_type) are pushed into the search as a where clause;
+    None detects them from the query, {} disables filtering.
+    mmr=True over-fetches fetch_k candidates and diversifies them with maximal marginal relevance.
+    small_to_big=True expands each hit to +/- window characters of its source document.
+    query_embedding, if already computed (aretrieve_documents), skips embedding the query.
     Returns a list of Documents with metadata
     """
-    results = db.similarity_search(query, k=k)
+    mode = mode or RETRIEVAL_MODE
+    small_to_big = SMALL_TO_BIG if small_to_big is None else small_to_big
+    if filters is None:
+        filters = detect_filters(query) if AUTO_FILTERS else {}
+
+    if query_embedding is None:
+        with timed("embed_query"):
+            query_embedding = get_embeddings().embed_query(query)
+    # A year not in the corpus, or chunks ingested before country/year metadata existed,
+    # match nothing: retry with the country alone, then unfiltered
+    for filters in relaxed_filters(filters):
+        results = _vector_search(query_embedding, k, build_where(filters), mmr, fetch_k, lambda_mult)
+        if results:
+            break
+
+    if mode == "hybrid":
+        with timed("lexical_search"):
+            lexical = [doc for doc, _ in lexical_search(query, k=k, filters=filters or None)]
+        results = [doc for doc, _ in reciprocal_rank_fusion([lexical, results], k=k)]
+
+    if small_to_big:
+        with timed("small_to_big"):
+            results = expand_documents(results, window=window)
    
     return results
 
+async def aretrieve_documents(query: str, k: int = 5, mode: str = None, filters: dict = None,
+                              mmr: bool = False, fetch_k: int = MMR_FETCH_K, lambda_mult: float = MMR_LAMBDA,
+                              small_to_big: bool = None, window: int = SMALL_TO_BIG_WINDOW):
+    """
+    Async variant of retrieve_documents with the same arguments and result.
+    The query embedding (the network call to Ollama) is awaited; the local index,
+    FTS and passage lookups then run in a worker thread with that embedding.
+    """
+    with timed("embed_query"):
+        query_embedding = await get_embeddings().aembed_query(query)
+    return await asyncio.to_thread(retrieve_documents, query, k, mode, filters, mmr, fetch_k, lambda_mult,
+                                   small_to_big, window, query_embedding)
+
+def _vector_search(query_embedding: list, k: int, where: dict, mmr: bool, fetch_k: int, lambda_mult: float):
+    # Embedding and search are timed separately so each stage gets its own latency histogram
+    with timed("vector_search"):
+        hits = query_by_vectors([query_embedding], k=max(fetch_k, k) if mmr else k, where=where, include_embeddings=mmr)[0]
+    if not mmr or not hits:
+        return [doc for doc, _, _ in hits]
+    with timed("mmr"):
+        selected, _ = mmr_rerank(query_embedding, hits, [embedding for _, _, embedding in hits], k=k, lambda_mult=lambda_mult)
+    return [doc for doc, _, _ in selected]
+
+#Batched retriever function
+def retrieve_documents_batch(queries: list[str], k: int = 5, mode: str = None, filters: dict = None,
+                             small_to_big: bool = None, window: int = SMALL_TO_BIG_WINDOW) -> list[list]:
+    """
+    Retrieve top-k documents for many queries at once.
+    Query embeddings are cached and missing ones embedded concurrently, and queries sharing
+    the same where clause go to the vector store in one batched query.
+    Returns a list of Document lists in the same order as queries.
+    """
+    mode = mode or RETRIEVAL_MODE
+    if not queries:
+        return []
+    query_filters = [
+        filters if filters is not None else (detect_filters(q) if AUTO_FILTERS else {})
+        for q in queries
+    ]
+    with timed("embed_queries"):
+        query_embeddings = get_embeddings().embed_queries(queries)
+
+    results = [[] for _ in queries]
+    pending = list(range(len(queries)))
+    while pending:
+        # Group queries by where clause so each group is a single collection query
+        groups = {}
+        for i in pending:
+            where = build_where(query_filters[i])
+            groups.setdefault(repr(where), (where, []))[1].append(i)
+        pending = []
+        for where, indexes in groups.values():
+            with timed("vector_search_batch"):
+                batch = query_by_vectors([query_embeddings[i] for i in indexes], k=k, where=where)
+            for i, hits in zip(indexes, batch):
+                results[i] = [doc for doc, _, _ in hits]
+                if where and not hits:
+                    # Same fallback as retrieve_documents: retry with the next looser filters
+                    query_filters[i] = relaxed_filters(query_filters[i])[1]
+                    pending.append(i)
+
+    if mode == "hybrid":
+        for i, query in enumerate(queries):
+            with timed("lexical_search"):
+                lexical = [doc for doc, _ in lexical_search(query, k=k, filters=query_filters[i] or None)]
+            results[i] = [doc for doc, _ in reciprocal_rank_fusion([lexical, results[i]], k=k)]
+
+    if SMALL_TO_BIG if small_to_big is None else small_to_big:
+        results = [expand_documents(docs, window=window) for docs in results]
+
+    return results
+
 #test block
 if __name__ == "__main__":
     query = "What is the human rights situation in Syria?"
@@ -5,12 +5,12 @@ Date: 06-24-2025
 File: retriever_with_score.py
 Description: Retrieves top-k similar documents from ChromaDB with similarity scores. Chroma is using distance metric (e.g., Euclidean distance), where lower scores indicate more similar documents.
 """
-import os
-from pathlib import Path
 import logging
-from langchain_community.embeddings import OllamaEmbeddings
-from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
+from .vector_store import get_embeddings, get_store, query_by_vectors
+from .query_filters import detect_filters, build_where, relaxed_filters
+from .retriever import AUTO_FILTERS
+from .mmr import mmr_rerank
 
 # Setup logging
 logging.basicConfig(
@@ -20,33 +20,51 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Path definitions - use backend structure
-BACKEND_ROOT = Path(__file__).resolve().parent.parent
-CHROMA_DB_PATH = BACKEND_ROOT / "embeddings" / "chroma_db"
+# The embedding client and Chroma store are shared with retriever.py and opened lazily by vector_store
 
-# Load the embeddings and vector store
-embeddings_fn = OllamaEmbeddings(model="nomic-embed-text")
-try:
-    db = Chroma(persist_directory=str(CHROMA_DB_PATH), embedding_function=embeddings_fn)
-    logger.info(f"Loaded ChromaDB from {CHROMA_DB_PATH}")
-except Exception as e:
-    logger.error(f"Failed to load ChromaDB: {str(e)}")
-    raise
+# MMR search: over-fetch candidates with their stored embeddings, then diversify
+def search_with_score_mmr(query: str, k: int, where: dict = None, fetch_k: int = 20, lambda_mult: float = 0.5) -> list[tuple]:
+    query_embedding = get_embeddings().embed_query(query)
+    hits = query_by_vectors([query_embedding], k=max(fetch_k, k), where=where, include_embeddings=True)[0]
+    if not hits:
+        return []
+    candidates = [(doc, distance) for doc, distance, _ in hits]
+    selected, elapsed_ms = mmr_rerank(query_embedding, candidates, [embedding for _, _, embedding in hits], k=k, lambda_mult=lambda_mult)
+    logger.info(f"MMR rerank took {elapsed_ms:.2f} ms for {len(candidates)} candidates")
+    return selected
 
 # Retriever function
-def retrieve_documents(query: str, k: int = 5, score_threshold: float = 0.0) -> list[dict]:
+def retrieve_documents(query: str, k: int = 5, score_threshold: float = 0.0, filters: dict = None,
+                       mmr: bool = False, fetch_k: int = 20, lambda_mult: float = 0.5) -> list[dict]:
     """
     Retrieve top-k similar documents from ChromaDB given a query string.
     Returns a list of dictionaries with Document objects and their similarity scores.
     Filters out documents with scores below score_threshold (0.0 means no filtering).
+    filters (country, year, document_type) become a Chroma where clause; None detects them from the query
+    when RETRIEVAL_AUTO_FILTERS is on.
+    mmr=True over-fetches fetch_k candidates and keeps a diverse top-k (scores stay the Chroma distances).
     """
     if not query.strip():
         logger.warning("Empty query provided")
         return []
 
     try:
-        # Use similarity_search_with_score to get documents and scores
-        results = db.similarity_search_with_score(query, k=k)
+        if filters is None:
+            filters = detect_filters(query) if AUTO_FILTERS else {}
+
+        def search(where):
+            if mmr:
+                return search_with_score_mmr(query, k, where, fetch_k=fetch_k, lambda_mult=lambda_mult)
+            # Use similarity_search_with_score to get documents and scores
+            return get_store().similarity_search_with_score(query, k=k, filter=where)
+
+        # Relax filters that match nothing: the country alone, then unfiltered
+        for attempt in relaxed_filters(filters):
+            where = build_where(attempt)
+            results = search(where)
+            if results or where is None:
+                break
+            logger.info(f"No documents matched filter {where}, relaxing it")
         logger.info(f"Retrieved {len(results)} documents for query: {query}")
 
         # Process results into list of dicts with document and score
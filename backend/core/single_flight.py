@@ -0,0 +1,132 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: single_flight.py
+Description: Single-flight request coalescing. Concurrent calls with the same key share one in-flight computation and all receive its result (or its exception).
+"""
+
+import asyncio
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        # One entry per caller: its abandoned event, or None for a caller that cannot go away
+        self.abandoned = []
+
+
+class SingleFlight:
+    """
+    Thread-based single flight for the Flask routes.
+    Nothing is cached: once the leader finishes, the next call with the key runs again.
+    Callers that can go away (client disconnects) pass an abandoned event; the work can poll
+    abandoned(key) and stop once every caller waiting on it has set theirs.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn, *args, abandoned: threading.Event = None, **kwargs) -> tuple:
+        """Run fn(*args, **kwargs) once per in-flight key. Returns (result, shared)."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+            call.abandoned.append(abandoned)
+        if not leader:
+            logger.info(f"{self.name}: joined in-flight request for '{key}'")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+            if call.waiters:
+                logger.info(f"{self.name}: '{key}' answered {call.waiters} coalesced request(s)")
+
+    def abandoned(self, key: str) -> bool:
+        """True while key is in flight and every caller waiting on it has gone away."""
+        with self._lock:
+            call = self._calls.get(key)
+            return call is not None and all(event is not None and event.is_set() for event in call.abandoned)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+class _AsyncCall:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    Single flight for coroutines on one event loop (async routes).
+    The shared work runs in its own task; it is cancelled only once every caller
+    awaiting it has been cancelled (e.g. all their clients disconnected).
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn, *args, **kwargs) -> tuple:
+        """Await fn(*args, **kwargs) once per in-flight key. Returns (result, shared)."""
+        call = self._calls.get(key)
+        shared = call is not None
+        if shared:
+            self.coalesced += 1
+            logger.info(f"{self.name}: joined in-flight request for '{key}'")
+        else:
+            call = self._calls[key] = _AsyncCall(asyncio.ensure_future(fn(*args, **kwargs)))
+            self.leaders += 1
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            # shield: one caller going away must not cancel work others still wait on
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                logger.info(f"{self.name}: every caller for '{key}' went away, cancelling it")
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: str, call: _AsyncCall):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def get_stats(self) -> dict:
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._calls)}
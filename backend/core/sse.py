@@ -0,0 +1,14 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: sse.py
+Description: Server-Sent Events formatting shared by the Flask and ASGI route layers.
+"""
+
+import json
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event; data is JSON so newlines in tokens survive."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,123 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: vector_store.py
+Description: Lazily initialized, shared embedding client and vector store (Chroma or NumPy) for all retrievers, with an explicit warmup and readiness flag.
+"""
+
+import os
+import time
+import threading
+import logging
+from pathlib import Path
+from langchain_community.embeddings import OllamaEmbeddings
+from langchain_community.vectorstores import Chroma
+from langchain_core.documents import Document
+from .embedding_cache import CachedEmbeddings
+from .numpy_store import NumpyVectorStore, NUMPY_STORE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Path definitions - use backend structure
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+CHROMA_DB_PATH = BACKEND_ROOT / "embeddings" / "chroma_db"
+
+EMBEDDING_MODEL = "nomic-embed-text"
+
+# Vector backend: "chroma" (HNSW index) or "numpy" (exact search over a memory-mapped matrix)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+
+_lock = threading.Lock()
+_embeddings = None
+_store = None
+_status = {"ready": False, "warming_up": False, "error": None, "warmup_s": None, "chunks": None, "backend": VECTOR_BACKEND}
+
+
+def get_embeddings() -> CachedEmbeddings:
+    """Return the shared query-cached embedding client, creating it on first use."""
+    global _embeddings
+    if _embeddings is None:
+        with _lock:
+            if _embeddings is None:
+                _embeddings = CachedEmbeddings(OllamaEmbeddings(model=EMBEDDING_MODEL), model_name=EMBEDDING_MODEL)
+    return _embeddings
+
+
+def get_store():
+    """Return the shared vector store for VECTOR_BACKEND, opening it on first use."""
+    global _store
+    if _store is None:
+        embeddings = get_embeddings()
+        with _lock:
+            if _store is None:
+                if VECTOR_BACKEND == "numpy":
+                    _store = NumpyVectorStore(embedding_function=embeddings, store_dir=NUMPY_STORE_DIR)
+                else:
+                    _store = Chroma(persist_directory=str(CHROMA_DB_PATH), embedding_function=embeddings)
+                    logger.info(f"Loaded ChromaDB from {CHROMA_DB_PATH}")
+    return _store
+
+
+def count_chunks() -> int:
+    store = get_store()
+    return store.count() if isinstance(store, NumpyVectorStore) else store._collection.count()
+
+
+#Run one batched query against the vector store
+def query_by_vectors(query_embeddings: list, k: int = 5, where: dict = None, include_embeddings: bool = False) -> list[list[tuple]]:
+    """
+    Search the store with precomputed query embeddings in a single call.
+    Returns one list of (Document, distance, embedding) tuples per query, in input order;
+    embedding is None unless include_embeddings is set.
+    """
+    store = get_store()
+    if isinstance(store, NumpyVectorStore):
+        return store.query_by_vectors(query_embeddings, k=k, where=where, include_embeddings=include_embeddings)
+
+    include = ["documents", "metadatas", "distances"] + (["embeddings"] if include_embeddings else [])
+    response = store._collection.query(
+        query_embeddings=query_embeddings,
+        n_results=k,
+        where=where,
+        include=include
+    )
+    all_embeddings = response["embeddings"] if include_embeddings else [[None] * len(ids) for ids in response["ids"]]
+    return [
+        [(Document(page_content=text, metadata=metadata or {}), distance, embedding)
+         for text, metadata, distance, embedding in zip(texts, metadatas, distances, embeddings)]
+        for texts, metadatas, distances, embeddings in zip(
+            response["documents"], response["metadatas"], response["distances"], all_embeddings)
+    ]
+
+
+def warmup() -> dict:
+    """
+    Open the index, load the collection and run one dummy embedding so the first
+    real query doesn't pay for model load. Safe to call more than once.
+    """
+    _status.update(warming_up=True, error=None)
+    start_time = time.time()
+    try:
+        _status["chunks"] = count_chunks()
+        # Goes straight to the model so the embedding model is loaded in Ollama
+        get_embeddings().embeddings.embed_query("warmup")
+        _status.update(ready=True, warmup_s=round(time.time() - start_time, 2))
+        logger.info(f"Vector store warm in {_status['warmup_s']}s ({_status['chunks']} chunks)")
+    except Exception as e:
+        _status.update(ready=False, error=str(e))
+        logger.error(f"Vector store warmup failed: {str(e)}")
+    finally:
+        _status["warming_up"] = False
+    return get_status()
+
+
+def is_ready() -> bool:
+    return _status["ready"]
+
+
+def get_status() -> dict:
+    """Readiness plus embedding cache counters, for the health endpoint."""
+    status = dict(_status)
+    status["embedding_cache"] = _embeddings.get_stats() if _embeddings is not None else None
+    return status
@@ -7,6 +7,10 @@ Description: This file is used to ingest documents & scraped websites into the d
 """
 
 import os
+import sys
+import json
+import signal
+import hashlib
 import sqlite3
 import pandas as pd
 import fitz
@@ -21,6 +25,16 @@ from langchain_core.documents import Document
 from pathlib import Path
 import shutil
 
+# Add project root to path so backend.core can be imported when run as a script
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from backend.core.corpus_version import bump_corpus_version
+from backend.core.report_cache import ReportCache
+from backend.core.query_filters import country_from_filename, year_from_text
+from backend.core.numpy_store import export_from_chroma
+from backend.core.ingest_jobs import report_progress
+
 # Path definitions - use backend structure
 BACKEND_ROOT = Path(__file__).parent.parent
 DATA_DIR = BACKEND_ROOT / "data"
@@ -29,6 +43,17 @@ PDF_DIR = DATA_DIR / "pdf" / "dos"
 DB_PATH = BACKEND_ROOT / "db" / "documents.db"
 CHROMA_DB_PATH = BACKEND_ROOT / "embeddings" / "chroma_db"
 
+# Chunking - small chunks embed cheaply; retrieval can expand them from SQLite by offset
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 500))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 100))
+
+# Also export embeddings to the memory-mapped NumPy backend when it is selected
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+NUMPY_STORE_DTYPE = os.getenv("NUMPY_STORE_DTYPE", "float32")
+
+# Chunks embedded per Chroma write; progress is reported after each batch
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 256))
+
 #logging
 logging.basicConfig(
     level=logging.INFO, 
@@ -57,8 +82,21 @@ def init_sqlite():
         )
     """)
     conn.commit()
+    init_chunk_index(conn)
     return conn
 
+#FTS5 index over chunk text for lexical (BM25) retrieval
+def init_chunk_index(conn):
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+            chunk_id UNINDEXED,
+            title,
+            content,
+            metadata UNINDEXED
+        )
+    """)
+    conn.commit()
+
 #Extract source from URL
 def get_source_from_url(url: str) -> str:
     parsed_url = urlparse(url)
@@ -73,21 +111,30 @@ def load_pdfs(pdf_dir):
     Loads and cleans PDF documents from a directory.
     """
     docs = []
-    for fname in os.listdir(pdf_dir):
-        if fname.endswith(".pdf"):
-            path = os.path.join(pdf_dir, fname)
-            text = ""
-            with fitz.open(path) as doc:
-                for page in doc:
-                    text += page.get_text()
-            source = get_source_from_url("https://www.state.gov/reports/2023-country-reports-on-human-rights-practices/")
-            docs.append(Document(page_content=text, metadata={
-                "title": fname,
-                "source": source,
-                "document_type": "pdf",
-                "date_added": datetime.now().strftime("%Y-%m-%d"),
-                "tags": "human_rights,state_department"
-            }))
+    pdf_files = [fname for fname in os.listdir(pdf_dir) if fname.endswith(".pdf")]
+    for fname in pdf_files:
+        path = os.path.join(pdf_dir, fname)
+        text = ""
+        with fitz.open(path) as doc:
+            for page in doc:
+                text += page.get_text()
+        report_url = "https://www.state.gov/reports/2023-country-reports-on-human-rights-practices/"
+        source = get_source_from_url(report_url)
+        metadata = {
+            "title": fname,
+            "source": source,
+            "document_type": "pdf",
+            "date_added": datetime.now().strftime("%Y-%m-%d"),
+            "tags": "human_rights,state_department"
+        }
+        # Country and report year drive metadata pre-filtering at query time
+        country = country_from_filename(fname)
+        if country:
+            metadata["country"] = country
+        metadata["year"] = year_from_text(fname) or year_from_text(report_url)
+        docs.append(Document(page_content=text, metadata=metadata))
+        report_progress("parse_pdfs", done=len(docs), total=len(pdf_files),
+                        pdfs_parsed=len(docs), pdfs_total=len(pdf_files))
     return docs
 
 #Load CSV Data from Kaggle
@@ -123,10 +170,107 @@ def save_to_sqlite(docs, conn):
                       doc.page_content, 
                       doc.metadata["date_added"], 
                       doc.metadata["tags"]))
+        # Row ID links chunks back to the full text for small-to-big expansion
+        doc.metadata["doc_id"] = c.lastrowid
     conn.commit()
 
+#Record where each chunk sits in its source document
+def add_chunk_offsets(chunks):
+    for chunk in chunks:
+        start = chunk.metadata.get("start_index", -1)
+        if start is not None and start >= 0:
+            chunk.metadata["end_index"] = start + len(chunk.page_content)
+    return chunks
+
+#Give every chunk a stable ID so Chroma and the FTS index refer to the same chunk
+def assign_chunk_ids(chunks):
+    positions = {}
+    for chunk in chunks:
+        key = (chunk.metadata.get("source"), chunk.metadata.get("title"))
+        position = positions.get(key, 0)
+        positions[key] = position + 1
+        digest = hashlib.sha1(f"{key[0]}|{key[1]}|{position}".encode("utf-8")).hexdigest()
+        chunk.metadata["chunk_id"] = digest[:16]
+    return [chunk.metadata["chunk_id"] for chunk in chunks]
+
+#Save chunks to the FTS index (rebuilt on every ingest)
+def save_chunks_to_fts(chunks, conn):
+    c = conn.cursor()
+    c.execute("DELETE FROM chunks_fts")
+    c.executemany("""
+                  INSERT INTO chunks_fts (chunk_id, title, content, metadata)
+                  VALUES (?, ?, ?, ?)
+                  """, [
+                      (chunk.metadata["chunk_id"],
+                       chunk.metadata.get("title", ""),
+                       chunk.page_content,
+                       json.dumps(chunk.metadata))
+                      for chunk in chunks])
+    conn.commit()
+
+#Embed chunks into Chroma in batches so progress can be reported while embedding.
+#Chunk IDs are positional, so a re-ingest upserts them: add() would keep the old text and vector for an existing ID
+def embed_chunks(chunks, chunk_ids, embedding_fn, batch_size=EMBED_BATCH_SIZE):
+    vector_db = Chroma(persist_directory=str(CHROMA_DB_PATH), embedding_function=embedding_fn)
+    report_progress("embed", done=0, total=len(chunks), chunks_embedded=0)
+    for start in range(0, len(chunks), batch_size):
+        batch = chunks[start:start + batch_size]
+        texts = [chunk.page_content for chunk in batch]
+        vector_db._collection.upsert(
+            ids=chunk_ids[start:start + batch_size],
+            embeddings=embedding_fn.embed_documents(texts),
+            documents=texts,
+            metadatas=[chunk.metadata for chunk in batch],
+        )
+        embedded = min(start + batch_size, len(chunks))
+        report_progress("embed", done=embedded, total=len(chunks), chunks_embedded=embedded)
+    return vector_db
+
+#Delete chunks left over from a previous ingest (e.g. a shrunk corpus or a larger CHUNK_SIZE)
+def delete_stale_chunks(vector_db, chunk_ids, batch_size=EMBED_BATCH_SIZE):
+    current = set(chunk_ids)
+    stale = [chunk_id for chunk_id in vector_db._collection.get(include=[])["ids"] if chunk_id not in current]
+    for start in range(0, len(stale), batch_size):
+        vector_db._collection.delete(ids=stale[start:start + batch_size])
+    return len(stale)
+
+#Raised in the main thread when the ingest job is cancelled (SIGTERM)
+class IngestCancelled(Exception):
+    pass
+
+def _cancel(signum, frame):
+    raise IngestCancelled()
+
+#Embed the chunks, then rebuild the FTS index and bump the corpus version
+def index_chunks(chunks, chunk_ids, conn, embedding_fn):
+    completed = False
+    try:
+        vector_db = embed_chunks(chunks, chunk_ids, embedding_fn)
+        deleted = delete_stale_chunks(vector_db, chunk_ids)
+        logger.info(f"Deleted {deleted} chunks no longer in the corpus from Chroma")
+        # FTS is replaced only once every chunk is embedded, so a cancelled ingest keeps the old lexical index
+        save_chunks_to_fts(chunks, conn)
+        if VECTOR_BACKEND == "numpy":
+            report_progress("export")
+            exported = export_from_chroma(vector_db, dtype=NUMPY_STORE_DTYPE)
+            logger.info(f"Exported {exported} embeddings to the NumPy vector store")
+        completed = True
+        return vector_db
+    finally:
+        # New embeddings invalidate answers and reports cached against the previous corpus.
+        # Chroma may already hold some new chunks when indexing stops part-way, so bump regardless
+        corpus_version = bump_corpus_version()
+        logger.info(f"Corpus version bumped to {corpus_version}")
+        invalidated = ReportCache().invalidate(corpus_version)
+        logger.info(f"Invalidated {invalidated} cached reports generated on an older corpus")
+        if not completed:
+            logger.warning("Indexing stopped part-way: the vector index is partial until the next full ingest")
+            report_progress("index_interrupted", partial_index=True)
+
 #Main ingest routine
 if __name__ == "__main__":
+    # Cancelling the ingest job sends SIGTERM; unwind so index_chunks can leave the indexes consistent
+    signal.signal(signal.SIGTERM, _cancel)
     conn = init_sqlite()
 
     print("Loading PDFs...")
@@ -134,18 +278,27 @@ if __name__ == "__main__":
     print(f"Loaded {len(pdf_docs)} PDFs")
 
     print("Loading CSV...")
+    report_progress("load_csv")
     csv_docs = load_csv(CSV_DIR / "human_rights.csv")
     print(f"Loaded {len(csv_docs)} CSV rows")
+    report_progress("load_csv", csv_rows=len(csv_docs))
 
     all_docs = pdf_docs + csv_docs
     save_to_sqlite(all_docs, conn)
 
     print("Splitting and embedding documents...")
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
-    chunks = text_splitter.split_documents(all_docs)
+    report_progress("split")
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, add_start_index=True)
+    chunks = add_chunk_offsets(text_splitter.split_documents(all_docs))
+    chunk_ids = assign_chunk_ids(chunks)
+    report_progress("split", chunks_total=len(chunks))
 
     embedding_fn = OllamaEmbeddings(model="nomic-embed-text")
-    Chroma.from_documents(documents=chunks, embedding=embedding_fn, persist_directory=str(CHROMA_DB_PATH))
+    try:
+        vector_db = index_chunks(chunks, chunk_ids, conn, embedding_fn)
+    except IngestCancelled:
+        logger.warning("Ingest cancelled")
+        sys.exit(128 + signal.SIGTERM)
 
     logger.info(f"Loaded {len(pdf_docs)} PDFs")
     logger.info(f"Loaded {len(csv_docs)} CSV rows")
@@ -9,12 +9,16 @@ Description: Runs the ingest pipeline for the dos_scraper.py file
 import subprocess
 import logging
 import os
+import sys
 import glob
 from pathlib import Path
 import shutil
 
 #Path to root of project
 PROJECT_ROOT = Path(__file__).parent.parent.parent
+if str(PROJECT_ROOT.resolve()) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT.resolve()))
+from backend.core.ingest_jobs import report_progress
 BACKEND_ROOT = Path(__file__).parent.parent
 DATA_DIR = BACKEND_ROOT / "data"
 PDF_DIR = DATA_DIR / "pdf" / "dos"
@@ -136,7 +140,6 @@ if __name__ == "__main__":
     print("="*50)
     print("PIPELINE SCRIPT STARTING")
     print("="*50)
-    import sys
     sys.stdout.flush()
     
     logger.info("Starting ingest pipeline...")
@@ -144,6 +147,7 @@ if __name__ == "__main__":
     sys.stdout.flush()
     
     # Download Kaggle dataset
+    report_progress("download")
     print("About to call download_kaggle_dataset()...")
     sys.stdout.flush()
     try:
@@ -162,17 +166,20 @@ if __name__ == "__main__":
         sys.stdout.flush()
     else:
         #Run the dos_scraper.py file
+        report_progress("scrape")
         try: 
-            subprocess.run(["python", "ingest/dos_scraper.py"], check=True)
+            subprocess.run([sys.executable, str(BACKEND_ROOT / "ingest" / "dos_scraper.py")], check=True)
             logger.info("dos_scraper.py completed successfully!")
         except subprocess.CalledProcessError as e:
             logger.error(f"dos_scraper.py failed: {e}")
 
-    #Run the ingest_documents.py file
+    #Run the ingest_documents.py file - it reports its own stages to the job runner
     try:
-        subprocess.run(["python", "ingest/ingest_documents.py"], check=True)
+        subprocess.run([sys.executable, str(BACKEND_ROOT / "ingest" / "ingest_documents.py")], check=True)
         logger.info("ingest_documents.py completed successfully!")
     except subprocess.CalledProcessError as e:
         logger.error(f"ingest_documents.py failed: {e}")
+        # Exit non-zero so the ingest job is marked failed
+        sys.exit(e.returncode)
 
     logger.info("Ingest pipeline completed successfully!")  
\ No newline at end of file
@@ -9,10 +9,9 @@ Description: Retains chat history in a SQL table with session management
 import sqlite3
 from datetime import datetime
 from langchain_core.messages import HumanMessage, AIMessage
-from pathlib import Path
+from backend.core.paths import DB_PATH
 
-# Define the absolute path to the database
-DB_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "db" / "documents.db"
+# Chat history lives in the shared application database
 DB_PATH.parent.mkdir(parents=True, exist_ok=True) 
 
 def init_chat_table():
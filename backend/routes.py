@@ -8,12 +8,15 @@ Description: Flask routes for the Human Rights LLM.
 
 import os
 import sys
+import json
 from pathlib import Path
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
-import subprocess
+import threading
 import logging
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime
 
 # Add project root to path
@@ -23,6 +26,15 @@ sys.path.append(str(PROJECT_ROOT))
 # Import the agent, Notion publishing, and chat history
 from backend.agent.notion_react_agent import run_agent, publish_to_notion
 from backend.memory import sql_chat_memory as chat_history
+from backend.core import vector_store
+from backend.core.rag_chain import stream_rag_chain, iter_rag_chain_batch, RAG_BATCH_CONCURRENCY
+from backend.core.metrics import metrics
+from backend.core.single_flight import SingleFlight
+from backend.core.agent_budget import AgentBudget
+from backend.core.embedding_cache import normalize_query
+from backend.core.notion_outbox import get_outbox
+from backend.core.sse import sse_event
+from backend.core.ingest_jobs import IngestJobManager
 
 # Load environment variables
 load_dotenv()
@@ -34,40 +46,110 @@ CORS(app)  # Enable CORS for frontend communication
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Limits for /api/rag/batch
+RAG_BATCH_MAX_QUESTIONS = int(os.environ.get('RAG_BATCH_MAX_QUESTIONS', 100))
+RAG_BATCH_MAX_CONCURRENCY = int(os.environ.get('RAG_BATCH_MAX_CONCURRENCY', 8))
+
+# Identical in-flight /api/agent questions share one agent run and one Notion page
+agent_flight = SingleFlight("agent")
+
+# Agent runs happen off the request thread so /api/agent can notice a disconnected client:
+# it writes a space every AGENT_KEEPALIVE_S, and a failed write closes the response generator
+AGENT_WORKERS = int(os.environ.get('AGENT_WORKERS', 16))
+AGENT_KEEPALIVE_S = float(os.environ.get('AGENT_KEEPALIVE_S', 2.0))
+agent_runs = ThreadPoolExecutor(max_workers=AGENT_WORKERS, thread_name_prefix="agent")
+
+# Reports are published to Notion in the background. The worker starts with the app so
+# entries left pending or publishing by a previous process are picked up without a new request
+notion_outbox = get_outbox()
+
+# Ingest runs as a background job, one at a time; progress is polled or streamed over SSE
+ingest_jobs = IngestJobManager()
+INGEST_EVENTS_KEEPALIVE_S = float(os.environ.get('INGEST_EVENTS_KEEPALIVE_S', 15.0))
+
 @app.route('/api/agent', methods=['POST'])
 def agent_endpoint():
     """
     Handle agent queries from the frontend.
     Expects JSON with 'query' field.
-    Returns JSON with 'result' (agent response) and 'notion_success' (publishing status).
+    Returns JSON with 'result' (agent response), 'notion_success' (publishing status; null while
+    queued in the Notion outbox, see 'publish_id' and /api/notion/publish/<publish_id>)
+    and 'coalesced' (true when this request joined an identical one already in flight).
+    The JSON is streamed after leading keep-alive spaces, so agent errors arrive with status 200
+    and 'status': 'error'. When the client disconnects and no coalesced request still waits,
+    the agent run is cancelled at its next LLM token or tool call and nothing is published.
     """
     logger.info("Received request to /api/agent")
-    try:
-        data = request.get_json()
-        
-        if not data or 'query' not in data:
-            logger.error("Missing query parameter")
-            return jsonify({'error': 'Missing query parameter'}), 400
-        
-        user_query = data['query']
-        logger.info(f"API query: {user_query}")
-        
-        # Run the agent
-        result = run_agent(user_query)
-        logger.info(f"Agent result: {result['output'][:100]}...")
-        
-        # Extract the output
-        if isinstance(result, dict) and 'output' in result:
-            response_text = result['output']
-        else:
-            logger.warning("Unexpected result structure")
-            response_text = str(result)
-        
-        # Prepare for Notion publishing
-        title = f"Human Rights Report: {user_query.title()}" if "report" in user_query.lower() else f"Summary: {user_query.title()}"
-        logger.info(f"Attempting to publish to Notion with title: {title}")
-        
-        # Publish to Notion
+    data = request.get_json(silent=True)
+    if not data or 'query' not in data:
+        logger.error("Missing query parameter")
+        return jsonify({'error': 'Missing query parameter'}), 400
+
+    user_query = data['query']
+    logger.info(f"API query: {user_query}")
+    key = normalize_query(user_query)
+    abandoned = threading.Event()
+    # Only the leader's budget is used; it stops once every caller of the key has gone away
+    budget = AgentBudget(cancelled=lambda: agent_flight.abandoned(key))
+    future = agent_runs.submit(agent_flight.do, key, _run_agent_and_publish, user_query, budget,
+                               abandoned=abandoned)
+
+    def generate():
+        try:
+            while True:
+                try:
+                    outcome, coalesced = future.result(timeout=AGENT_KEEPALIVE_S)
+                    break
+                except FutureTimeout:
+                    yield ' '
+        except GeneratorExit:
+            logger.info(f"Client disconnected from agent run for: {user_query}")
+            metrics.increment("agent_requests", outcome="disconnected")
+            abandoned.set()
+            raise
+        except Exception as e:
+            logger.error(f"Agent error: {str(e)}")
+            yield json.dumps({'error': f'Agent error: {str(e)}', 'status': 'error'})
+            return
+
+        metrics.increment("agent_requests", outcome="coalesced" if coalesced else "executed")
+        yield json.dumps({
+            'result': outcome['result'],
+            'notion_success': outcome['notion_success'],
+            'publish_id': outcome.get('publish_id'),
+            'route': outcome.get('route'),
+            'cached': outcome.get('cached', False),
+            'partial': outcome.get('partial', False),
+            'budget': outcome.get('budget'),
+            'coalesced': coalesced,
+            'status': 'success'
+        })
+
+    return Response(generate(), mimetype='application/json', headers={'X-Accel-Buffering': 'no'})
+
+def _run_agent_and_publish(user_query: str, budget: AgentBudget = None) -> dict:
+    # Run the agent
+    result = run_agent(user_query, budget)
+    logger.info(f"Agent result: {result['output'][:100]}...")
+    
+    # Extract the output
+    if isinstance(result, dict) and 'output' in result:
+        response_text = result['output']
+    else:
+        logger.warning("Unexpected result structure")
+        response_text = str(result)
+    
+    # Prepare for Notion publishing
+    title = f"Human Rights Report: {user_query.title()}" if "report" in user_query.lower() else f"Summary: {user_query.title()}"
+    logger.info(f"Attempting to publish to Notion with title: {title}")
+    
+    notion_success, publish_id = None, None
+    if notion_outbox is not None:
+        # Queue for the background worker instead of waiting on the Notion API
+        publish_id = notion_outbox.enqueue(title, response_text, datetime.now().strftime("%Y-%m-%d"),
+                                           "Human Rights LLM Agent")
+        logger.info(f"Queued Notion publish {publish_id}")
+    else:
         notion_success = publish_to_notion(
             title=title,
             content=response_text,
@@ -78,64 +160,209 @@ def agent_endpoint():
             logger.info("Successfully published to Notion")
         else:
             logger.error("Failed to publish to Notion")
-        
-        return jsonify({
-            'result': response_text,
-            'notion_success': notion_success,
-            'status': 'success'
-        })
-        
-    except Exception as e:
-        logger.error(f"Agent error: {str(e)}")
-        return jsonify({
-            'error': f'Agent error: {str(e)}',
-            'status': 'error'
-        }), 500
+    # route: set when the intent router skipped the ReAct agent (LLM calls/seconds saved)
+    # partial/budget: set when the agent budget ran out and the best tool output so far is returned
+    result = result if isinstance(result, dict) else {}
+    return {'result': response_text, 'notion_success': notion_success, 'publish_id': publish_id,
+            'route': result.get('route'),
+            'cached': bool(result.get('cached')), 'partial': bool(result.get('partial')),
+            'budget': result.get('budget')}
+
+@app.route('/api/notion/publish/<int:publish_id>', methods=['GET'])
+def notion_publish_status(publish_id: int):
+    """
+    Status of one queued Notion publish: pending, publishing, published or failed,
+    with attempts and the last error.
+    """
+    entry = notion_outbox.get(publish_id) if notion_outbox is not None else None
+    if entry is None:
+        return jsonify({'error': f'Unknown publish id {publish_id}', 'status': 'error'}), 404
+    return jsonify({'publish': entry, 'status': 'success'})
+
+@app.route('/api/rag/stream', methods=['GET', 'POST'])
+def rag_stream_endpoint():
+    """
+    Stream a RAG answer as Server-Sent Events.
+    Takes 'query' from the JSON body (POST) or the query string (GET, for EventSource).
+    Emits 'token' events with {"text": ...}, then one 'done' event with
+    {"ttft_s", "latency_s", "cached"}, or an 'error' event.
+    """
+    data = request.get_json(silent=True) or {}
+    user_query = data.get('query') or request.args.get('query')
+    if not user_query:
+        logger.error("Missing query parameter")
+        return jsonify({'error': 'Missing query parameter'}), 400
+    logger.info(f"Streaming query: {user_query}")
+
+    def generate():
+        stats = {}
+        try:
+            # A disconnect closes this generator; closing the chain's stream closes the Ollama request
+            with closing(stream_rag_chain(user_query, stats=stats)) as chunks:
+                for chunk in chunks:
+                    yield sse_event('token', {'text': chunk})
+            yield sse_event('done', stats)
+        except Exception as e:
+            logger.error(f"Streaming error: {str(e)}")
+            yield sse_event('error', {'error': f'Streaming error: {str(e)}'})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        # Stop proxies from buffering the stream
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/rag/batch', methods=['POST'])
+def rag_batch_endpoint():
+    """
+    Answer a list of questions with the RAG chain (no agent, no Notion publishing).
+    Expects JSON with 'questions' (list of strings) and optional 'max_concurrency' and 'k'.
+    Streams NDJSON: one line per question in completion order with its index, answer or
+    error and timings, then a summary line with "done": true.
+    """
+    data = request.get_json(silent=True) or {}
+    questions = data.get('questions')
+    if not isinstance(questions, list) or not questions or not all(isinstance(q, str) and q.strip() for q in questions):
+        logger.error("Invalid questions parameter")
+        return jsonify({'error': "'questions' must be a non-empty list of strings"}), 400
+    if len(questions) > RAG_BATCH_MAX_QUESTIONS:
+        return jsonify({'error': f'At most {RAG_BATCH_MAX_QUESTIONS} questions per batch'}), 400
+    try:
+        max_concurrency = min(max(int(data.get('max_concurrency', RAG_BATCH_CONCURRENCY)), 1), RAG_BATCH_MAX_CONCURRENCY)
+        k = max(int(data.get('k', 5)), 1)
+    except (TypeError, ValueError):
+        return jsonify({'error': "'max_concurrency' and 'k' must be integers"}), 400
+    logger.info(f"Batch of {len(questions)} questions, concurrency {max_concurrency}")
+
+    def generate():
+        start_time = datetime.now()
+        failed = 0
+        for result in iter_rag_chain_batch(questions, k=k, max_concurrency=max_concurrency):
+            failed += result['error'] is not None
+            yield json.dumps(result) + "\n"
+        yield json.dumps({
+            'done': True,
+            'count': len(questions),
+            'failed': failed,
+            'max_concurrency': max_concurrency,
+            'latency_s': round((datetime.now() - start_time).total_seconds(), 3)
+        }) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no'})
 
 @app.route('/api/ingest', methods=['POST'])
 def trigger_ingest():
     """
-    Trigger the ingest pipeline from the frontend.
-    Returns status of the ingest process.
+    Start the ingest pipeline as a background job and return its job id (202).
+    Only one ingest runs at a time: triggering while one is running returns that
+    job with 'coalesced': true instead of starting another.
     """
-    logger.info("Starting ingest pipeline")
     try:
-        result = subprocess.run(
-            ["python", "backend/ingest/run_ingest_pipeline.py"],
-            capture_output=True,
-            text=True,
-            cwd=PROJECT_ROOT,
-            timeout=300
-        )
-        
-        if result.returncode == 0:
-            logger.info("Ingest pipeline completed successfully")
-            return jsonify({
-                'status': 'success',
-                'message': 'Ingest pipeline completed successfully!',
-                'output': result.stdout
-            })
-        else:
-            logger.error(f"Ingest pipeline failed: {result.stderr}")
-            return jsonify({
-                'status': 'error',
-                'message': 'Ingest pipeline failed',
-                'error': result.stderr,
-                'output': result.stdout
-            }), 500
-            
-    except subprocess.TimeoutExpired:
-        logger.error("Ingest pipeline timed out")
-        return jsonify({
-            'status': 'error',
-            'message': 'Ingest pipeline timed out (5 minutes)'
-        }), 500
+        job, created = ingest_jobs.start()
     except Exception as e:
-        logger.error(f"Failed to run ingest pipeline: {str(e)}")
+        logger.error(f"Failed to start ingest pipeline: {str(e)}")
         return jsonify({
             'status': 'error',
-            'message': f'Failed to run ingest pipeline: {str(e)}'
+            'message': f'Failed to start ingest pipeline: {str(e)}'
         }), 500
+    logger.info(f"Ingest job {job.job_id} {'started' if created else 'already running'}")
+    return jsonify({
+        'status': 'accepted',
+        'job_id': job.job_id,
+        'coalesced': not created,
+        'job': job.snapshot()
+    }), 202
+
+@app.route('/api/ingest/<job_id>', methods=['GET'])
+def ingest_status(job_id: str):
+    """
+    Status of one ingest job: status (running, succeeded, failed, cancelled), stage,
+    counts (pdfs_parsed, csv_rows, chunks_total, chunks_embedded, partial_index), throughput,
+    ETA and log tail.
+    """
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown ingest job {job_id}', 'status': 'error'}), 404
+    return jsonify({'job': job.snapshot(), 'status': 'success'})
+
+@app.route('/api/ingest/<job_id>/events', methods=['GET'])
+def ingest_events(job_id: str):
+    """
+    Stream an ingest job's progress as Server-Sent Events: a 'progress' event with the
+    job status whenever it changes, then one 'done' event when the job finishes.
+    """
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown ingest job {job_id}', 'status': 'error'}), 404
+
+    def generate():
+        version = -1
+        while True:
+            snapshot = job.snapshot()
+            if not job.running:
+                yield sse_event('done', snapshot)
+                return
+            if snapshot['version'] != version:
+                version = snapshot['version']
+                yield sse_event('progress', snapshot)
+            else:
+                # Keep the connection open through long stages
+                yield ": keepalive\n\n"
+            job.wait_for_change(version, timeout=INGEST_EVENTS_KEEPALIVE_S)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/ingest/<job_id>/cancel', methods=['POST'])
+def cancel_ingest(job_id: str):
+    """
+    Cancel a running ingest job (the pipeline and the scripts it started are terminated).
+    Cancelled while embedding, the job's counts get partial_index: true: Chroma holds only
+    the chunks embedded so far, the FTS index keeps the previous corpus and the corpus
+    version is bumped so cached answers are not served against either.
+    """
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown ingest job {job_id}', 'status': 'error'}), 404
+    if not ingest_jobs.cancel(job_id):
+        return jsonify({'error': f'Ingest job {job_id} is not running', 'job': job.snapshot(), 'status': 'error'}), 409
+    return jsonify({'job': job.snapshot(), 'status': 'success'})
+
+@app.route('/api/health', methods=['GET'])
+def health():
+    """
+    Report whether the vector store and embedding model are warmed up.
+    Returns 200 when ready and 503 while warming up or after a failed warmup.
+    """
+    status = vector_store.get_status()
+    return jsonify({
+        'status': 'ready' if status['ready'] else 'starting',
+        'vector_store': status
+    }), 200 if status['ready'] else 503
+
+@app.route('/api/warmup', methods=['POST'])
+def warmup():
+    """
+    Explicitly (re)load the vector store and run a dummy embedding.
+    """
+    logger.info("Received request to /api/warmup")
+    status = vector_store.warmup()
+    return jsonify({
+        'status': 'success' if status['ready'] else 'error',
+        'vector_store': status
+    }), 200 if status['ready'] else 500
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """
+    Per-stage latency histograms with p50/p95/p99 in Prometheus text format.
+    """
+    return Response(metrics.prometheus_text(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/chat_history', methods=['GET'])
 def get_chat_history():
@@ -169,8 +396,12 @@ if __name__ == "__main__":
     port = int(os.environ.get('PORT', 5001))
     debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
+    # Load the index and embedding model in the background so startup isn't blocked
+    threading.Thread(target=vector_store.warmup, daemon=True).start()
+
     logger.info(f"Starting Human Rights LLM API on port {port}")
     logger.info(f"API will be available at: http://localhost:{port}")
     logger.info(f"Frontend can connect to: http://localhost:{port}/api/agent")
+    logger.info(f"Streaming answers at: http://localhost:{port}/api/rag/stream")
     
     app.run(host='0.0.0.0', port=port, debug=debug)
\ No newline at end of file
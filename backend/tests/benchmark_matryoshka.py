@@ -0,0 +1,94 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: benchmark_matryoshka.py
+Description: Latency/recall trade-off of two-stage retrieval (coarse search on truncated, renormalized prefixes, then full-vector rerank) against exact full-dimension search.
+
+Usage (from backend/):
+    python tests/benchmark_matryoshka.py                 # synthetic Matryoshka-like corpus
+    python tests/benchmark_matryoshka.py --from-chroma   # export the real embeddings/chroma_db
+The synthetic corpus puts most of the topic signal in the leading dimensions, as Matryoshka
+training does; only --from-chroma numbers say how nomic-embed-text itself behaves.
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.core.numpy_store import NumpyVectorStore, build_numpy_store, export_from_chroma
+
+
+def make_corpus(n: int, dim: int, clusters: int = 200, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # Topic signal decays with dimension index; per-chunk noise is spread evenly
+    decay = 1.0 / np.sqrt(1.0 + np.arange(dim) / 32.0)
+    centers = rng.normal(size=(clusters, dim)) * decay
+    embeddings = (centers[rng.integers(0, clusters, n)] + 0.25 * rng.normal(size=(n, dim))).astype(np.float32)
+    ids = [f"chunk-{i}" for i in range(n)]
+    texts = [f"synthetic chunk {i}" for i in range(n)]
+    metadatas = [{"chunk_id": ids[i]} for i in range(n)]
+    return ids, texts, metadatas, embeddings
+
+
+def run(store: NumpyVectorStore, queries: np.ndarray, k: int) -> tuple[list, list]:
+    results, latencies = [], []
+    for query in queries:
+        t = time.perf_counter()
+        rows, _ = store.top_k(query, k)
+        latencies.append((time.perf_counter() - t) * 1000)
+        results.append(set(rows.tolist()))
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20000, help="synthetic chunk count")
+    parser.add_argument("--dim", type=int, default=768, help="embedding dimension (nomic-embed-text is 768)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dims", default="64,128,256", help="comma-separated coarse dimensions")
+    parser.add_argument("--coarse-n", default="25,100,400", help="comma-separated candidate counts to rerank")
+    parser.add_argument("--from-chroma", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_dir = Path(tmp)
+        if args.from_chroma:
+            from langchain_community.vectorstores import Chroma
+            from backend.core.vector_store import CHROMA_DB_PATH
+            count = export_from_chroma(Chroma(persist_directory=str(CHROMA_DB_PATH)), store_dir=store_dir)
+            print(f"Exported {count} vectors from {CHROMA_DB_PATH}")
+        else:
+            build_numpy_store(*make_corpus(args.n, args.dim), store_dir=store_dir)
+
+        exact = NumpyVectorStore(store_dir=store_dir, quantization="none", coarse_dims=0)
+        rng = np.random.default_rng(1)
+        sample = rng.integers(0, exact.count(), args.queries)
+        matrix = np.asarray(exact.matrix[sample], dtype=np.float32)
+        queries = matrix + 0.3 * rng.normal(size=matrix.shape).astype(np.float32) / np.sqrt(matrix.shape[1])
+
+        truth, latencies = run(exact, queries, args.k)
+        full_dims = exact.matrix.shape[1]
+        print(f"{exact.count()} vectors x {full_dims} dims, k={args.k}, {args.queries} queries")
+        print(f"{'dims':>5} {'coarse_n':>8} {'index_mb':>9} {f'recall@{args.k}':>9} {'p50_ms':>8} {'p95_ms':>8}")
+        print(f"{full_dims:>5} {'exact':>8} {exact.memory_bytes() / 2**20:>9.1f} {1.0:>9.3f} "
+              f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f}")
+
+        for dims in [int(d) for d in args.dims.split(",")]:
+            for coarse_n in [int(n) for n in args.coarse_n.split(",")]:
+                store = NumpyVectorStore(store_dir=store_dir, quantization="none", coarse_dims=dims, coarse_n=coarse_n)
+                found, latencies = run(store, queries, args.k)
+                recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+                print(f"{dims:>5} {coarse_n:>8} {store.memory_bytes() / 2**20:>9.1f} {recall:>9.3f} "
+                      f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: benchmark_quantization.py
+Description: Measures first-pass memory, recall@k and latency of int8/float16 quantized search with full-precision rescoring against the unquantized NumPy baseline.
+
+Usage (from backend/):
+    python tests/benchmark_quantization.py                 # clustered synthetic corpus
+    python tests/benchmark_quantization.py --from-chroma   # export the real embeddings/chroma_db
+Queries are perturbed copies of stored chunks, so every query has real near neighbours.
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.core.numpy_store import NumpyVectorStore, build_numpy_store, export_from_chroma
+
+
+def make_corpus(n: int, dim: int, clusters: int = 200, seed: int = 0):
+    # Text embeddings are clustered by topic; pure Gaussian noise would make recall meaningless
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    embeddings = (centers[rng.integers(0, clusters, n)] + 0.6 * rng.normal(size=(n, dim))).astype(np.float32)
+    ids = [f"chunk-{i}" for i in range(n)]
+    texts = [f"synthetic chunk {i}" for i in range(n)]
+    metadatas = [{"chunk_id": ids[i]} for i in range(n)]
+    return ids, texts, metadatas, embeddings
+
+
+def run(store: NumpyVectorStore, queries: np.ndarray, k: int) -> tuple[list, list]:
+    results, latencies = [], []
+    for query in queries:
+        t = time.perf_counter()
+        rows, _ = store.top_k(query, k)
+        latencies.append((time.perf_counter() - t) * 1000)
+        results.append(set(rows.tolist()))
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20000, help="synthetic chunk count")
+    parser.add_argument("--dim", type=int, default=768, help="embedding dimension (nomic-embed-text is 768)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--rescore-factors", default="1,2,4,8", help="comma-separated; 1 means no extra candidates")
+    parser.add_argument("--from-chroma", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_dir = Path(tmp)
+        if args.from_chroma:
+            from langchain_community.vectorstores import Chroma
+            from backend.core.vector_store import CHROMA_DB_PATH
+            count = export_from_chroma(Chroma(persist_directory=str(CHROMA_DB_PATH)), store_dir=store_dir)
+            print(f"Exported {count} vectors from {CHROMA_DB_PATH}")
+        else:
+            build_numpy_store(*make_corpus(args.n, args.dim), store_dir=store_dir)
+
+        baseline = NumpyVectorStore(store_dir=store_dir, quantization="none")
+        rng = np.random.default_rng(1)
+        sample = rng.integers(0, baseline.count(), args.queries)
+        matrix = np.asarray(baseline.matrix[sample], dtype=np.float32)
+        queries = matrix + 0.3 * rng.normal(size=matrix.shape).astype(np.float32) / np.sqrt(matrix.shape[1])
+
+        truth, latencies = run(baseline, queries, args.k)
+        baseline_mb = baseline.memory_bytes() / (1024 * 1024)
+        print(f"{baseline.count()} vectors x {baseline.matrix.shape[1]} dims, k={args.k}, {args.queries} queries")
+        print(f"{'mode':<8} {'rescore':>7} {'memory_mb':>10} {'saved':>7} {f'recall@{args.k}':>9} {'p50_ms':>8} {'p95_ms':>8}")
+        print(f"{'float32':<8} {'-':>7} {baseline_mb:>10.1f} {'0%':>7} {1.0:>9.3f} "
+              f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f}")
+
+        for quantization in ("float16", "int8"):
+            for factor in [int(f) for f in args.rescore_factors.split(",")]:
+                store = NumpyVectorStore(store_dir=store_dir, quantization=quantization, rescore_factor=factor)
+                found, latencies = run(store, queries, args.k)
+                recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+                memory_mb = store.memory_bytes() / (1024 * 1024)
+                print(f"{quantization:<8} {factor:>7} {memory_mb:>10.1f} {1 - memory_mb / baseline_mb:>7.0%} {recall:>9.3f} "
+                      f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
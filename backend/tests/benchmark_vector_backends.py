@@ -0,0 +1,143 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: benchmark_vector_backends.py
+Description: Compares the Chroma and NumPy vector backends on load time, query latency and peak RSS.
+
+Usage (from backend/):
+    python tests/benchmark_vector_backends.py                 # synthetic corpus
+    python tests/benchmark_vector_backends.py --from-chroma   # export the real embeddings/chroma_db
+Each backend runs in its own child process so RSS numbers don't mix.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import tempfile
+from pathlib import Path
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def rss_mb() -> float:
+    # VmHWM is the peak RSS of this process image; ru_maxrss can carry over the
+    # parent's peak across fork+exec, so it is only the fallback (kilobytes on Linux)
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_corpus(n: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(n, dim)).astype(np.float32)
+    ids = [f"chunk-{i}" for i in range(n)]
+    texts = [f"synthetic chunk {i}" for i in range(n)]
+    metadatas = [{"chunk_id": ids[i], "country": "iran" if i % 2 else "syria", "year": 2023} for i in range(n)]
+    return ids, texts, metadatas, embeddings
+
+
+def build(workdir: Path, n: int, dim: int, from_chroma: bool, dtype: str):
+    from langchain_community.vectorstores import Chroma
+    from backend.core.numpy_store import build_numpy_store, export_from_chroma
+    from backend.core.vector_store import CHROMA_DB_PATH
+
+    if from_chroma:
+        chroma_path = CHROMA_DB_PATH
+        count = export_from_chroma(Chroma(persist_directory=str(chroma_path)), store_dir=workdir / "numpy", dtype=dtype)
+        print(f"Exported {count} vectors from {chroma_path}")
+        return chroma_path
+
+    ids, texts, metadatas, embeddings = make_corpus(n, dim)
+    chroma_path = workdir / "chroma"
+    store = Chroma(persist_directory=str(chroma_path))
+    for start in range(0, n, 5000):
+        store._collection.add(ids=ids[start:start + 5000], documents=texts[start:start + 5000],
+                              metadatas=metadatas[start:start + 5000], embeddings=embeddings[start:start + 5000])
+    build_numpy_store(ids, texts, metadatas, embeddings, store_dir=workdir / "numpy", dtype=dtype)
+    return chroma_path
+
+
+def run_child(backend: str, chroma_path: str, numpy_path: str, queries: int, k: int):
+    from backend.core import numpy_store
+    start = time.perf_counter()
+    if backend == "numpy":
+        store = numpy_store.NumpyVectorStore(store_dir=Path(numpy_path))
+        dim = store.matrix.shape[1]
+        search = lambda q: store.query_by_vectors([q], k=k)
+    else:
+        from langchain_community.vectorstores import Chroma
+        store = Chroma(persist_directory=chroma_path)
+        collection = store._collection
+        dim = len(collection.get(limit=1, include=["embeddings"])["embeddings"][0])
+        search = lambda q: collection.query(query_embeddings=[q.tolist()], n_results=k,
+                                            include=["documents", "metadatas", "distances"])
+    rng = np.random.default_rng(1)
+    search(rng.normal(size=dim).astype(np.float32))
+    load_s = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(queries):
+        query = rng.normal(size=dim).astype(np.float32)
+        t = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - t) * 1000)
+    print(json.dumps({
+        "backend": backend,
+        "load_s": round(load_s, 3),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "peak_rss_mb": round(rss_mb(), 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20000, help="synthetic chunk count")
+    parser.add_argument("--dim", type=int, default=768, help="embedding dimension (nomic-embed-text is 768)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    parser.add_argument("--from-chroma", action="store_true")
+    parser.add_argument("--child", choices=["chroma", "numpy"], help=argparse.SUPPRESS)
+    parser.add_argument("--chroma-path", help=argparse.SUPPRESS)
+    parser.add_argument("--numpy-path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.chroma_path, args.numpy_path, args.queries, args.k)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        chroma_path = build(workdir, args.n, args.dim, args.from_chroma, args.dtype)
+        numpy_path = workdir / "numpy"
+        size_mb = (numpy_path / "embeddings.npy").stat().st_size / (1024 * 1024)
+        print(f"NumPy matrix on disk: {size_mb:.1f} MB ({args.dtype})")
+        print(f"{'backend':<8} {'load_s':>8} {'p50_ms':>8} {'p95_ms':>8} {'peak_rss_mb':>12}")
+        for backend in ("chroma", "numpy"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", backend, "--chroma-path", str(chroma_path),
+                 "--numpy-path", str(numpy_path), "--queries", str(args.queries), "--k", str(args.k)],
+                capture_output=True, text=True, env=dict(os.environ, ANONYMIZED_TELEMETRY="False")
+            )
+            if output.returncode != 0:
+                print(f"{backend}: failed\n{output.stderr[-2000:]}")
+                continue
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+            print(f"{result['backend']:<8} {result['load_s']:>8} {result['p50_ms']:>8} {result['p95_ms']:>8} {result['peak_rss_mb']:>12}")
+
+
+if __name__ == "__main__":
+    main()
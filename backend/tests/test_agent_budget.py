@@ -0,0 +1,72 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_agent_budget.py
+Description: Unit tests for the agent wall-time, LLM-call and token budget callback in core/agent_budget.py
+"""
+
+import uuid
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatResult, ChatGeneration
+from langchain_core.tools import tool
+from core.agent_budget import AgentBudget, BudgetExceeded
+
+
+class StreamingChatModel(BaseChatModel):
+    """Emits tokens through the run manager the way ChatOllama does inside invoke()."""
+    emitted: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        for token in ["a"] * 50:
+            self.emitted.append(token)
+            run_manager.on_llm_new_token(token)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="a" * 50))])
+
+
+def test_llm_call_limit_is_sticky():
+    budget = AgentBudget(max_llm_calls=2)
+    budget.on_chat_model_start({}, [[]], run_id=uuid.uuid4())
+    budget.on_chat_model_start({}, [[]], run_id=uuid.uuid4())
+
+    with pytest.raises(BudgetExceeded):
+        budget.on_chat_model_start({}, [[]], run_id=uuid.uuid4())
+    with pytest.raises(BudgetExceeded):
+        budget.on_tool_start({"name": "summarize_llm_only"}, "q", run_id=uuid.uuid4())
+    assert budget.usage()["reason"] == "llm_calls"
+
+
+def test_token_budget_aborts_generation_inside_a_tool():
+    model = StreamingChatModel(emitted=[])
+
+    @tool
+    def summarize(query: str) -> str:
+        """Summarize."""
+        return model.invoke(query).content
+
+    budget = AgentBudget(max_tokens=10)
+    with pytest.raises(BudgetExceeded):
+        summarize.invoke("iran", config={"callbacks": [budget]})
+
+    assert len(model.emitted) == 11
+    assert budget.usage()["reason"] == "tokens"
+
+
+def test_wall_time_and_best_output():
+    budget = AgentBudget(max_wall_s=0)
+    for name, output in [("retrieve_rag_context", "Source [a]: chunk"), ("summarize_llm_only", "Summary"),
+                         ("search_rag_data", "Error retrieving context")]:
+        run_id = uuid.uuid4()
+        budget._tools[run_id] = name
+        budget.on_tool_end(output, run_id=run_id)
+
+    with pytest.raises(BudgetExceeded):
+        budget.on_chat_model_start({}, [[]], run_id=uuid.uuid4())
+    assert budget.best_output() == ("summarize_llm_only", "Summary")
+    assert budget.usage()["reason"] == "wall_time"
@@ -0,0 +1,82 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_agent_route.py
+Description: Tests that the Flask /api/agent route cancels an agent run once every client waiting on it disconnects
+"""
+
+import os
+import sys
+import json
+import threading
+import time
+from pathlib import Path
+
+# routes imports through the backend package; keep it from starting the Notion outbox worker
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault("NOTION_OUTBOX", "false")
+
+import pytest
+from backend import routes
+from backend.core.agent_budget import BudgetExceeded
+
+
+class FakeAgentRun:
+    """Streams tokens through the run's budget until released or cancelled."""
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.cancelled = threading.Event()
+        self.calls = 0
+
+    def __call__(self, user_query, budget):
+        self.calls += 1
+        self.started.set()
+        try:
+            while not self.release.is_set():
+                budget.on_llm_new_token("a", run_id="run")
+                time.sleep(0.01)
+        except BudgetExceeded:
+            self.cancelled.set()
+            raise
+        return {'result': f"Report on {user_query}", 'notion_success': None}
+
+
+@pytest.fixture
+def agent_run(monkeypatch):
+    fake = FakeAgentRun()
+    monkeypatch.setattr(routes, "_run_agent_and_publish", fake)
+    monkeypatch.setattr(routes, "AGENT_KEEPALIVE_S", 0.02)
+    return fake
+
+
+def post(client):
+    response = client.post('/api/agent', json={'query': 'Report on Iran'}, buffered=False)
+    body = response.iter_encoded()
+    assert next(body) == b' '
+    return response, body
+
+
+def test_disconnect_cancels_the_agent_run(agent_run):
+    response, _ = post(routes.app.test_client())
+    assert agent_run.started.wait(2)
+
+    response.close()
+
+    assert agent_run.cancelled.wait(2)
+
+
+def test_run_continues_while_a_coalesced_client_waits(agent_run):
+    client = routes.app.test_client()
+    first, _ = post(client)
+    assert agent_run.started.wait(2)
+    second, body = post(client)
+
+    first.close()
+    time.sleep(0.2)
+    agent_run.release.set()
+
+    outcome = json.loads(b"".join(body))
+    assert not agent_run.cancelled.is_set() and agent_run.calls == 1
+    assert outcome['result'] == "Report on Report on Iran" and outcome['coalesced'] is True
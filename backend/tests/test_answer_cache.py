@@ -0,0 +1,65 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_answer_cache.py
+Description: Unit tests for the semantic answer cache and corpus version tracking
+"""
+
+from core.answer_cache import SemanticAnswerCache
+from core.corpus_version import get_corpus_version, bump_corpus_version
+
+
+def test_similar_question_hits(tmp_path):
+    cache = SemanticAnswerCache(db_path=tmp_path / "cache.db", threshold=0.95)
+    cache.store("Human rights in Iran?", [1.0, 0.0, 0.1], "Answer about Iran", "mistral", 1, 12.0)
+
+    hit = cache.lookup("What about human rights in Iran?", [1.0, 0.0, 0.12], "mistral", 1)
+    miss = cache.lookup("Is torture common in Iran?", [0.0, 1.0, 0.0], "mistral", 1)
+
+    assert hit["answer"] == "Answer about Iran"
+    assert miss is None
+    assert cache.get_stats()["hit_ratio"] == 0.5
+
+
+def test_corpus_version_and_model_must_match(tmp_path):
+    cache = SemanticAnswerCache(db_path=tmp_path / "cache.db")
+    cache.store("q", [1.0, 0.0], "a", "mistral", 1, 5.0)
+
+    assert cache.lookup("q", [1.0, 0.0], "mistral", 2) is None
+    assert cache.lookup("q", [1.0, 0.0], "llama3", 1) is None
+
+
+def test_expired_entries_are_ignored(tmp_path):
+    cache = SemanticAnswerCache(db_path=tmp_path / "cache.db", ttl=-1)
+    cache.store("q", [1.0, 0.0], "a", "mistral", 1, 5.0)
+
+    assert cache.lookup("q", [1.0, 0.0], "mistral", 1) is None
+
+
+def test_size_eviction_keeps_newest(tmp_path):
+    cache = SemanticAnswerCache(db_path=tmp_path / "cache.db", max_entries=2)
+    cache.store("first", [1.0, 0.0, 0.0], "a1", "mistral", 1, 5.0)
+    cache.store("second", [0.0, 1.0, 0.0], "a2", "mistral", 1, 5.0)
+    cache.store("third", [0.0, 0.0, 1.0], "a3", "mistral", 1, 5.0)
+
+    assert cache.lookup("q", [1.0, 0.0, 0.0], "mistral", 1) is None
+    assert cache.lookup("q", [0.0, 0.0, 1.0], "mistral", 1)["answer"] == "a3"
+
+
+def test_same_template_with_another_country_or_year_misses(tmp_path):
+    cache = SemanticAnswerCache(db_path=tmp_path / "cache.db", threshold=0.95)
+    cache.store("What is the human rights situation in Iran 2022?", [1.0, 0.0, 0.1], "Answer about Iran", "mistral", 1, 12.0)
+
+    # Near-identical embeddings, but the question names another country or year
+    assert cache.lookup("What is the human rights situation in Iraq 2023?", [1.0, 0.0, 0.1], "mistral", 1) is None
+    assert cache.lookup("What is the human rights situation in Iran 2023?", [1.0, 0.0, 0.1], "mistral", 1) is None
+    assert cache.lookup("What is the human rights situation in Iraq?", [1.0, 0.0, 0.1], "mistral", 1) is None
+    assert cache.lookup("Human rights situation in Iran, 2022?", [1.0, 0.0, 0.11], "mistral", 1)["answer"] == "Answer about Iran"
+
+
+def test_bump_corpus_version(tmp_path):
+    db_path = tmp_path / "meta.db"
+    assert get_corpus_version(db_path) == 0
+    assert bump_corpus_version(db_path) == 1
+    assert get_corpus_version(db_path) == 1
@@ -0,0 +1,77 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_async_rag.py
+Description: Unit tests for the async RAG answer and streaming paths in core/rag_chain.py with stubbed models
+"""
+
+import asyncio
+import pytest
+from langchain_core.documents import Document
+from core import rag_chain
+from core.answer_cache import SemanticAnswerCache
+
+TOKENS = ["Iran ", "detains ", "journalists."]
+
+
+class FakeAnswerChain:
+    """Stands in for prompt | ChatOllama | parser; records what it was asked."""
+    def __init__(self):
+        self.calls = []
+
+    async def ainvoke(self, inputs):
+        self.calls.append(inputs)
+        await asyncio.sleep(0.01)
+        return "".join(TOKENS)
+
+    async def astream(self, inputs):
+        self.calls.append(inputs)
+        for token in TOKENS:
+            await asyncio.sleep(0.01)
+            yield token
+
+
+class FakeEmbeddings:
+    async def aembed_query(self, text):
+        return [1.0, 0.0, 0.0]
+
+
+@pytest.fixture
+def chain(monkeypatch, tmp_path):
+    fake = FakeAnswerChain()
+
+    async def aretrieve_documents(query, k=5):
+        return [Document(page_content="Security forces detained journalists.", metadata={"source": "iran_2023.pdf"})]
+
+    monkeypatch.setattr(rag_chain, "answer_chain", fake)
+    monkeypatch.setattr(rag_chain, "aretrieve_documents", aretrieve_documents)
+    monkeypatch.setattr(rag_chain, "get_embeddings", FakeEmbeddings)
+    monkeypatch.setattr(rag_chain, "get_corpus_version", lambda: 1)
+    monkeypatch.setattr(rag_chain, "answer_cache", SemanticAnswerCache(db_path=tmp_path / "cache.db"))
+    return fake
+
+
+def test_arun_answers_from_retrieved_context_then_from_cache(chain):
+    first = asyncio.run(rag_chain.arun_rag_chain("Are journalists detained in Iran?"))
+    second = asyncio.run(rag_chain.arun_rag_chain("Are journalists detained in Iran?"))
+
+    assert first == second == "Iran detains journalists."
+    assert len(chain.calls) == 1
+    assert "Security forces detained journalists." in chain.calls[0]["context"]
+
+
+def test_astream_yields_tokens_and_fills_stats(chain):
+    async def collect(stats):
+        return [chunk async for chunk in rag_chain.astream_rag_chain("Are journalists detained in Iran?", stats=stats)]
+
+    streamed_stats, cached_stats = {}, {}
+    streamed = asyncio.run(collect(streamed_stats))
+    cached = asyncio.run(collect(cached_stats))
+
+    assert streamed == TOKENS
+    assert streamed_stats["cached"] is False
+    assert 0 < streamed_stats["ttft_s"] <= streamed_stats["latency_s"]
+    # The streamed answer was stored, so the repeat is one cached chunk without generation
+    assert cached == ["".join(TOKENS)] and cached_stats["cached"] is True
+    assert len(chain.calls) == 1
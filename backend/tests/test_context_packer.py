@@ -0,0 +1,48 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_context_packer.py
+Description: Unit tests for the token-budgeted context packer
+"""
+
+from langchain_core.documents import Document
+from core.context_packer import pack_context, dedupe_and_merge, count_tokens
+
+
+def make_doc(text, title="IRAN-2023.pdf"):
+    return Document(page_content=text, metadata={"source": "state", "title": title})
+
+
+def test_overlapping_neighbours_are_merged():
+    first = "Authorities detained journalists without charge in Tehran during the protests."
+    second = "without charge in Tehran during the protests. Families were not informed."
+
+    passages = dedupe_and_merge([make_doc(first), make_doc(second)])
+
+    assert len(passages) == 1
+    assert passages[0]["text"] == first + " Families were not informed."
+
+
+def test_exact_and_near_duplicates_are_dropped():
+    text = "The government restricted freedom of expression and assembly throughout the year in all provinces."
+    near = text.replace("all provinces", "all provinces.")
+
+    passages = dedupe_and_merge([make_doc(text), make_doc(text), make_doc(near, title="IRAN-2023.pdf")])
+
+    assert len(passages) == 1
+
+
+def test_same_text_from_other_source_is_not_merged():
+    passages = dedupe_and_merge([make_doc("Shared wording."), make_doc("Other wording.", title="SYRIA-2023.pdf")])
+    assert len(passages) == 2
+
+
+def test_pack_context_respects_budget_and_rank_order():
+    docs = [make_doc(f"Passage number {i} " + "word " * 200, title=f"doc{i}.pdf") for i in range(5)]
+
+    context = pack_context(docs, token_budget=300)
+
+    assert count_tokens(context) <= 310
+    assert context.startswith("Source [state, doc0.pdf]")
+    assert "doc4.pdf" not in context
@@ -0,0 +1,114 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_embedding_cache.py
+Description: Unit tests for the query embedding cache in core/embedding_cache.py
+"""
+
+import asyncio
+from core import embedding_cache
+from core.embedding_cache import CachedEmbeddings, normalize_query
+
+
+class FakeEmbeddings:
+    """Counts embedding calls instead of calling Ollama."""
+    def __init__(self):
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return [float(len(text)), 1.0, 0.5]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+
+def test_normalize_query():
+    assert normalize_query("  What about   IRAN?\n") == "what about iran?"
+
+
+def test_repeat_query_hits_memory_cache():
+    fake = FakeEmbeddings()
+    cache = CachedEmbeddings(fake, model_name="fake", persist=False)
+
+    first = cache.embed_query("Human rights in Syria")
+    second = cache.embed_query("human rights   in syria")
+
+    assert first == second
+    assert fake.calls == 1
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_lru_evicts_oldest_entry():
+    fake = FakeEmbeddings()
+    cache = CachedEmbeddings(fake, model_name="fake", max_size=2, persist=False)
+
+    cache.embed_query("a")
+    cache.embed_query("bb")
+    cache.embed_query("ccc")
+    cache.embed_query("a")
+
+    assert fake.calls == 4
+    assert cache.get_stats()["size"] == 2
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    db_path = tmp_path / "cache.db"
+    fake = FakeEmbeddings()
+    CachedEmbeddings(fake, model_name="fake", persist=True, db_path=db_path).embed_query("Iran")
+
+    cache = CachedEmbeddings(fake, model_name="fake", persist=True, db_path=db_path)
+    embedding = cache.embed_query("iran")
+
+    assert embedding == [4.0, 1.0, 0.5]
+    assert fake.calls == 1
+    assert cache.get_stats()["disk_hits"] == 1
+
+
+def test_model_name_is_part_of_key(tmp_path):
+    db_path = tmp_path / "cache.db"
+    fake = FakeEmbeddings()
+    CachedEmbeddings(fake, model_name="model-a", persist=True, db_path=db_path).embed_query("Iran")
+    CachedEmbeddings(fake, model_name="model-b", persist=True, db_path=db_path).embed_query("Iran")
+
+    assert fake.calls == 2
+
+
+def test_async_embed_query_shares_the_cache(monkeypatch):
+    calls = []
+
+    class FakeAsyncClient:
+        def __init__(self, host=None):
+            pass
+
+        async def embeddings(self, model, prompt):
+            calls.append((model, prompt))
+            return {"embedding": [1.0, 2.0]}
+
+    monkeypatch.setattr(embedding_cache.ollama, "AsyncClient", FakeAsyncClient)
+    fake = FakeEmbeddings()
+    cache = CachedEmbeddings(fake, model_name="fake", persist=False)
+
+    first = asyncio.run(cache.aembed_query("Iran"))
+    second = cache.embed_query("iran")
+
+    assert first == second == [1.0, 2.0]
+    assert calls == [("fake", "Iran")]
+    assert fake.calls == 0
+
+
+def test_embed_queries_uses_the_single_query_endpoint_for_misses():
+    fake = FakeEmbeddings()
+    cache = CachedEmbeddings(fake, model_name="fake", persist=False)
+    single = cache.embed_query("Iran")
+
+    batch = cache.embed_queries(["iran", "Syria", "syria ", "Cuba"])
+
+    # Same vectors embed_query produces (and caches); duplicates embedded once
+    assert batch[0] == single
+    assert batch[1] == batch[2] == fake.embed_query("Syria")
+    assert fake.calls == 1 + 2 + 1
+    assert cache.embed_query("cuba") == batch[3]
@@ -0,0 +1,59 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_hybrid_retriever.py
+Description: Unit tests for the FTS5 lexical search and reciprocal-rank fusion
+"""
+
+import sqlite3
+from langchain_core.documents import Document
+from ingest.ingest_documents import init_chunk_index, assign_chunk_ids, save_chunks_to_fts
+from core.hybrid_retriever import build_fts_query, lexical_search, reciprocal_rank_fusion
+
+
+def make_chunk(text, title="IRAN-2023.pdf"):
+    return Document(page_content=text, metadata={"title": title, "source": "state"})
+
+
+def test_build_fts_query_keeps_phrases():
+    assert build_fts_query('What about "Evin Prison" in Iran?') == '"Evin Prison" OR "iran"'
+    assert build_fts_query("what is the") == ""
+
+
+def test_lexical_search_finds_exact_term(tmp_path):
+    db_path = tmp_path / "documents.db"
+    conn = sqlite3.connect(db_path)
+    init_chunk_index(conn)
+    chunks = [
+        make_chunk("Detainees were held in Evin Prison without charge."),
+        make_chunk("Freedom of the press was restricted."),
+        make_chunk("Elections were not free or fair.", title="SYRIA-2023.pdf"),
+    ]
+    assign_chunk_ids(chunks)
+    save_chunks_to_fts(chunks, conn)
+    conn.close()
+
+    results = lexical_search('"Evin Prison"', k=3, db_path=db_path)
+
+    assert len(results) == 1
+    assert "Evin Prison" in results[0][0].page_content
+    assert results[0][0].metadata["chunk_id"] == chunks[0].metadata["chunk_id"]
+
+
+def test_assign_chunk_ids_are_stable_and_unique():
+    chunks = [make_chunk("same"), make_chunk("same")]
+    ids = assign_chunk_ids(chunks)
+    assert len(set(ids)) == 2
+    assert assign_chunk_ids([make_chunk("same"), make_chunk("same")]) == ids
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    a = Document(page_content="a", metadata={"chunk_id": "a"})
+    b = Document(page_content="b", metadata={"chunk_id": "b"})
+    c = Document(page_content="c", metadata={"chunk_id": "c"})
+
+    fused = reciprocal_rank_fusion([[a, b], [c, b]], k=3)
+
+    assert fused[0][0].metadata["chunk_id"] == "b"
+    assert len(fused) == 3
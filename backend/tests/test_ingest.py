@@ -17,9 +17,15 @@ from ingest.ingest_documents import (
     load_csv, 
     save_to_sqlite, 
     load_pdfs, 
-    init_sqlite
+    init_sqlite,
+    index_chunks,
+    embed_chunks,
+    delete_stale_chunks,
+    IngestCancelled
 )
+import ingest.ingest_documents as ingest_documents
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 
 # Create logs directory if it doesn't exist
 os.makedirs("logs", exist_ok=True)
@@ -150,6 +156,62 @@ def test_document_metadata_structure():
         os.unlink(test_csv.name)
 
 
+def test_cancelled_indexing_keeps_fts_and_bumps_corpus_version(monkeypatch, capsys):
+    logger.info("Running test_cancelled_indexing_keeps_fts_and_bumps_corpus_version...")
+    calls = []
+
+    def cancelled_embed(chunks, chunk_ids, embedding_fn):
+        calls.append("embed")
+        raise IngestCancelled()
+
+    class FakeReportCache:
+        def invalidate(self, corpus_version):
+            calls.append(("invalidate", corpus_version))
+            return 0
+
+    monkeypatch.setattr(ingest_documents, "embed_chunks", cancelled_embed)
+    monkeypatch.setattr(ingest_documents, "save_chunks_to_fts", lambda chunks, conn: calls.append("fts"))
+    monkeypatch.setattr(ingest_documents, "bump_corpus_version", lambda: 7)
+    monkeypatch.setattr(ingest_documents, "ReportCache", FakeReportCache)
+
+    with pytest.raises(IngestCancelled):
+        index_chunks([Document(page_content="text", metadata={})], ["id"], None, None)
+
+    # The FTS index is not rebuilt, but cached answers and reports are invalidated
+    assert calls == ["embed", ("invalidate", 7)]
+    assert '"partial_index": true' in capsys.readouterr().out
+    logger.info("Completed test_cancelled_indexing_keeps_fts_and_bumps_corpus_version.")
+
+
+class FakeEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+def test_reingest_replaces_changed_chunks_and_drops_stale_ones(monkeypatch, tmp_path):
+    logger.info("Running test_reingest_replaces_changed_chunks_and_drops_stale_ones...")
+    monkeypatch.setattr(ingest_documents, "CHROMA_DB_PATH", tmp_path / "chroma_db")
+    first = [Document(page_content=f"old chunk {i}", metadata={"source": "iran.pdf", "title": "Iran"}) for i in range(3)]
+    embed_chunks(first, ["a", "b", "c"], FakeEmbeddings())
+
+    # Same positional IDs, new text, and a corpus one chunk smaller
+    second = [Document(page_content=f"edited chunk number {i}", metadata={"source": "iran.pdf", "title": "Iran", "year": 2024})
+              for i in range(2)]
+    vector_db = embed_chunks(second, ["a", "b"], FakeEmbeddings())
+    deleted = delete_stale_chunks(vector_db, ["a", "b"])
+
+    stored = vector_db._collection.get(include=["documents", "metadatas", "embeddings"])
+    assert deleted == 1
+    assert sorted(stored["ids"]) == ["a", "b"]
+    assert sorted(stored["documents"]) == ["edited chunk number 0", "edited chunk number 1"]
+    assert all(metadata["year"] == 2024 for metadata in stored["metadatas"])
+    assert sorted(embedding[0] for embedding in stored["embeddings"]) == [21.0, 21.0]
+    logger.info("Completed test_reingest_replaces_changed_chunks_and_drops_stale_ones.")
+
+
 if __name__ == "__main__":
     logger.info("Starting test suite for ingest_documents.py")
     # Run tests
@@ -0,0 +1,101 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_ingest_jobs.py
+Description: Tests the background ingest job runner against small stand-in pipelines that print progress lines
+"""
+
+import sys
+import time
+import textwrap
+from core.ingest_jobs import IngestJobManager
+
+
+def pipeline(body: str) -> list:
+    """Command running a stand-in pipeline script with report_progress available."""
+    script = textwrap.dedent("""
+        import time
+        from core.ingest_jobs import report_progress
+    """) + textwrap.dedent(body)
+    return [sys.executable, "-c", f"import sys; sys.path.insert(0, {str(sys.path[0])!r})\n" + script]
+
+
+def wait_until_finished(job, timeout=10.0):
+    deadline = time.time() + timeout
+    while job.running and time.time() < deadline:
+        job.wait_for_change(job.version, timeout=0.1)
+    assert not job.running, f"job still {job.stage}"
+    # The follower thread sets returncode with the final status
+    while job.returncode is None and time.time() < deadline:
+        time.sleep(0.01)
+    return job.snapshot()
+
+
+def test_progress_lines_become_stage_counts_and_eta():
+    manager = IngestJobManager(command=pipeline("""
+        print("Loading PDFs...")
+        for i in range(1, 4):
+            report_progress("parse_pdfs", done=i, total=3, pdfs_parsed=i, pdfs_total=3)
+        report_progress("embed", done=0, total=400, chunks_total=400, chunks_embedded=0)
+        time.sleep(0.2)
+        report_progress("embed", done=100, total=400, chunks_embedded=100)
+        time.sleep(0.3)
+        report_progress("embed", done=400, total=400, chunks_embedded=400)
+    """))
+
+    job, created = manager.start()
+    while job.snapshot()["counts"].get("chunks_embedded") != 100:
+        job.wait_for_change(job.version, timeout=0.1)
+    during = job.snapshot()
+    final = wait_until_finished(job)
+
+    assert created
+    assert during["stage"] == "embed" and during["stage_total"] == 400
+    # ~100 chunks in ~0.2 s -> ~500/s with 300 chunks left
+    assert 0 < during["throughput_per_s"] <= 500
+    assert during["eta_s"] >= 300 / 500
+    assert final["status"] == "succeeded" and final["returncode"] == 0
+    assert final["counts"] == {"pdfs_parsed": 3, "pdfs_total": 3, "chunks_total": 400, "chunks_embedded": 400}
+    assert final["eta_s"] is None
+    assert final["log_tail"] == ["Loading PDFs..."]
+
+
+def test_concurrent_trigger_joins_running_job_and_cancel_stops_it():
+    manager = IngestJobManager(command=pipeline("""
+        import subprocess, sys
+        report_progress("scrape")
+        # A step started by the pipeline must stop with it
+        subprocess.run([sys.executable, "-c", "import time; time.sleep(30)"])
+    """))
+
+    job, created = manager.start()
+    again, created_again = manager.start()
+    while job.stage != "scrape":
+        job.wait_for_change(job.version, timeout=0.1)
+    started = time.time()
+    assert manager.cancel(job.job_id)
+    final = wait_until_finished(job)
+
+    assert created and not created_again and again is job
+    assert final["status"] == "cancelled"
+    assert time.time() - started < 5
+    assert not manager.cancel(job.job_id)
+    # Once finished, the next trigger starts a new job
+    assert manager.start()[0] is not job
+
+
+def test_failed_pipeline_reports_last_output_line():
+    manager = IngestJobManager(command=pipeline("""
+        report_progress("load_csv")
+        print("FileNotFoundError: data/csv/human_rights.csv")
+        raise SystemExit(3)
+    """))
+
+    job, _ = manager.start()
+    final = wait_until_finished(job)
+
+    assert final["status"] == "failed" and final["returncode"] == 3
+    assert final["stage"] == "load_csv"
+    assert final["error"] == "FileNotFoundError: data/csv/human_rights.csv"
+    assert manager.get(job.job_id) is job and manager.latest() is job
@@ -0,0 +1,105 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_intent_router.py
+Description: Unit tests for the keyword + embedding intent router in core/intent_router.py
+"""
+
+import pytest
+import core.intent_router as intent_router
+from core import vector_store
+from core.embedding_cache import CachedEmbeddings
+from core.intent_router import classify_intent, react_llm_calls
+
+# Toy 4-d embedding space: one axis per intent
+AXES = {"report": [1.0, 0.0, 0.0, 0.0], "rag_sources": [0.0, 1.0, 0.0, 0.0], "quick_summary": [0.0, 0.0, 1.0, 0.0],
+        "qa": [0.0, 0.0, 0.0, 1.0]}
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    lookup = {text: AXES[intent] for intent, texts in intent_router.INTENT_EXAMPLES.items() for text in texts}
+    queries = {}
+    monkeypatch.setattr(intent_router, "_embed", lambda texts: [lookup.get(t) or queries[t] for t in texts])
+    monkeypatch.setattr(intent_router, "_embed_query", lambda query: queries[query])
+    monkeypatch.setattr(intent_router, "_centroids", None)
+    return queries
+
+
+def test_single_rule_match_skips_embedding(monkeypatch):
+    monkeypatch.setattr(intent_router, "_embed", lambda texts: pytest.fail("embedding should not be needed"))
+    monkeypatch.setattr(intent_router, "_embed_query", lambda query: pytest.fail("embedding should not be needed"))
+
+    assert classify_intent("Write me a detailed report on Iran")["intent"] == "report"
+    assert classify_intent("Summarize human rights in Cuba") == {
+        "intent": "quick_summary", "source": "rules", "similarity": None, "margin": None}
+
+
+def test_embedding_breaks_rule_ties(fake_embeddings):
+    query = "Quick summary of the sources on Syria"
+    fake_embeddings[query] = [0.2, 0.9, 0.3, 0.0]
+
+    route = classify_intent(query)
+
+    assert intent_router.match_rules(query) == ["rag_sources", "quick_summary"]
+    assert route["intent"] == "rag_sources"
+    assert route["source"] == "embedding"
+
+
+def test_ambiguous_query_falls_back_to_agent(fake_embeddings):
+    fake_embeddings["Tell me about Iran"] = [1.0, 1.0, 0.0, 0.0]
+    fake_embeddings["What is going on in Peru"] = [0.1, 0.1, 0.1, 0.1]
+
+    assert classify_intent("Tell me about Iran")["intent"] is None  # no margin
+    assert classify_intent("What is going on in Peru")["intent"] is None  # similar to everything equally
+
+
+def test_plain_questions_are_left_to_the_agent(fake_embeddings):
+    # No keyword rule matches these; without a qa centroid they would land on the nearest routed intent
+    fake_embeddings["How are journalists treated in Iran?"] = [0.3, 0.2, 0.1, 0.9]
+    fake_embeddings["Are women allowed to vote in Kuwait?"] = [0.5, 0.1, 0.2, 0.8]
+
+    for query in fake_embeddings:
+        route = classify_intent(query)
+        assert route["nearest"] == "qa"
+        assert route["intent"] is None and route["source"] is None
+
+
+def test_weak_match_is_not_routed(fake_embeddings):
+    # Nearest to report with a clear lead, but only ~0.68 similar: below the threshold
+    fake_embeddings["Iran human rights"] = [0.68, 0.5, 0.4, 0.35]
+
+    route = classify_intent("Iran human rights")
+
+    assert route["nearest"] == "report" and 0.65 < route["similarity"] < intent_router.ROUTER_MIN_SIMILARITY
+    assert route["intent"] is None
+
+
+def test_react_llm_calls_counts_planning_steps():
+    assert react_llm_calls("report") == 3
+    assert react_llm_calls("quick_summary") == 2
+
+
+def test_routing_caches_the_vector_retrieval_uses(monkeypatch):
+    class Unnormalized:
+        """Like Ollama /api/embeddings: vectors are not unit length."""
+        def __init__(self):
+            self.calls = 0
+
+        def embed_query(self, text):
+            self.calls += 1
+            return [3.0, 4.0, float(len(text))]
+
+    client = Unnormalized()
+    cache = CachedEmbeddings(client, model_name="fake", persist=False)
+    monkeypatch.setattr(vector_store, "_embeddings", cache)
+    monkeypatch.setattr(intent_router, "_centroids", None)
+    query = "How are journalists treated in Iran"
+
+    classify_intent(query)
+    calls = client.calls
+
+    # Retrieval's embed_query is a cache hit holding the client's own vector
+    assert cache.embed_query(query) == [3.0, 4.0, float(len(query))]
+    assert client.calls == calls
@@ -0,0 +1,78 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_metrics.py
+Description: Unit tests for the per-stage latency histograms and Prometheus export in core/metrics.py
+"""
+
+import uuid
+from langchain_core.outputs import LLMResult, ChatGeneration
+from langchain_core.messages import AIMessage
+from core.metrics import MetricsRegistry, MetricsCallbackHandler
+
+
+def test_quantiles_and_counts():
+    registry = MetricsRegistry()
+    for ms in range(1, 101):
+        registry.observe("embed_query", ms / 1000)
+
+    stats = registry.snapshot()["embed_query"]
+
+    assert stats["count"] == 100
+    assert stats["p50_s"] == 0.051
+    assert stats["p95_s"] == 0.096
+    assert stats["p99_s"] == 0.1
+
+
+def test_prometheus_text_has_buckets_quantiles_and_counters():
+    registry = MetricsRegistry()
+    registry.observe("vector_search", 0.02)
+    registry.observe("vector_search", 3.0)
+    registry.increment("stage_errors", stage="notion_publish")
+
+    text = registry.prometheus_text()
+
+    assert "# TYPE hr_llm_stage_duration_seconds histogram" in text
+    assert 'hr_llm_stage_duration_seconds_bucket{stage="vector_search",le="0.025"} 1' in text
+    assert 'hr_llm_stage_duration_seconds_bucket{stage="vector_search",le="+Inf"} 2' in text
+    assert 'hr_llm_stage_duration_seconds_count{stage="vector_search"} 2' in text
+    assert 'hr_llm_stage_duration_seconds_quantile{stage="vector_search",quantile="0.99"} 3.000000' in text
+    assert 'hr_llm_stage_errors_total{stage="notion_publish"} 1' in text
+
+
+def test_callback_records_ollama_prefill_decode_and_tools():
+    registry = MetricsRegistry()
+    handler = MetricsCallbackHandler(registry)
+    llm_run, tool_run = uuid.uuid4(), uuid.uuid4()
+
+    handler.on_chat_model_start({}, [[]], run_id=llm_run)
+    info = {"model": "mistral:latest", "prompt_eval_duration": 400_000_000, "eval_duration": 2_000_000_000,
+            "prompt_eval_count": 900, "eval_count": 120}
+    handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=AIMessage(content="hi"), generation_info=info)]]),
+                       run_id=llm_run)
+    handler.on_tool_start({"name": "search_rag_data"}, "iran", run_id=tool_run)
+    handler.on_tool_end("ok", run_id=tool_run)
+
+    stats = registry.snapshot()
+    assert stats["llm_prefill"]["sum_s"] == 0.4
+    assert stats["llm_decode"]["sum_s"] == 2.0
+    assert stats["llm_total"]["count"] == 1
+    assert stats["tool_search_rag_data"]["count"] == 1
+    assert registry.counters[("llm_completion_tokens", (("model", "mistral:latest"),))] == 120
+
+
+def test_react_planner_calls_are_timed_separately():
+    registry = MetricsRegistry()
+    handler = MetricsCallbackHandler(registry)
+    planner_run, tool_llm_run = uuid.uuid4(), uuid.uuid4()
+
+    handler.on_chat_model_start({}, [[]], run_id=planner_run, tags=["react_planner"])
+    handler.on_chat_model_start({}, [[]], run_id=tool_llm_run)
+    for run_id in (planner_run, tool_llm_run):
+        handler.on_llm_end(LLMResult(generations=[[]]), run_id=run_id)
+
+    assert registry.snapshot()["llm_total"]["count"] == 2
+    assert registry.snapshot()["llm_react_planner"]["count"] == 1
+    assert registry.mean("llm_react_planner") >= 0
+    assert registry.mean("never_observed", 5.0) == 5.0
@@ -0,0 +1,31 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_mmr.py
+Description: Unit tests for the vectorized MMR reranker
+"""
+
+from core.mmr import maximal_marginal_relevance, mmr_rerank
+
+
+def test_mmr_skips_near_duplicates():
+    query = [1.0, 0.0]
+    candidates = [[1.0, 0.0], [0.99, 0.01], [0.7, 0.7]]
+
+    assert maximal_marginal_relevance(query, candidates, k=2, lambda_mult=0.3) == [0, 2]
+
+
+def test_mmr_with_lambda_one_is_plain_relevance():
+    query = [1.0, 0.0]
+    candidates = [[0.7, 0.7], [1.0, 0.0], [0.99, 0.01]]
+
+    assert maximal_marginal_relevance(query, candidates, k=3, lambda_mult=1.0) == [1, 2, 0]
+
+
+def test_mmr_rerank_returns_items_and_timing():
+    selected, elapsed_ms = mmr_rerank([1.0, 0.0], ["a", "b"], [[1.0, 0.0], [0.0, 1.0]], k=5)
+
+    assert selected == ["a", "b"]
+    assert elapsed_ms >= 0
+    assert maximal_marginal_relevance([1.0, 0.0], [], k=3) == []
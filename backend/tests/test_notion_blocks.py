@@ -0,0 +1,96 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_notion_blocks.py
+Description: Unit tests for the markdown to Notion block conversion and the batched, deduplicating block writer
+"""
+
+import time
+import asyncio
+from types import SimpleNamespace
+import pytest
+from core.notion_blocks import markdown_to_blocks, split_text, rich_text, NotionBlockWriter, RateLimiter
+
+
+class FakeNotion:
+    """Stands in for notion_client's Client: records appends, optionally failing one call."""
+    def __init__(self, fail_on_call: int = None):
+        self.calls = []
+        self.sent = []
+        self.fail_on_call = fail_on_call
+        self.blocks = SimpleNamespace(children=SimpleNamespace(append=self.append))
+
+    def append(self, block_id, children):
+        if len(self.calls) + 1 == self.fail_on_call:
+            self.fail_on_call = None
+            raise RuntimeError("502 from Notion")
+        assert len(children) <= 100
+        self.calls.append((block_id, children))
+        self.sent.append(time.monotonic())
+        return {"results": children}
+
+
+def text_of(block):
+    return "".join(item["text"]["content"] for item in block[block["type"]]["rich_text"])
+
+
+def test_markdown_becomes_native_blocks():
+    blocks = markdown_to_blocks("## Key Issues\n\nDetention of **journalists**\nand activists.\n\n- torture\n1. first\n> quote")
+
+    assert [b["type"] for b in blocks] == ["heading_2", "paragraph", "bulleted_list_item", "numbered_list_item", "quote"]
+    assert text_of(blocks[1]) == "Detention of journalists and activists."
+    assert blocks[1]["paragraph"]["rich_text"][1]["annotations"] == {"bold": True}
+
+
+def test_long_text_splits_on_word_boundaries():
+    text = " ".join(f"word{i}" for i in range(1000))
+
+    pieces = split_text(text, limit=2000)
+    items = rich_text(text)
+
+    assert "".join(pieces) == text
+    assert all(len(p) <= 2000 and (p.endswith(" ") or p is pieces[-1]) for p in pieces)
+    assert len(items) == len(pieces)
+
+
+def test_writer_batches_resumes_and_dedupes(tmp_path):
+    report = "\n\n".join(f"Paragraph {i} about arbitrary detention." for i in range(250))
+    writer = NotionBlockWriter("page", db_path=tmp_path / "ledger.db")
+    flaky = FakeNotion(fail_on_call=2)
+
+    with pytest.raises(RuntimeError):
+        writer.write(flaky, "Report: Iran", report, "2026-10-17")
+    resumed = writer.write(flaky, "Report: Iran", report, "2026-10-17")
+    again = writer.write(FakeNotion(), "Report: Iran", report, "2026-10-18")
+
+    # 2 header blocks + 250 paragraphs = 252 blocks -> 3 appends, the first not repeated
+    assert [len(children) for _, children in flaky.calls] == [100, 100, 52]
+    assert resumed["requests"] == 2
+    assert again == {"status": "duplicate", "content_hash": resumed["content_hash"], "requests": 0}
+
+
+def test_async_writer(tmp_path):
+    calls = []
+
+    async def append(block_id, children):
+        calls.append(children)
+
+    client = SimpleNamespace(blocks=SimpleNamespace(children=SimpleNamespace(append=append)))
+    writer = NotionBlockWriter("page", db_path=tmp_path / "ledger.db")
+
+    outcome = asyncio.run(writer.awrite(client, "Summary: Cuba", "# Summary\n\nShort."))
+
+    assert outcome["status"] == "published"
+    assert [b["type"] for b in calls[0]] == ["heading_2", "paragraph", "heading_1", "paragraph"]
+
+
+def test_limiter_spaces_every_append_of_a_long_report(tmp_path):
+    report = "\n\n".join(f"Paragraph {i} about arbitrary detention." for i in range(250))
+    writer = NotionBlockWriter("page", db_path=tmp_path / "ledger.db")
+    notion = FakeNotion()
+
+    writer.write(notion, "Report: Iran", report, "2026-10-17", limiter=RateLimiter(rate_per_s=20))
+
+    assert len(notion.sent) == 3
+    assert all(later - earlier >= 0.049 for earlier, later in zip(notion.sent, notion.sent[1:]))
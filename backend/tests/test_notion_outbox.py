@@ -0,0 +1,116 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_notion_outbox.py
+Description: Tests the durable Notion outbox against a local stand-in HTTP server that mimics the Notion blocks API
+"""
+
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from notion_client import Client
+from core.notion_outbox import NotionOutbox
+
+
+class StandInNotion(BaseHTTPRequestHandler):
+    """PATCH /v1/blocks/{id}/children, answering from the server's scripted responses."""
+
+    def do_PATCH(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        status, headers, payload = self.server.script.pop(0) if self.server.script else (200, {}, None)
+        self.server.requests.append((time.monotonic(), self.path, body))
+        payload = payload or ({"object": "list", "results": body["children"]} if status == 200 else
+                              {"object": "error", "status": status, "code": "rate_limited" if status == 429 else
+                               "validation_error" if status == 400 else "service_unavailable", "message": "scripted"})
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def notion_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInNotion)
+    server.script, server.requests, server.sent = [], [], []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+def make_outbox(server, tmp_path, **kwargs):
+    client = Client(auth="secret_test", base_url=f"http://127.0.0.1:{server.server_port}", retry=False)
+
+    def publish(title, content, date, source, limiter):
+        limiter.wait()
+        server.sent.append(time.monotonic())
+        children = [{"object": "block", "type": "paragraph",
+                     "paragraph": {"rich_text": [{"type": "text", "text": {"content": f"{title}: {content}"}}]}}]
+        return client.blocks.children.append(block_id="page-id", children=children)
+
+    return NotionOutbox(publish_fn=publish, db_path=tmp_path / "outbox.db", backoff_s=0.01, **kwargs)
+
+
+def wait_for_status(outbox, publish_id, statuses, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        entry = outbox.get(publish_id)
+        if entry["status"] in statuses:
+            return entry
+        time.sleep(0.02)
+    raise AssertionError(f"publish {publish_id} still {entry['status']}")
+
+
+def test_worker_retries_server_errors_and_rate_limits(notion_server, tmp_path):
+    notion_server.script = [(503, {}, None), (429, {"Retry-After": "0.05"}, None)]
+    outbox = make_outbox(notion_server, tmp_path)
+
+    publish_id = outbox.enqueue("Report: Iran", "body", "2026-10-17")
+    entry = wait_for_status(outbox, publish_id, {"published", "failed"})
+    outbox.stop()
+
+    assert entry["status"] == "published"
+    assert entry["attempts"] == 3
+    assert [path for _, path, _ in notion_server.requests] == ["/v1/blocks/page-id/children"] * 3
+    assert notion_server.requests[-1][2]["children"][0]["paragraph"]["rich_text"][0]["text"]["content"] == "Report: Iran: body"
+
+
+def test_validation_error_fails_without_retry(notion_server, tmp_path):
+    notion_server.script = [(400, {}, None)]
+    outbox = make_outbox(notion_server, tmp_path)
+
+    publish_id = outbox.enqueue("Bad", "body")
+    entry = wait_for_status(outbox, publish_id, {"published", "failed"})
+    outbox.stop()
+
+    assert entry["status"] == "failed"
+    assert entry["attempts"] == 1
+    assert "scripted" in entry["last_error"]
+    assert outbox.get_stats()["failed"] == 1
+
+
+def test_rate_limit_spaces_publishes_and_entries_survive_restart(notion_server, tmp_path):
+    outbox = make_outbox(notion_server, tmp_path, rate_per_s=20)
+    outbox.start = lambda: None  # process dies before its worker publishes anything
+    ids = [outbox.enqueue(f"Report {i}", "body") for i in range(3)]
+
+    # A fresh outbox on the same database (e.g. after a restart) publishes them once its
+    # worker starts at boot, without waiting for a new enqueue
+    restarted = make_outbox(notion_server, tmp_path, rate_per_s=20)
+    restarted.start()
+    statuses = [wait_for_status(restarted, i, {"published", "failed"})["status"] for i in ids]
+    restarted.stop()
+
+    assert statuses == ["published"] * 3
+    # The outbox's limiter spaces each Notion request
+    assert all(later - earlier >= 0.049 for earlier, later in zip(notion_server.sent, notion_server.sent[1:]))
+    assert restarted.get(999) is None
@@ -0,0 +1,96 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_numpy_store.py
+Description: Unit tests for the memory-mapped NumPy exact-search vector backend
+"""
+
+import numpy as np
+from core.numpy_store import build_numpy_store, NumpyVectorStore, where_mask
+
+
+def make_store(tmp_path, dtype="float32", quantization="none"):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(50, 16)).astype(np.float32)
+    metadatas = [{"country": "iran" if i % 2 else "syria", "year": 2023, "chunk_id": str(i)} for i in range(50)]
+    build_numpy_store([str(i) for i in range(50)], [f"chunk {i}" for i in range(50)], metadatas, embeddings,
+                      store_dir=tmp_path, dtype=dtype)
+    return NumpyVectorStore(store_dir=tmp_path, quantization=quantization), embeddings
+
+
+def test_exact_top_k_matches_brute_force(tmp_path):
+    store, embeddings = make_store(tmp_path)
+    query = embeddings[7] + 0.01
+
+    hits = store.query_by_vectors([query], k=5)[0]
+
+    normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+    assert [doc.page_content for doc, _, _ in hits] == [f"chunk {i}" for i in expected]
+    assert hits[0][1] < hits[-1][1]
+
+
+def test_where_clause_filters_rows(tmp_path):
+    store, embeddings = make_store(tmp_path)
+
+    hits = store.query_by_vectors([embeddings[8]], k=10, where={"country": "iran"})[0]
+
+    assert len(hits) == 10
+    assert all(doc.metadata["country"] == "iran" for doc, _, _ in hits)
+    assert store.query_by_vectors([embeddings[8]], k=3, where={"country": "cuba"})[0] == []
+
+
+def test_float16_store_returns_embeddings(tmp_path):
+    store, embeddings = make_store(tmp_path, dtype="float16")
+
+    hits = store.query_by_vectors([embeddings[3]], k=1, include_embeddings=True)[0]
+
+    assert store.matrix.dtype == np.float16
+    assert hits[0][0].page_content == "chunk 3"
+    assert hits[0][2].shape == (16,)
+
+
+def test_quantized_first_pass_rescores_at_full_precision(tmp_path):
+    exact, embeddings = make_store(tmp_path)
+    for quantization in ("int8", "float16"):
+        store = NumpyVectorStore(store_dir=tmp_path, quantization=quantization, rescore_factor=4)
+        query = embeddings[11] + 0.05
+
+        hits = store.query_by_vectors([query], k=5, where={"country": "iran"})[0]
+        expected = exact.query_by_vectors([query], k=5, where={"country": "iran"})[0]
+
+        assert [doc.page_content for doc, _, _ in hits] == [doc.page_content for doc, _, _ in expected]
+        # Distances come from the full-precision rows, not the quantized copy
+        assert np.allclose([d for _, d, _ in hits], [d for _, d, _ in expected], atol=1e-6)
+        assert store.memory_bytes() < exact.memory_bytes()
+
+
+def test_matryoshka_coarse_pass_reranks_with_full_vectors(tmp_path):
+    exact, embeddings = make_store(tmp_path)
+    store = NumpyVectorStore(store_dir=tmp_path, coarse_dims=8, coarse_n=50)
+    query = embeddings[21] + 0.05
+
+    hits = store.query_by_vectors([query], k=5)[0]
+    expected = exact.query_by_vectors([query], k=5)[0]
+
+    assert store.first_pass.shape == (50, 8)
+    # coarse_n covers the whole store, so reranking must reproduce the exact result
+    assert [doc.page_content for doc, _, _ in hits] == [doc.page_content for doc, _, _ in expected]
+    assert np.allclose([d for _, d, _ in hits], [d for _, d, _ in expected], atol=1e-6)
+    assert NumpyVectorStore(store_dir=tmp_path, coarse_dims=16).coarse_dims == 0
+
+
+def test_missing_quantized_copy_falls_back_to_exact(tmp_path):
+    make_store(tmp_path)
+    (tmp_path / "embeddings.int8.npy").unlink()
+
+    store = NumpyVectorStore(store_dir=tmp_path, quantization="int8")
+
+    assert store.quantization == "none" and store.first_pass is None
+
+
+def test_where_mask_and_in():
+    columns = {"country": np.array(["iran", "iraq", "cuba"], dtype=object), "year": np.array([2023, 2022, 2023], dtype=object)}
+    mask = where_mask({"$and": [{"country": {"$in": ["iran", "cuba"]}}, {"year": 2023}]}, columns, 3)
+    assert mask.tolist() == [True, False, True]
@@ -0,0 +1,74 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_passage_expander.py
+Description: Unit tests for chunk offsets at ingest and small-to-big passage expansion
+"""
+
+import sqlite3
+from langchain_core.documents import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from ingest.ingest_documents import save_to_sqlite, add_chunk_offsets
+from core.passage_expander import expand_documents
+
+
+def make_db(tmp_path, text):
+    db_path = tmp_path / "documents.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT, source TEXT, document_type TEXT, content TEXT, date_added TEXT, tags TEXT
+        )
+    """)
+    doc = Document(page_content=text, metadata={
+        "title": "IRAN-2023.pdf", "source": "state", "document_type": "pdf",
+        "date_added": "2025-01-01", "tags": "test"
+    })
+    save_to_sqlite([doc], conn)
+    conn.close()
+    return db_path, doc
+
+
+def test_chunks_carry_doc_id_and_offsets(tmp_path):
+    text = " ".join(f"sentence{i}" for i in range(200))
+    _, doc = make_db(tmp_path, text)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=20, add_start_index=True)
+    chunks = add_chunk_offsets(splitter.split_documents([doc]))
+
+    assert doc.metadata["doc_id"] == 1
+    for chunk in chunks:
+        assert text[chunk.metadata["start_index"]:chunk.metadata["end_index"]] == chunk.page_content
+
+
+def test_expand_documents_reads_surrounding_text(tmp_path):
+    text = " ".join(f"word{i}" for i in range(300))
+    db_path, _ = make_db(tmp_path, text)
+    start = text.index("word100")
+    chunk = Document(page_content="word100 word101", metadata={
+        "doc_id": 1, "start_index": start, "end_index": start + len("word100 word101")
+    })
+
+    expanded = expand_documents([chunk], window=50, db_path=db_path)
+
+    assert len(expanded) == 1
+    assert "word95" in expanded[0].page_content and "word106" in expanded[0].page_content
+    assert expanded[0].page_content in text
+
+
+def test_nearby_hits_merge_and_chunks_without_offsets_pass_through(tmp_path):
+    text = " ".join(f"word{i}" for i in range(300))
+    db_path, _ = make_db(tmp_path, text)
+    first, second = text.index("word100"), text.index("word104")
+    hits = [
+        Document(page_content="word100", metadata={"doc_id": 1, "start_index": first, "end_index": first + 7}),
+        Document(page_content="word104", metadata={"doc_id": 1, "start_index": second, "end_index": second + 7}),
+        Document(page_content="csv row", metadata={"title": "Row 1"}),
+    ]
+
+    expanded = expand_documents(hits, window=40, db_path=db_path)
+
+    assert len(expanded) == 2
+    assert "word100" in expanded[0].page_content and "word104" in expanded[0].page_content
+    assert expanded[1].page_content == "csv row"
@@ -0,0 +1,52 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_query_filters.py
+Description: Unit tests for country/year metadata extraction and Chroma where clauses
+"""
+
+from core.query_filters import country_from_filename, year_from_text, detect_filters, build_where, relaxed_filters
+
+
+def test_country_and_year_from_dos_filename():
+    fname = "528267_SOUTH-SUDAN-2023-HUMAN-RIGHTS-REPORT.pdf"
+    assert country_from_filename(fname) == "south-sudan"
+    assert year_from_text(fname) == 2023
+    assert country_from_filename("DEMOCRATIC-REPUBLIC-OF-THE-CONGO-2023.pdf") == "democratic-republic-of-the-congo"
+    assert country_from_filename("unrelated.pdf") is None
+
+
+def test_detect_filters_from_question():
+    assert detect_filters("What human rights issues were reported in Syria in 2023?") == {
+        "country": ["syria"], "year": 2023
+    }
+    assert detect_filters("Compare Iranian and Iraqi prisons")["country"] == ["iran", "iraq"]
+    assert detect_filters("Tell me about torture") == {}
+
+
+def test_bare_congo_applies_no_country_filter():
+    # Could be either Congo, so it must not restrict the search to the DRC
+    assert detect_filters("Human rights in Congo") == {}
+    assert detect_filters("Congolese refugees in 2023") == {"year": 2023}
+    assert detect_filters("Elections in the Republic of the Congo") == {}
+    for question in ("Violence in the DRC", "Human rights in the Democratic Republic of the Congo",
+                     "Conflict in the Democratic Republic of Congo", "Mining in DR Congo"):
+        assert detect_filters(question)["country"] == ["democratic-republic-of-the-congo"]
+
+
+def test_build_where():
+    assert build_where({}) is None
+    assert build_where({"country": ["iran"]}) == {"country": "iran"}
+    assert build_where({"country": ["iran", "iraq"], "year": 2023}) == {
+        "$and": [{"country": {"$in": ["iran", "iraq"]}}, {"year": 2023}]
+    }
+
+
+def test_relaxed_filters_keep_the_country_before_dropping_everything():
+    assert relaxed_filters({"country": ["iran"], "year": 2024}) == [
+        {"country": ["iran"], "year": 2024}, {"country": ["iran"]}, {}
+    ]
+    assert relaxed_filters({"country": ["iran"]}) == [{"country": ["iran"]}, {}]
+    assert relaxed_filters({"year": 2024}) == [{"year": 2024}, {}]
+    assert relaxed_filters({}) == [{}]
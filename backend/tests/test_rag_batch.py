@@ -0,0 +1,76 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_rag_batch.py
+Description: Unit tests for the bounded-concurrency batch generator and retrieval-only context in core/rag_chain.py
+"""
+
+import time
+import threading
+from core import rag_chain
+
+
+class FakeAnswerChain:
+    """Sleeps instead of calling Ollama and tracks how many calls overlap."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+        self.calls = 0
+
+    def invoke(self, inputs):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        if inputs["question"] == "bad":
+            raise RuntimeError("ollama down")
+        return f"answer to {inputs['question']}"
+
+
+def test_batch_bounds_concurrency_and_reports_failures(monkeypatch):
+    fake = FakeAnswerChain()
+    retrieval_calls = []
+    monkeypatch.setattr(rag_chain, "answer_chain", fake)
+    monkeypatch.setattr(rag_chain, "retrieve_documents_batch", lambda qs, k=5: retrieval_calls.append(qs) or [[] for _ in qs])
+    questions = ["a", "b", "bad", "c", "d", "e"]
+
+    results = list(rag_chain.iter_rag_chain_batch(questions, max_concurrency=2))
+
+    assert len(retrieval_calls) == 1
+    assert fake.peak == 2
+    assert sorted(r["index"] for r in results) == list(range(len(questions)))
+    failed = [r for r in results if r["error"]]
+    assert [(r["question"], r["answer"], r["error"]) for r in failed] == [("bad", None, "ollama down")]
+    assert all(r["generation_s"] >= 0.05 for r in results)
+
+
+def test_closing_the_batch_cancels_queued_generations(monkeypatch):
+    fake = FakeAnswerChain()
+    monkeypatch.setattr(rag_chain, "answer_chain", fake)
+    monkeypatch.setattr(rag_chain, "retrieve_documents_batch", lambda qs, k=5: [[] for _ in qs])
+
+    results = rag_chain.iter_rag_chain_batch([f"q{i}" for i in range(20)], max_concurrency=2)
+    next(results)
+    results.close()  # what Flask does when the NDJSON client disconnects
+    time.sleep(0.2)
+
+    # Only the generations already running when the client left were completed
+    assert fake.calls <= 4
+
+
+def test_retrieve_context_packs_sources_without_generation(monkeypatch):
+    from langchain_core.documents import Document
+    docs = [Document(page_content="Arbitrary detention of journalists.", metadata={"source": "iran_2023.pdf"})]
+    monkeypatch.setattr(rag_chain, "retrieve_documents", lambda q, k=5: docs)
+    monkeypatch.setattr(rag_chain, "answer_chain", None)  # any generation would fail
+
+    context = rag_chain.retrieve_context("detention in Iran")
+
+    assert context.startswith("Source [iran_2023.pdf")
+    assert "Arbitrary detention of journalists." in context
@@ -0,0 +1,46 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_react_agent.py
+Description: Unit tests for how agent/notion_react_agent.py reads ReAct agent results, with a stubbed agent
+"""
+
+from langchain_core.agents import AgentAction
+from agent import notion_react_agent as react_agent
+from core.report_cache import ReportCache
+
+REPORT = "# Human Rights Report: Iran\n\n## Executive Summary\nSecurity forces detained journalists."
+
+
+class FakeAgentExecutor:
+    """Returns the dict AgentExecutor.invoke returns with return_intermediate_steps=True."""
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, inputs, config=None):
+        self.calls += 1
+        action = AgentAction(tool="summarize_with_context", tool_input={"query": inputs["input"]}, log="")
+        return {"input": inputs["input"], "output": "This report provides an overview.",
+                "intermediate_steps": [(action, REPORT)]}
+
+
+def test_react_agent_report_is_returned_and_cached(monkeypatch, tmp_path):
+    fake = FakeAgentExecutor()
+    monkeypatch.setattr(react_agent, "agent", fake)
+    monkeypatch.setattr(react_agent, "INTENT_ROUTER", False)
+    monkeypatch.setattr(react_agent, "get_corpus_version", lambda: 1)
+    monkeypatch.setattr(react_agent, "report_cache", ReportCache(db_path=tmp_path / "reports.db"))
+
+    first = react_agent.run_agent("Write a report on Iran")
+    second = react_agent.run_agent("Write a report on Iran")
+
+    assert first["output"] == REPORT and first["report_tool"] == "summarize_with_context"
+    assert second == {"output": REPORT, "cached": True}
+    assert fake.calls == 1
+
+
+def test_final_answer_is_used_without_a_report_tool():
+    result = {"input": "q", "output": "Journalists are detained.", "intermediate_steps": []}
+
+    assert react_agent._agent_output(result) == {"output": "Journalists are detained.", "report_tool": None}
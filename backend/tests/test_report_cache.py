@@ -0,0 +1,51 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_report_cache.py
+Description: Unit tests for the persistent generated-report cache
+"""
+
+from core.report_cache import ReportCache
+
+
+def test_normalized_query_hits_across_instances(tmp_path):
+    ReportCache(db_path=tmp_path / "cache.db").store(
+        "Write a report on Iran", "# Report", "agent-v1", "mistral", 1, 180.0)
+    cache = ReportCache(db_path=tmp_path / "cache.db")  # e.g. after a restart
+
+    hit = cache.lookup("  write a REPORT on iran? ", "agent-v1", "mistral", 1)
+
+    assert hit["report"] == "# Report"
+    assert cache.lookup("Write a report on Syria", "agent-v1", "mistral", 1) is None
+    assert cache.get_stats() == {"lookups": 2, "hits": 1, "hit_ratio": 0.5, "latency_saved_s": 180.0}
+
+
+def test_tool_version_model_and_corpus_must_match(tmp_path):
+    cache = ReportCache(db_path=tmp_path / "cache.db")
+    cache.store("q", "r", "agent-v1", "mistral", 1, 5.0)
+
+    assert cache.lookup("q", "agent-v2", "mistral", 1) is None
+    assert cache.lookup("q", "agent-v1", "llama3", 1) is None
+    assert cache.lookup("q", "agent-v1", "mistral", 2) is None
+
+
+def test_invalidate_drops_older_corpus_versions(tmp_path):
+    cache = ReportCache(db_path=tmp_path / "cache.db")
+    cache.store("old", "r", "agent-v1", "mistral", 1, 5.0)
+    cache.store("new", "r", "agent-v1", "mistral", 2, 5.0)
+
+    assert cache.invalidate(2) == 1
+    assert cache.lookup("new", "agent-v1", "mistral", 2) is not None
+
+
+def test_expired_and_evicted_entries_are_dropped(tmp_path):
+    cache = ReportCache(db_path=tmp_path / "cache.db", ttl=-1)
+    cache.store("q", "r", "agent-v1", "mistral", 1, 5.0)
+    assert cache.lookup("q", "agent-v1", "mistral", 1) is None
+
+    cache = ReportCache(db_path=tmp_path / "lru.db", max_entries=1)
+    cache.store("first", "r", "agent-v1", "mistral", 1, 5.0)
+    cache.store("second", "r", "agent-v1", "mistral", 1, 5.0)
+    assert cache.lookup("first", "agent-v1", "mistral", 1) is None
+    assert cache.lookup("second", "agent-v1", "mistral", 1) is not None
@@ -0,0 +1,72 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_retriever.py
+Description: Unit tests for core/retriever.py with a stubbed embedding client and vector store
+"""
+
+import asyncio
+import pytest
+from langchain_core.documents import Document
+from core import retriever
+from core.metrics import metrics
+
+
+class FakeEmbeddings:
+    """Async embedding only; a sync embed_query would be a second, cache-hit call."""
+    async def aembed_query(self, text):
+        return [1.0, 0.0]
+
+    def embed_query(self, text):
+        pytest.fail("the awaited embedding should be reused")
+
+
+def embed_samples() -> int:
+    histogram = metrics.histograms.get("embed_query")
+    return histogram.count if histogram else 0
+
+
+def test_async_retrieval_records_one_embedding_sample(monkeypatch):
+    searched = []
+
+    def query_by_vectors(vectors, k, where=None, include_embeddings=False):
+        searched.append(vectors)
+        return [[(Document(page_content="chunk", metadata={}), 0.1, None)]]
+
+    monkeypatch.setattr(retriever, "get_embeddings", lambda: FakeEmbeddings())
+    monkeypatch.setattr(retriever, "query_by_vectors", query_by_vectors)
+    before = embed_samples()
+
+    docs = asyncio.run(retriever.aretrieve_documents("torture reports", mode="vector", filters={}))
+
+    assert [doc.page_content for doc in docs] == ["chunk"]
+    assert searched == [[[1.0, 0.0]]]
+    assert embed_samples() == before + 1
+
+
+def test_year_missing_from_corpus_keeps_the_country_filter(monkeypatch):
+    wheres = []
+
+    def query_by_vectors(vectors, k, where=None, include_embeddings=False):
+        wheres.append(where)
+        # Only 2023 reports are ingested, so the year filter matches nothing
+        hits = [(Document(page_content="iran chunk", metadata={"country": "iran"}), 0.2, None)]
+        return [hits if where == {"country": "iran"} else []] * len(vectors)
+
+    class Embeddings:
+        def embed_query(self, text):
+            return [1.0]
+
+        def embed_queries(self, texts):
+            return [[1.0] for _ in texts]
+
+    monkeypatch.setattr(retriever, "get_embeddings", Embeddings)
+    monkeypatch.setattr(retriever, "query_by_vectors", query_by_vectors)
+    monkeypatch.setattr(retriever, "AUTO_FILTERS", True)
+
+    single = retriever.retrieve_documents("Iran 2024 detentions", mode="vector")
+    batch = retriever.retrieve_documents_batch(["Iran 2024 detentions"], mode="vector")
+
+    assert [doc.page_content for doc in single] == [doc.page_content for doc in batch[0]] == ["iran chunk"]
+    assert wheres == [{"$and": [{"country": "iran"}, {"year": 2024}]}, {"country": "iran"}] * 2
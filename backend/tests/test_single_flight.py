@@ -0,0 +1,118 @@
+"""
+Application: Human Rights LLM
+Author: Ann Hagan - ann.marie783@gmail.com
+Date: 10-17-2026
+File: test_single_flight.py
+Description: Unit tests for request coalescing in core/single_flight.py
+"""
+
+import time
+import asyncio
+import threading
+import pytest
+from core.single_flight import SingleFlight, AsyncSingleFlight
+
+
+def run_concurrently(flight, fn, n=5):
+    results, errors = [], []
+    barrier = threading.Barrier(n)
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(flight.do("iran report", fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_identical_calls_share_one_run():
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "report"
+
+    results, errors = run_concurrently(flight, slow)
+
+    assert len(calls) == 1 and not errors
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert {result for result, _ in results} == {"report"}
+    assert flight.get_stats() == {"leaders": 1, "coalesced": 4, "in_flight": 0}
+
+    # Nothing is cached once the flight lands
+    assert flight.do("iran report", slow) == ("report", False)
+    assert len(calls) == 2
+
+
+def test_leader_error_reaches_every_waiter():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.2)
+        raise RuntimeError("ollama down")
+
+    results, errors = run_concurrently(flight, failing, n=3)
+
+    assert results == []
+    assert [str(e) for e in errors] == ["ollama down"] * 3
+
+
+def test_async_single_flight():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def slow(query):
+        calls.append(query)
+        await asyncio.sleep(0.05)
+        return query.upper()
+
+    async def main():
+        return await asyncio.gather(*[flight.do("k", slow, "syria") for _ in range(4)])
+
+    results = asyncio.run(main())
+
+    assert calls == ["syria"]
+    assert [r for r, _ in results] == ["SYRIA"] * 4
+    assert flight.get_stats()["coalesced"] == 3
+
+    async def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(flight.do("k", failing))
+
+
+def test_async_work_cancelled_only_when_every_caller_leaves():
+    flight = AsyncSingleFlight()
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+            return "done"
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        leader = asyncio.create_task(flight.do("k", slow))
+        follower = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        leader.cancel()  # leader's client disconnects, follower still waiting
+        await asyncio.sleep(0.01)
+        assert cancelled == []
+        follower.cancel()
+        await asyncio.sleep(0.01)
+        assert cancelled == [True]
+        assert flight.get_stats()["in_flight"] == 0
+
+    asyncio.run(main())
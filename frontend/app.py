@@ -15,6 +15,7 @@ from backend.memory import sql_chat_memory as chat_history
 from langchain_core.messages import HumanMessage, AIMessage
 import requests
 import logging
+import json
 
 # Add project root to path
 # Set up logging
@@ -39,6 +40,18 @@ except ImportError as e:
 # Initialize the chat database tables
 chat_history.init_chat_table()
 
+def iter_sse(response):
+    """Yield (event, data) pairs from a Server-Sent Events response."""
+    event, data = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+        elif not line and data:
+            yield event, json.loads("\n".join(data))
+            event, data = "message", []
+
 st.set_page_config(page_title="Human Rights RAG Chatbot", layout="wide")
 st.title("🕊️ Human Rights RAG Chatbot")
 
@@ -49,6 +62,8 @@ if 'current_messages' not in st.session_state:
     st.session_state.current_messages = []
 if 'input_key' not in st.session_state:
     st.session_state.input_key = 0
+if 'notion_publishes' not in st.session_state:
+    st.session_state.notion_publishes = []
 
 # Sidebar for chat history
 st.sidebar.title("Chat History")
@@ -57,25 +72,64 @@ st.sidebar.title("Chat History")
 st.sidebar.markdown("---")
 st.sidebar.markdown("**Data Management:**")
 
+if 'ingest_job_id' not in st.session_state:
+    st.session_state.ingest_job_id = None
+
 if st.sidebar.button("Run Ingest Pipeline"):
-    with st.spinner("Running ingest pipeline... This may take a few minutes."):
-        try:
-            response = requests.post(
-                "http://localhost:5001/api/ingest",
-                timeout=300  # 5 minute timeout
-            )
-            response_data = response.json()
-            
-            if response_data.get("status") == "success":
-                st.sidebar.success("Ingest pipeline completed!")
-                st.sidebar.info("New data has been processed and is ready for queries.")
-            else:
-                st.sidebar.error(f"Ingest failed: {response_data.get('message', 'Unknown error')}")
-                
-        except requests.exceptions.Timeout:
-            st.sidebar.error("Ingest pipeline timed out (5 minutes)")
-        except Exception as e:
-            st.sidebar.error(f"Error: {str(e)}")
+    try:
+        response = requests.post("http://localhost:5001/api/ingest", timeout=10)
+        response_data = response.json()
+        if response.status_code == 202:
+            st.session_state.ingest_job_id = response_data["job_id"]
+            if response_data.get("coalesced"):
+                st.sidebar.info("An ingest is already running; showing its progress.")
+        else:
+            st.sidebar.error(f"Ingest failed: {response_data.get('message', 'Unknown error')}")
+    except Exception as e:
+        st.sidebar.error(f"Error: {str(e)}")
+
+@st.fragment(run_every=2)
+def ingest_progress():
+    """Poll the running ingest job and show its stage, counts and ETA."""
+    job_id = st.session_state.ingest_job_id
+    if job_id is None:
+        return
+    try:
+        job = requests.get(f"http://localhost:5001/api/ingest/{job_id}", timeout=5).json()["job"]
+    except Exception as e:
+        st.error(f"Could not read ingest status: {str(e)}")
+        return
+
+    counts = job["counts"]
+    if job["status"] == "running":
+        if job["stage_total"]:
+            st.progress(min(job["stage_done"] / job["stage_total"], 1.0))
+        eta = f", about {job['eta_s']:.0f}s left" if job["eta_s"] is not None else ""
+        st.caption(f"Ingest: {job['stage']} ({job['elapsed_s']:.0f}s elapsed{eta})")
+        st.caption(f"PDFs parsed: {counts.get('pdfs_parsed', 0)}/{counts.get('pdfs_total', '?')} | "
+                   f"chunks embedded: {counts.get('chunks_embedded', 0)}/{counts.get('chunks_total', '?')}")
+        if st.button("Cancel Ingest"):
+            requests.post(f"http://localhost:5001/api/ingest/{job_id}/cancel", timeout=5)
+    elif job["status"] == "succeeded":
+        st.success(f"Ingest pipeline completed in {job['elapsed_s']:.0f}s "
+                   f"({counts.get('chunks_embedded', 0)} chunks embedded).")
+        st.info("New data has been processed and is ready for queries.")
+    elif job["status"] == "cancelled":
+        if counts.get("partial_index"):
+            st.warning(f"Ingest pipeline cancelled while indexing: {counts.get('chunks_embedded', 0)} of "
+                       f"{counts.get('chunks_total', '?')} chunks were embedded and the vector index stays "
+                       "partial until the next full ingest.")
+        else:
+            st.warning("Ingest pipeline cancelled.")
+    else:
+        st.error(f"Ingest failed: {job.get('error') or 'Unknown error'}")
+
+with st.sidebar:
+    ingest_progress()
+
+# Streaming answers skip the agent, so nothing is published to Notion
+st.sidebar.markdown("---")
+stream_answers = st.sidebar.checkbox("Stream answers (no Notion report)", value=False)
 
 # New Chat button
 st.sidebar.markdown("---")
@@ -123,6 +177,27 @@ with chat_container:
             st.markdown(f"**🤖 AI:** {msg.content}")
         st.markdown("---")
 
+@st.fragment(run_every=3)
+def notion_publish_status():
+    """Poll queued Notion publishes until each is published or has failed."""
+    for publish in st.session_state.notion_publishes:
+        if publish["status"] in ("pending", "publishing"):
+            try:
+                response = requests.get(f"http://localhost:5001/api/notion/publish/{publish['id']}", timeout=5)
+                publish.update(response.json()["publish"])
+            except Exception as e:
+                st.warning(f"Could not read Notion publish status: {str(e)}")
+                continue
+        if publish["status"] == "published":
+            st.success(f"Report {publish['id']} published to Notion.")
+        elif publish["status"] == "failed":
+            st.error(f"Report {publish['id']} could not be published to Notion: {publish.get('last_error')}")
+        else:
+            retrying = f", retrying after {publish['attempts']} failed attempt(s)" if publish.get("attempts") else ""
+            st.info(f"Report {publish['id']} queued for Notion{retrying}.")
+
+notion_publish_status()
+
 # Input area at the bottom
 st.markdown("---")
 user_input = st.text_input(
@@ -143,31 +218,60 @@ if user_input and user_input.strip():
     st.session_state.current_messages.append(HumanMessage(content=user_input))
     
     # Get AI response
+    notion_success = None
+    publish_id = None
     try:
-        with st.spinner("🤖 Thinking..."):
-            response = requests.post(
-                "http://localhost:5001/api/agent", 
+        if stream_answers:
+            # Render tokens as they arrive from the SSE endpoint
+            placeholder = st.empty()
+            ai_response = ""
+            with requests.post(
+                "http://localhost:5001/api/rag/stream",
                 json={"query": user_input},
-                timeout=120  
-            )
-            response_data = response.json()
-            ai_response = response_data.get("result", "Error: No response from agent")
-            notion_success = response_data.get("notion_success", False)
+                stream=True,
+                timeout=(5, 120)  # connect, then max gap between tokens
+            ) as response:
+                response.raise_for_status()
+                for event, data in iter_sse(response):
+                    if event == "token":
+                        ai_response += data["text"]
+                        placeholder.markdown(f"**🤖 AI:** {ai_response}▌")
+                    elif event == "error":
+                        ai_response = data["error"]
+                    elif event == "done":
+                        logger.info(f"Time to first token: {data.get('ttft_s')}s, total {data.get('latency_s')}s")
+            ai_response = ai_response or "Error: No response from server"
+            placeholder.markdown(f"**🤖 AI:** {ai_response}")
+        else:
+            with st.spinner("🤖 Thinking..."):
+                response = requests.post(
+                    "http://localhost:5001/api/agent", 
+                    json={"query": user_input},
+                    timeout=120  
+                )
+                response_data = response.json()
+                ai_response = response_data.get("result", "Error: No response from agent")
+                notion_success = response_data.get("notion_success", False)
+                publish_id = response_data.get("publish_id")
     except requests.exceptions.Timeout:
         ai_response = "Error: Request timed out. The query may be too complex or the server is slow."
-        notion_success = False
+        notion_success = None if stream_answers else False
     except requests.RequestException as e:
         ai_response = f"Error: {str(e)}"
-        notion_success = False
+        notion_success = None if stream_answers else False
     
     # Save AI response
     chat_history.save_message("ai", ai_response, st.session_state.current_chat_id)
     st.session_state.current_messages.append(AIMessage(content=ai_response))
     
-    # Display Notion publishing status
+    # Display Notion publishing status (streamed answers are not published)
     if notion_success:
         st.success("Report published to Notion.")
-    else:
+    elif publish_id is not None:
+        # Tracked by notion_publish_status until published or failed; keep the last few
+        st.session_state.notion_publishes = (st.session_state.notion_publishes
+                                             + [{"id": publish_id, "status": "pending"}])[-5:]
+    elif notion_success is False:
         st.error("Failed to publish to Notion.")
     
     # Clear input and refresh